@@ -0,0 +1,240 @@
+"""
+Monthly collections analytics from the ``CollectionsRollup`` table.
+
+An installment is billed in the month of its due date, and collected in the
+month of its payment date once it is paid. ``CollectionsRollup`` holds those
+sums per franchise, course and month, so the dashboard reads a few rows per
+franchise and never the installment history. Saving or deleting an
+installment recomputes the months it was in before and after, once per
+course when the transaction commits however many installments it touched;
+the bulk schedule and status writers recompute their months or their batch's
+course themselves; ``rebuild`` recomputes everything, a chunk of franchises
+per transaction. Rows are upserted on their franchise, course and month, and
+only the months left without installments are deleted. Marking installments overdue changes no sums, so it does not
+touch the rollup.
+"""
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Batch, CollectionsRollup, Franchise, Installment
+
+ZERO = Decimal('0')
+DEFAULT_MONTHS = 24
+DEFAULT_CHUNK_SIZE = 50
+BATCH = 'student_fee_management__batch_fee_management__batch'
+UNIQUE_FIELDS = ['franchise', 'course', 'month']
+ROLLUP_FIELDS = ['billed', 'collected', 'installment_count', 'paid_count', 'updated_at']
+
+
+class _Amounts:
+
+    @property
+    def outstanding(self):
+        return self.billed - self.collected
+
+    @property
+    def rate(self):
+        """
+        Collected as a percentage of billed, or ``None`` when nothing was billed.
+        """
+        if not self.billed:
+            return None
+        return (self.collected * 100 / self.billed).quantize(Decimal('0.1'))
+
+
+@dataclass
+class Totals(_Amounts):
+    billed: Decimal = ZERO
+    collected: Decimal = ZERO
+
+
+@dataclass
+class MonthTotals(_Amounts):
+    month: datetime.date
+    billed: Decimal = ZERO
+    collected: Decimal = ZERO
+
+
+@dataclass
+class FranchiseTotals(_Amounts):
+    franchise_id: int
+    name: str
+    billed: Decimal = ZERO
+    collected: Decimal = ZERO
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(month):
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def recent_months(count=DEFAULT_MONTHS, today=None):
+    """
+    Return the first days of the last ``count`` months, oldest first, ending with the current month.
+    """
+    month = month_start(today or timezone.now().date())
+    months = [month]
+    while len(months) < count:
+        month = month_start(month - datetime.timedelta(days=1))
+        months.append(month)
+    return months[::-1]
+
+
+def _in_months(field, months):
+    condition = Q()
+    for month in months:
+        condition |= Q(**{f'{field}__gte': month, f'{field}__lt': _next_month(month)})
+    return condition
+
+
+def _grouped(installments, month_field):
+    return installments.order_by().values(
+        franchise=F(f'{BATCH}__franchise_id'), course=F(f'{BATCH}__course_id'), period=TruncMonth(month_field),
+    )
+
+
+def _rollups(installments, billed_filter=Q(), collected_filter=Q()):
+    totals = {}
+    billed = _grouped(installments.filter(billed_filter), 'due_date').annotate(
+        billed=Sum('amount'), installment_count=Count('pk'),
+    )
+    collected = _grouped(
+        installments.filter(collected_filter, status='paid', payment_date__isnull=False), 'payment_date',
+    ).annotate(collected=Sum('amount'), paid_count=Count('pk'))
+    for row in [*billed, *collected]:
+        key = (row.pop('franchise'), row.pop('course'), row.pop('period'))
+        totals.setdefault(key, {}).update(row)
+    return [
+        CollectionsRollup(franchise_id=franchise_id, course_id=course_id, month=month, **sums)
+        for (franchise_id, course_id, month), sums in totals.items()
+    ]
+
+
+def _replace(scope, rollups):
+    # Upserting, rather than deleting and recreating the scope, lets concurrent refreshes of the same
+    # rows both succeed: the last one to commit wins, and both recomputed them from the installments.
+    keys = {(rollup.franchise_id, rollup.course_id, rollup.month) for rollup in rollups}
+    with transaction.atomic():
+        stale = [
+            pk for pk, *key in CollectionsRollup.objects.filter(scope).values_list(
+                'pk', 'franchise_id', 'course_id', 'month',
+            ) if tuple(key) not in keys
+        ]
+        if stale:
+            CollectionsRollup.objects.filter(pk__in=stale).delete()
+        CollectionsRollup.objects.bulk_create(
+            rollups, update_conflicts=True, update_fields=ROLLUP_FIELDS,
+            # MySQL upserts on any unique key and rejects a target.
+            unique_fields=UNIQUE_FIELDS if connection.features.supports_update_conflicts_with_target else None,
+        )
+
+
+def refresh(franchise_id, course_id, months=None):
+    """
+    Recompute the rows of ``franchise_id`` and ``course_id`` for ``months``, or for every month.
+    """
+    installments = Installment.objects.filter(**{
+        f'{BATCH}__franchise_id': franchise_id, f'{BATCH}__course_id': course_id,
+    })
+    scope = Q(franchise_id=franchise_id, course_id=course_id)
+    if months is None:
+        _replace(scope, _rollups(installments))
+        return
+    months = sorted({month_start(month) for month in months})
+    if months:
+        _replace(scope & Q(month__in=months), _rollups(
+            installments, _in_months('due_date', months), _in_months('payment_date', months),
+        ))
+
+
+def refresh_batch(batch_id):
+    """
+    Recompute every month of the franchise and course of ``batch_id``.
+    """
+    key = Batch.objects.filter(pk=batch_id).values_list('franchise_id', 'course_id').first()
+    if key is not None:
+        refresh(*key)
+
+
+def refresh_student_fee(student_fee_management_id, months):
+    """
+    Recompute ``months`` of the franchise and course a ``StudentFeeManagement`` bills against.
+    """
+    key = (
+        Batch.objects.filter(fee_management__studentfeemanagement__pk=student_fee_management_id)
+        .values_list('franchise_id', 'course_id').first()
+    )
+    if key is not None:
+        refresh(*key, months=months)
+
+
+def installment_months(*dates):
+    """
+    Return the months of the given due and payment dates, skipping missing ones.
+    """
+    return {month_start(day) for day in dates if day is not None}
+
+
+def rebuild(franchise_ids=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Recompute the rows of ``franchise_ids`` (every franchise by default), ``chunk_size`` franchises per pass.
+    """
+    if franchise_ids is None:
+        franchise_ids = list(Franchise.objects.order_by('pk').values_list('pk', flat=True))
+    franchise_ids = list(franchise_ids)
+    for start in range(0, len(franchise_ids), chunk_size):
+        chunk = franchise_ids[start:start + chunk_size]
+        _replace(
+            Q(franchise_id__in=chunk),
+            _rollups(Installment.objects.filter(**{f'{BATCH}__franchise_id__in': chunk})),
+        )
+    return len(franchise_ids)
+
+
+def _window(months, franchise_id=None):
+    rollups = CollectionsRollup.objects.filter(month__gte=months[0], month__lte=months[-1])
+    if franchise_id is not None:
+        rollups = rollups.filter(franchise_id=franchise_id)
+    return rollups.order_by()
+
+
+def monthly_totals(months, franchise_id=None):
+    """
+    Return a ``MonthTotals`` for each of ``months``, over every franchise or only ``franchise_id``.
+    """
+    sums = {
+        row.pop('month'): row
+        for row in _window(months, franchise_id).values('month').annotate(
+            billed=Sum('billed'), collected=Sum('collected'),
+        )
+    }
+    return [MonthTotals(month, **sums.get(month, {})) for month in months]
+
+
+def franchise_totals(months):
+    """
+    Return the ``FranchiseTotals`` over ``months`` of every franchise with rollup rows, by name.
+    """
+    rows = _window(months).values('franchise_id', 'franchise__name').annotate(
+        billed=Sum('billed'), collected=Sum('collected'),
+    ).order_by('franchise__name', 'franchise_id')
+    return [
+        FranchiseTotals(row['franchise_id'], row['franchise__name'], row['billed'], row['collected'])
+        for row in rows
+    ]
+
+
+def overall(totals):
+    """
+    Return the ``Totals`` of a list of month or franchise totals.
+    """
+    return Totals(sum((row.billed for row in totals), ZERO), sum((row.collected for row in totals), ZERO))
@@ -0,0 +1,257 @@
+"""
+Read-only JSON API, version 1.
+
+Lists are paginated with the opaque cursors of ``pagination`` and every
+endpoint accepts ``?fields=a,b`` to return only some of its fields. Querysets
+are built from the requested fields alone: rows are fetched with ``values()``,
+so only the needed columns are selected and only the joins, subqueries and
+aggregates those fields need are added to the query.
+"""
+from dataclasses import dataclass, field
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, OuterRef, Subquery
+from django.http import JsonResponse
+
+from .models import Batch, Franchise, FranchiseStats, Installment, StudentFeeManagement, UserFranchise
+from .pagination import keyset_paginate, parse_page_size
+from .roster import fee_annotations, roster_annotations
+
+VERSION = 'v1'
+JSON_PARAMS = {'separators': (',', ':')}
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Resource:
+    """
+    Fields of an endpoint by name.
+
+    A field is a lookup path, or a callable returning an expression (annotation)
+    from the endpoint's context object. ``converters`` maps a field to a function
+    turning its database value into a JSON one, such as ``str`` for course keys.
+    """
+    fields: dict
+    ordering: tuple = ('id',)
+    converters: dict = field(default_factory=dict)
+
+    def requested(self, request):
+        value = request.GET.get('fields')
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def values(self, queryset, names, context=None):
+        """
+        Return ``queryset`` narrowed to dicts of ``names`` plus the ordering keys.
+        """
+        annotations, plain, aliases = {}, [], {}
+        for name in dict.fromkeys([*names, *(field.lstrip('-') for field in self.ordering)]):
+            source = self.fields[name]
+            if callable(source):
+                annotations[name] = source(context)
+                plain.append(name)
+            elif source == name:
+                plain.append(name)
+            else:
+                aliases[name] = F(source)
+        return queryset.annotate(**annotations).values(*plain, **aliases)
+
+    def row(self, values, names):
+        """
+        Return the response dict of ``names`` for one ``values()`` row.
+        """
+        return {
+            name: self.converters[name](values[name]) if name in self.converters and values[name] is not None
+            else values[name]
+            for name in names
+        }
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def api_view(view_func):
+    """
+    Answer GET requests from superusers only, with JSON errors instead of redirects.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _error("Method not allowed", 405)
+        if not request.user.is_authenticated:
+            return _error("Authentication required", 401)
+        if not request.user.is_superuser:
+            return _error("Permission denied", 403)
+        try:
+            return view_func(request, *args, **kwargs)
+        except ApiError as exc:
+            return _error(str(exc), exc.status)
+    return wrapper
+
+
+def _respond(data):
+    return JsonResponse(data, encoder=DjangoJSONEncoder, json_dumps_params=JSON_PARAMS)
+
+
+def _page(request, resource, queryset, context=None):
+    names = resource.requested(request)
+    cursor = request.GET.get('cursor')
+    try:
+        page = keyset_paginate(
+            resource.values(queryset, names, context),
+            resource.ordering,
+            cursor,
+            parse_page_size(request.GET.get('page_size')),
+        )
+    except (ValidationError, ValueError, TypeError):
+        # A stale or tampered cursor carries values the ordering fields can't take.
+        if not cursor:
+            raise
+        raise ApiError("Invalid cursor") from None
+    return _respond({
+        'results': [resource.row(row, names) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+def _summary(field):
+    def expression(context):  # pylint: disable=unused-argument
+        return Subquery(
+            FranchiseStats.objects.filter(franchise=OuterRef('pk'), batch__isnull=True).values(field)[:1]
+        )
+    return expression
+
+
+FRANCHISES = Resource(fields={
+    'id': 'id',
+    'name': 'name',
+    'coordinator': 'coordinator',
+    'contact_no': 'contact_no',
+    'email': 'email',
+    'location': 'location',
+    'registration_date': 'registration_date',
+    'student_count': _summary('student_count'),
+    'batch_count': _summary('batch_count'),
+    'total_outstanding': _summary('total_outstanding'),
+    'overdue_count': _summary('overdue_count'),
+})
+
+BATCHES = Resource(fields={
+    'id': 'id',
+    'batch_no': 'batch_no',
+    'fees': 'fees',
+    'course_id': 'course_id',
+    'course_name': 'course__display_name',
+    'student_count': 'stats__student_count',
+    'active_enrollment_count': 'stats__active_enrollment_count',
+    'total_billed': 'stats__total_billed',
+    'total_collected': 'stats__total_collected',
+    'total_outstanding': 'stats__total_outstanding',
+    'overdue_count': 'stats__overdue_count',
+}, converters={'course_id': str})
+
+
+def _roster_field(name):
+    return lambda batch: roster_annotations(batch)[name]
+
+
+ROSTER = Resource(
+    fields={
+        'user_id': 'user_id',
+        'username': 'user__username',
+        'email': 'user__email',
+        'full_name': 'user__profile__name',
+        'phone': 'user__profile__phone_number',
+        **{name: _roster_field(name) for name in ('is_enrolled', 'total_paid', 'total_pending', 'total_overdue',
+                                                  'next_due_date')},
+    },
+    ordering=('username',),
+)
+
+
+def _fee_field(name):
+    return lambda context: fee_annotations('installments')[name]
+
+
+FEE_SUMMARY = Resource(fields={
+    'remaining_amount': 'remaining_amount',
+    'batch_amount': 'batch_fee_management__remaining_amount',
+    'installment_count': lambda context: Count('installments'),
+    **{name: _fee_field(name) for name in ('total_paid', 'total_pending', 'total_overdue', 'next_due_date')},
+}, ordering=())
+
+INSTALLMENTS = Resource(
+    fields={
+        'id': 'id',
+        'sequence': 'sequence',
+        'due_date': 'due_date',
+        'amount': 'amount',
+        'status': 'status',
+        'payment_date': 'payment_date',
+        'repayment_period_days': 'repayment_period_days',
+    },
+    ordering=('due_date', 'id'),
+)
+
+
+def _batch(franchise_pk, batch_pk):
+    batch = Batch.objects.filter(pk=batch_pk, franchise_id=franchise_pk).only('pk', 'course_id').first()
+    if batch is None:
+        raise ApiError("Batch not found", 404)
+    return batch
+
+
+def _student_fee(franchise_pk, batch_pk, user_pk):
+    return StudentFeeManagement.objects.filter(
+        user_franchise__user_id=user_pk, user_franchise__franchise_id=franchise_pk, user_franchise__batch_id=batch_pk,
+    )
+
+
+@api_view
+def franchises(request):
+    return _page(request, FRANCHISES, Franchise.objects.all())
+
+
+@api_view
+def batches(request, pk):
+    if not Franchise.objects.filter(pk=pk).exists():
+        raise ApiError("Franchise not found", 404)
+    return _page(request, BATCHES, Batch.objects.filter(franchise_id=pk))
+
+
+@api_view
+def roster(request, franchise_pk, batch_pk):
+    batch = _batch(franchise_pk, batch_pk)
+    return _page(request, ROSTER, UserFranchise.objects.filter(franchise_id=franchise_pk, batch=batch), batch)
+
+
+@api_view
+def fee_summary(request, franchise_pk, batch_pk, user_pk):
+    names = FEE_SUMMARY.requested(request)
+    row = FEE_SUMMARY.values(_student_fee(franchise_pk, batch_pk, user_pk), names).first()
+    if row is None:
+        raise ApiError("Student fee record not found", 404)
+    return _respond(FEE_SUMMARY.row(row, names))
+
+
+@api_view
+def installments(request, franchise_pk, batch_pk, user_pk):
+    student_fee_id = _student_fee(franchise_pk, batch_pk, user_pk).values_list('pk', flat=True).first()
+    if student_fee_id is None:
+        raise ApiError("Student fee record not found", 404)
+    return _page(request, INSTALLMENTS, Installment.objects.filter(student_fee_management_id=student_fee_id))
@@ -24,4 +24,7 @@ class ApplicationConfig(AppConfig):
                 'common': {'relative_path': 'settings'},
             }
         },
-    } 
\ No newline at end of file
+    }
+
+    def ready(self):
+        from . import signals  # pylint: disable=import-outside-toplevel,unused-import
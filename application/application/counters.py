@@ -0,0 +1,85 @@
+"""
+Dashboard counters kept in the Django cache.
+
+Totals are adjusted in place by the model signals in ``signals.py``. Every key
+expires after ``APPLICATION_COUNTERS_TIMEOUT`` seconds, after which the next
+read does a full recount, so any drift is bounded.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from . import metrics
+from .models import Batch, Franchise, UserFranchise
+
+KEY_PREFIX = 'application:counters:'
+DEFAULT_TIMEOUT = 60 * 60
+
+COUNTERS = {
+    'franchises': lambda: Franchise.objects.count(),
+    'batches': lambda: Batch.objects.count(),
+    'students': lambda: UserFranchise.objects.filter(franchise__isnull=False).count(),
+    'courses': lambda: CourseOverview.objects.count(),
+}
+
+
+def _timeout():
+    return getattr(settings, 'APPLICATION_COUNTERS_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _key(name):
+    return f'{KEY_PREFIX}{name}'
+
+
+def recount(names=None):
+    """
+    Recount ``names`` (all counters by default) from the database and store them.
+    """
+    values = {name: COUNTERS[name]() for name in (names or COUNTERS)}
+    cache.set_many({_key(name): value for name, value in values.items()}, _timeout())
+    return values
+
+
+def get_counters():
+    """
+    Return every counter, recounting only the ones missing from the cache.
+    """
+    values = cached_counters()
+    missing = [name for name in COUNTERS if name not in values]
+    metrics.record_cache('counters', len(values), len(missing))
+    if missing:
+        values.update(recount(missing))
+    return values
+
+
+def cached_counters():
+    """
+    Return the counters currently in the cache, without recounting the missing ones.
+    """
+    cached = cache.get_many([_key(name) for name in COUNTERS])
+    return {name: cached[_key(name)] for name in COUNTERS if _key(name) in cached}
+
+
+def _apply(name, delta):
+    try:
+        cache.incr(_key(name), delta)
+    except ValueError:
+        # Not cached yet; the next read recounts it.
+        pass
+
+
+def adjust(name, delta):
+    """
+    Add ``delta`` to a counter once the current transaction commits.
+    """
+    if delta:
+        transaction.on_commit(lambda: _apply(name, delta))
+
+
+def invalidate(*names):
+    """
+    Drop counters so the next read recounts them.
+    """
+    transaction.on_commit(lambda: cache.delete_many([_key(name) for name in names or COUNTERS]))
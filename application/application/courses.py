@@ -0,0 +1,101 @@
+"""
+Course search for the course pickers.
+
+Courses whose display name or id starts with the search term come first,
+then the ones containing it, at most ``limit`` in all. Only the id and name
+columns are read. Results are kept per process in a small LRU cache of
+``APPLICATION_COURSE_SEARCH_CACHE_SIZE`` searches, each trusted for
+``APPLICATION_COURSE_SEARCH_CACHE_TIMEOUT`` seconds so new courses show up.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from . import metrics
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MIN_TERM_LENGTH = 2
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TIMEOUT = 300
+
+
+class LRUCache:
+    """
+    Thread-safe mapping keeping the ``maxsize`` most recently used entries for ``timeout`` seconds.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = LRUCache(
+    getattr(settings, 'APPLICATION_COURSE_SEARCH_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+    getattr(settings, 'APPLICATION_COURSE_SEARCH_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT),
+)
+
+
+def _rows(condition, limit, exclude=()):
+    courses = (
+        CourseOverview.objects.filter(condition).exclude(id__in=exclude)
+        .only('id', 'display_name').order_by('display_name', 'id')[:limit]
+    )
+    return [{'id': str(course.id), 'name': course.display_name or str(course.id)} for course in courses]
+
+
+def _search(term, limit):
+    results = _rows(Q(display_name__istartswith=term) | Q(id__istartswith=term), limit)
+    if len(results) < limit:
+        results += _rows(
+            Q(display_name__icontains=term) | Q(id__icontains=term),
+            limit - len(results),
+            exclude=[result['id'] for result in results],
+        )
+    return results
+
+
+def search_courses(term, limit=DEFAULT_LIMIT):
+    """
+    Return up to ``limit`` courses matching ``term`` as ``{'id', 'name'}`` dicts, prefix matches first.
+    """
+    term = (term or '').strip()
+    if len(term) < MIN_TERM_LENGTH:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+    key = (term.lower(), limit)
+    results = _cache.get(key)
+    metrics.record_cache('course_search', int(results is not None), int(results is None))
+    if results is None:
+        results = _search(term, limit)
+        _cache.set(key, results)
+    return results
@@ -0,0 +1,59 @@
+"""
+Search, sorting and keyset pagination of the franchise list.
+
+Every sort key is paired with the primary key so the keyset ordering is
+unique. Nullable columns and the rollup totals are sorted through
+``Coalesce`` so that no sort value is NULL, which keyset comparisons can't
+step over. The name, coordinator and email sorts use their indexes directly.
+"""
+import datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import DateField, DecimalField, F, Value
+from django.db.models.functions import Coalesce
+
+from .models import Franchise
+from .pagination import keyset_paginate
+
+SORTS = {
+    'name': F('name'),
+    'location': Coalesce('location', Value('')),
+    'coordinator': F('coordinator'),
+    'email': F('email'),
+    'registration_date': Coalesce('registration_date', Value(datetime.date.min, output_field=DateField())),
+    'students': Coalesce('summary__student_count', Value(0)),
+    'batches': Coalesce('summary__batch_count', Value(0)),
+    'outstanding': Coalesce(
+        'summary__total_outstanding', Value(Decimal('0')), output_field=DecimalField(max_digits=14, decimal_places=2),
+    ),
+}
+DEFAULT_SORT = 'name'
+
+
+def parse_sort(value):
+    """
+    Return ``(key, descending)`` for a ``sort`` parameter such as ``-students``, falling back to the default.
+    """
+    value = value or DEFAULT_SORT
+    key = value.lstrip('-')
+    if key not in SORTS:
+        return DEFAULT_SORT, False
+    return key, value.startswith('-')
+
+
+def franchise_page(query, sort, cursor, page_size):
+    """
+    Return the ``KeysetPage`` of franchises matching ``query`` in the order ``sort`` names.
+    """
+    key, descending = parse_sort(sort)
+    franchises = Franchise.objects.with_summary().annotate(sort_value=SORTS[key])
+    if query:
+        franchises = franchises.search(query)
+    direction = '-' if descending else ''
+    ordering = (f'{direction}sort_value', f'{direction}pk')
+    try:
+        return keyset_paginate(franchises, ordering, cursor, page_size)
+    except (ValidationError, ValueError, TypeError):
+        # A cursor taken under another sort carries values of another type; start over.
+        return keyset_paginate(franchises, ordering, None, page_size)
@@ -0,0 +1,95 @@
+"""
+Enrollment of a whole batch in its course, or unenrollment from it.
+
+The students whose enrollment differs from the wanted state are found with
+one set-based query and then changed in chunks through the LMS enrollment
+API, so the LMS signals, events and side effects happen as for a single
+enrollment. The statistics refreshes those signals ask for are deferred to
+the end of each chunk. Progress is reported after every chunk. Students
+already in the wanted state never match again, so an interrupted run is
+resumed by running it again.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from common.djangoapps.student.models import CourseEnrollment
+
+from . import stats
+from .models import UserFranchise
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100
+ACTIONS = ('enroll', 'unenroll')
+
+
+@dataclass
+class BulkEnrollmentResult:
+    action: str
+    pending: int = 0
+    changed: int = 0
+    failed: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def students_to_change(batch, action):
+    """
+    Return the user ids of the students of ``batch`` whose enrollment in its course ``action`` would change.
+    """
+    active = Exists(CourseEnrollment.objects.filter(
+        user_id=OuterRef('user_id'), course_id=batch.course_id, is_active=True,
+    ))
+    students = UserFranchise.objects.filter(batch=batch)
+    students = students.filter(~active) if action == 'enroll' else students.filter(active)
+    return students.order_by('user_id').values_list('user_id', flat=True)
+
+
+def _apply(user, course_id, action):
+    if action == 'enroll':
+        CourseEnrollment.enroll(user, course_id)
+    else:
+        CourseEnrollment.unenroll(user, course_id)
+
+
+def change_batch_enrollment(batch, action, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Enroll every student of ``batch`` in its course, or unenroll them, as ``action`` says.
+
+    ``progress(result)`` is called after each chunk. A student whose change
+    fails is recorded in ``result.failed`` as ``(user_id, message)`` and
+    skipped; they are picked up again by the next run.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown enrollment action: {action}")
+    result = BulkEnrollmentResult(action=action)
+    started = time.monotonic()
+    pending = students_to_change(batch, action)
+    result.pending = pending.count()
+
+    last_user_id = 0
+    while True:
+        user_ids = list(pending.filter(user_id__gt=last_user_id)[:chunk_size])
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+        with stats.deferred():
+            for user in User.objects.filter(pk__in=user_ids).order_by('pk'):
+                try:
+                    # A savepoint per student, so one failure leaves the surrounding transaction usable.
+                    with transaction.atomic():
+                        _apply(user, batch.course_id, action)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.exception("Could not %s user %s in %s", action, user.pk, batch.course_id)
+                    result.failed.append((user.pk, str(exc)))
+                else:
+                    result.changed += 1
+        if progress:
+            progress(result)
+
+    result.elapsed = time.monotonic() - started
+    return result
@@ -0,0 +1,153 @@
+"""
+Streaming exports of a franchise's students, enrollments, batches and installment ledger.
+
+Rows are read in keyset pages of ``PAGE_SIZE`` (see ``pagination``) rather
+than through one cursor, because mysqlclient buffers a whole result set in
+memory. They are encoded into CSV or gzip-compressed JSON lines as they
+arrive. Course keys are written as strings. Output is handed out in chunks of
+about ``OUTPUT_CHUNK_BYTES``, so an export of any size runs in constant memory
+and its first bytes leave before the last rows are read.
+"""
+import csv
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from common.djangoapps.student.models import CourseEnrollment
+
+from .models import Batch, Installment, UserFranchise
+from .pagination import keyset_paginate
+
+PAGE_SIZE = 2000
+OUTPUT_CHUNK_BYTES = 64 * 1024
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/gzip', 'jsonl.gz'),
+}
+
+
+@dataclass
+class Export:
+    columns: tuple
+    fields: tuple
+    build: Callable
+    # Unique ordering to page along; it should follow an index.
+    ordering: tuple = ('pk',)
+    # Field -> function making its value writable, such as ``str`` for a ``CourseKey``.
+    converters: dict = field(default_factory=dict)
+
+    def _row(self, values):
+        return tuple(
+            self.converters[name](values[name]) if name in self.converters and values[name] is not None
+            else values[name]
+            for name in self.fields
+        )
+
+    def rows(self, franchise, page_size=PAGE_SIZE):
+        queryset = self.build(franchise).values(*self.fields, *self.ordering)
+        cursor = None
+        while True:
+            page = keyset_paginate(queryset, self.ordering, cursor, page_size)
+            for values in page:
+                yield self._row(values)
+            if not page.has_next:
+                return
+            cursor = page.next_cursor
+
+
+EXPORTS = {
+    'students': Export(
+        columns=('username', 'email', 'full_name', 'phone', 'batch', 'course_id', 'date_joined'),
+        fields=(
+            'user__username', 'user__email', 'user__profile__name', 'user__profile__phone_number',
+            'batch__batch_no', 'batch__course_id', 'user__date_joined',
+        ),
+        build=lambda franchise: UserFranchise.objects.filter(franchise=franchise),
+        converters={'batch__course_id': str},
+    ),
+    'enrollments': Export(
+        columns=('username', 'course_id', 'mode', 'is_active', 'created'),
+        fields=('user__username', 'course_id', 'mode', 'is_active', 'created'),
+        build=lambda franchise: CourseEnrollment.objects.filter(
+            user_id__in=UserFranchise.objects.filter(franchise=franchise).values('user_id'),
+        ),
+        converters={'course_id': str},
+    ),
+    'batches': Export(
+        columns=(
+            'batch', 'course_id', 'course_name', 'fees', 'students', 'active_enrollments',
+            'billed', 'collected', 'outstanding', 'overdue_installments',
+        ),
+        fields=(
+            'batch_no', 'course_id', 'course__display_name', 'fees', 'stats__student_count',
+            'stats__active_enrollment_count', 'stats__total_billed', 'stats__total_collected',
+            'stats__total_outstanding', 'stats__overdue_count',
+        ),
+        build=lambda franchise: Batch.objects.filter(franchise=franchise),
+        converters={'course_id': str},
+    ),
+    'installments': Export(
+        columns=('username', 'batch', 'sequence', 'due_date', 'amount', 'status', 'payment_date'),
+        fields=(
+            'student_fee_management__user_franchise__user__username',
+            'student_fee_management__batch_fee_management__batch__batch_no',
+            'sequence', 'due_date', 'amount', 'status', 'payment_date',
+        ),
+        build=lambda franchise: Installment.objects.filter(
+            student_fee_management__user_franchise__franchise=franchise,
+        ),
+        # Along installment_student_due_idx, so pages come out without a sort.
+        ordering=('student_fee_management_id', 'due_date', 'pk'),
+    ),
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _chunked(pieces):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= OUTPUT_CHUNK_BYTES:
+            yield piece[:0].join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield buffer[0][:0].join(buffer)
+
+
+def _csv_lines(export, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export.columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _gzip_jsonl(export, rows):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    lines = (f'{encoder.encode(dict(zip(export.columns, row)))}\n' for row in rows)
+    for chunk in _chunked(lines):
+        # A sync flush per chunk sends the bytes now instead of when the compressor's window fills.
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def stream(franchise, dataset, output_format='csv'):
+    """
+    Return an iterator over the encoded chunks of ``dataset`` for ``franchise`` in ``output_format``.
+    """
+    export = EXPORTS[dataset]
+    rows = export.rows(franchise)
+    if output_format == 'jsonl':
+        return _gzip_jsonl(export, rows)
+    return _chunked(_csv_lines(export, rows))
+
+
+def filename(franchise, dataset, output_format='csv'):
+    return f'franchise-{franchise.pk}-{dataset}.{FORMATS[output_format][1]}'
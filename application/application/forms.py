@@ -61,27 +61,42 @@ class FranchiseUserRegistrationForm(forms.ModelForm):
 
 
 class BatchForm(forms.ModelForm):
+    # Courses are picked through the course_search endpoint, so the choices are never listed,
+    # and the submitted id is checked with a single primary key lookup.
+    course = forms.ModelChoiceField(
+        queryset=CourseOverview.objects.only('id', 'display_name'),
+        widget=forms.TextInput(attrs={'placeholder': 'Search course', 'list': 'course-options'}),
+    )
+
     class Meta:
         model = Batch
-        fields = ['batch_no', 'fees', 'course']
+        # course is left out of the model fields, so model validation doesn't look it up a second time.
+        fields = ['batch_no', 'fees']
         widgets = {
             'batch_no': forms.TextInput(attrs={'placeholder': 'Batch Number'}),
             'fees': forms.NumberInput(attrs={'placeholder': 'Fees'}),
-            'course': forms.Select(),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['course'].label_from_instance = lambda obj: obj.display_name or str(obj.id)
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('course'):
+            self.instance.course = cleaned_data['course']
+        return cleaned_data
+
+
+class StudentImportForm(forms.Form):
+    csv_file = forms.FileField(label='CSV File')
 
 
 class InstallmentTemplateForm(forms.Form):
     amount = forms.DecimalField(
         max_digits=10,
         decimal_places=2,
+        min_value=0,
         widget=forms.NumberInput(attrs={'step': '0.01', 'placeholder': 'Amount'})
     )
     repayment_period_days = forms.IntegerField(
+        min_value=0,
         widget=forms.NumberInput(attrs={'placeholder': 'Repayment Period (days)'})
     )
 
@@ -0,0 +1,44 @@
+"""
+Caching of rendered page fragments and computed view context.
+
+Entries are keyed by the generation of the franchise or batch they show, as
+returned by ``versions.generation``. Every change to that franchise or batch
+moves its generation, so a stale entry is never read again and simply ages
+out of the cache; ``APPLICATION_FRAGMENT_CACHE_TIMEOUT`` only bounds how long
+unused entries occupy it. Hits and misses are counted per fragment name in
+the ``application_cache_requests_total`` metric.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+KEY_PREFIX = 'application:fragment:'
+DEFAULT_TIMEOUT = 24 * 60 * 60
+_MISSING = object()
+
+
+def make_key(name, generation, *vary_on):
+    digest = hashlib.md5(repr((generation, *vary_on)).encode(), usedforsecurity=False).hexdigest()
+    return f'{KEY_PREFIX}{name}:{digest}'
+
+
+def get_or_set(name, generation, build, *vary_on):
+    """
+    Return the cached value of ``name`` for ``generation`` and ``vary_on``, storing ``build()`` on a miss.
+
+    Nothing is cached when ``generation`` is ``None``.
+    """
+    if generation is None:
+        return build()
+    key = make_key(name, generation, *vary_on)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        metrics.record_cache(f'fragment:{name}', 1)
+        return value
+    metrics.record_cache(f'fragment:{name}', 0, 1)
+    value = build()
+    cache.set(key, value, getattr(settings, 'APPLICATION_FRAGMENT_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    return value
@@ -0,0 +1,97 @@
+"""
+Password hashing in a pool of worker processes, for bulk registration.
+
+The configured hasher (PBKDF2 in the LMS) is deliberately CPU bound, so it
+dominates a large import while holding the GIL. ``PasswordHashPool`` spreads
+each chunk of passwords over ``APPLICATION_IMPORT_HASH_WORKERS`` processes
+(one per core by default) and hands back a future for the hashes, so the
+caller can write the previous chunk to the database meanwhile. With a single
+worker the passwords are hashed in the calling process and no pool is started,
+which is what web requests use: forking a gunicorn worker copies its sockets
+and threads. The pool is for ``import_batch_students``, and starts its
+processes with ``APPLICATION_IMPORT_HASH_START_METHOD`` ("spawn" by default)
+rather than the platform default, so they never inherit a forked connection.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+def worker_count(workers=None):
+    """
+    Return ``workers``, else ``APPLICATION_IMPORT_HASH_WORKERS``, else the number of cores.
+    """
+    workers = workers or getattr(settings, 'APPLICATION_IMPORT_HASH_WORKERS', None) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def start_method():
+    """
+    Return ``APPLICATION_IMPORT_HASH_START_METHOD``, the way the pool starts its processes.
+    """
+    return getattr(settings, 'APPLICATION_IMPORT_HASH_START_METHOD', 'spawn')
+
+
+def _init_worker():
+    # Processes started with "spawn" or "forkserver" begin without Django set up.
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+class _Hashed:
+    """
+    The hashes of one submitted chunk, in submission order.
+    """
+
+    def __init__(self, futures=(), hashes=None):
+        self._futures = list(futures)
+        self._hashes = hashes
+
+    def result(self):
+        if self._hashes is None:
+            self._hashes = [hashed for future in self._futures for hashed in future.result()]
+        return self._hashes
+
+
+class PasswordHashPool:
+    """
+    Context manager hashing chunks of passwords in ``workers`` processes.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = worker_count(workers)
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                mp_context=multiprocessing.get_context(start_method()),
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def submit(self, passwords):
+        """
+        Start hashing ``passwords`` and return an object whose ``result()`` is the list of hashes.
+        """
+        if self._executor is None or not passwords:
+            return _Hashed(hashes=hash_passwords(passwords))
+        size = -(-len(passwords) // self.workers)
+        return _Hashed(
+            self._executor.submit(hash_passwords, passwords[start:start + size])
+            for start in range(0, len(passwords), size)
+        )
@@ -0,0 +1,106 @@
+"""
+Status changes for installments.
+"""
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from . import analytics, stats
+from .models import Installment, StudentFeeManagement
+
+OVERDUE_CHUNK_SIZE = 5000
+STATUSES = {status for status, _ in Installment.STATUS_CHOICES}
+
+
+@dataclass
+class OverdueSweepResult:
+    marked: int = 0
+    statements: int = 0
+    elapsed: float = 0.0
+
+
+def mark_overdue(today=None, chunk_size=OVERDUE_CHUNK_SIZE):
+    """
+    Flip every pending installment due before ``today`` to overdue.
+
+    The UPDATE is issued over consecutive primary key windows of ``chunk_size``
+    so each statement holds its row locks only briefly. Rows that are already
+    overdue no longer match, so the sweep is idempotent and safe to rerun.
+    The overdue counts of the batches involved are refreshed afterwards.
+    """
+    today = today or timezone.now().date()
+    result = OverdueSweepResult()
+    started = time.monotonic()
+
+    due = Installment.objects.filter(status='pending', due_date__lt=today)
+    bounds = due.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is not None:
+        batch_ids = set(
+            due.values_list('student_fee_management__batch_fee_management__batch_id', flat=True).distinct()
+        )
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            result.marked += due.filter(pk__gte=start, pk__lt=start + chunk_size).update(status='overdue')
+            result.statements += 1
+        stats.refresh_overdue_counts(batch_ids)
+
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def status_changes_from_post(data):
+    """
+    Return ``{installment_id: status}`` from the ``status_<id>`` fields of a submitted form.
+    """
+    changes = {}
+    for key, value in data.items():
+        prefix, _, installment_id = key.partition('_')
+        if prefix == 'status' and installment_id.isdigit() and value in STATUSES:
+            changes[int(installment_id)] = value
+    return changes
+
+
+def apply_status_changes(student_fee, fee_management, changes, today=None):
+    """
+    Apply ``{installment_id: status}`` to the installments of ``student_fee`` and recompute its balance.
+
+    Only rows whose status actually changes are written, with one ``bulk_update``.
+    The new balance comes from a database ``Sum`` of the paid installments.
+    The query count is constant however many installments change.
+    Returns the number of installments changed.
+    """
+    today = today or timezone.now().date()
+    with transaction.atomic():
+        installments = Installment.objects.select_for_update().filter(
+            student_fee_management=student_fee, pk__in=list(changes),
+        ).only('pk', 'status', 'payment_date')
+        changed, months = [], set()
+        for installment in installments:
+            status = changes[installment.pk]
+            if status == installment.status:
+                continue
+            months |= analytics.installment_months(installment.payment_date)
+            installment.status = status
+            if status == 'paid':
+                installment.payment_date = installment.payment_date or today
+            else:
+                installment.payment_date = None
+            months |= analytics.installment_months(installment.payment_date)
+            changed.append(installment)
+        if changed:
+            Installment.objects.bulk_update(changed, ['status', 'payment_date'])
+
+        total_paid = Installment.objects.filter(student_fee_management=student_fee, status='paid').aggregate(
+            total=Sum('amount'),
+        )['total'] or Decimal('0')
+        student_fee.remaining_amount = fee_management.remaining_amount - total_paid
+        # update() rather than save(): save() would reset a zero balance to the batch amount.
+        StudentFeeManagement.objects.filter(pk=student_fee.pk).update(remaining_amount=student_fee.remaining_amount)
+
+        if changed:
+            stats.refresh_batch(fee_management.batch_id)
+            analytics.refresh_student_fee(student_fee.pk, months)
+    return len(changed)
@@ -0,0 +1,35 @@
+"""
+Enroll every student of a batch in its course, or unenroll them.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from application.enrollments import ACTIONS, DEFAULT_CHUNK_SIZE, change_batch_enrollment
+from application.metrics import track_job
+from application.models import Batch
+
+
+class Command(BaseCommand):
+    help = "Enroll or unenroll a whole batch through the LMS enrollment API. Rerun to resume after an interruption."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=ACTIONS)
+        parser.add_argument('--batch', required=True, help="Batch number.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Students changed between progress reports and statistics refreshes.")
+
+    def handle(self, *args, **options):
+        batch = Batch.objects.filter(batch_no=options['batch']).first()
+        if batch is None:
+            raise CommandError(f"Batch {options['batch']} does not exist")
+
+        def progress(result):
+            self.stdout.write(f"{result.changed + len(result.failed)}/{result.pending} students processed")
+
+        with track_job('change_batch_enrollment'):
+            result = change_batch_enrollment(batch, options['action'], options['chunk_size'], progress)
+        for user_id, message in result.failed:
+            self.stderr.write(f"user {user_id}: {message}")
+        self.stdout.write(
+            f"{options['action'].capitalize()}ed {result.changed} of {result.pending} students "
+            f"in {result.elapsed:.2f}s, {len(result.failed)} failed"
+        )
@@ -0,0 +1,35 @@
+"""
+Create the missing installment schedules of a batch, a franchise or every batch.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from application.metrics import track_job
+from application.models import Batch
+from application.schedules import DEFAULT_CHUNK_SIZE, generate_schedules
+
+
+class Command(BaseCommand):
+    help = "Generate installment schedules from the batch templates for students that have none."
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--batch', help="Batch number.")
+        scope.add_argument('--franchise', type=int, help="Franchise id; every batch of the franchise.")
+        scope.add_argument('--all', action='store_true', help="Every batch.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        batches = Batch.objects.order_by('pk')
+        if options['batch']:
+            batches = batches.filter(batch_no=options['batch'])
+            if not batches.exists():
+                raise CommandError(f"Batch {options['batch']} does not exist")
+        elif options['franchise']:
+            batches = batches.filter(franchise_id=options['franchise'])
+
+        with track_job('generate_installment_schedules'):
+            result = generate_schedules(batches.iterator(), chunk_size=options['chunk_size'])
+        self.stdout.write(
+            f"Created {result.installments} installments for {result.students} students "
+            f"in {result.elapsed:.2f}s ({result.rows_per_second:.1f} rows/s)"
+        )
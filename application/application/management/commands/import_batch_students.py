@@ -0,0 +1,43 @@
+"""
+Register the students listed in a CSV file into a batch.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from application.bulk_import import DEFAULT_CHUNK_SIZE, import_students
+from application.metrics import track_job
+from application.models import Batch
+
+
+class Command(BaseCommand):
+    help = "Bulk register students from a CSV file into a batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('batch_no', help="Batch number to register the students into.")
+        parser.add_argument('csv_path', help="CSV with username, full_name, email, phone, mailing_address, password.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--workers', type=int,
+            help="Password hashing processes; defaults to APPLICATION_IMPORT_HASH_WORKERS or one per core.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            batch = Batch.objects.select_related('franchise').get(batch_no=options['batch_no'])
+        except Batch.DoesNotExist as exc:
+            raise CommandError(f"Batch {options['batch_no']} does not exist") from exc
+
+        with open(options['csv_path'], encoding='utf-8-sig', newline='') as csv_file, \
+                track_job('import_batch_students'):
+            try:
+                result = import_students(
+                    csv_file, batch.franchise, batch, chunk_size=options['chunk_size'], workers=options['workers'],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        for line_no, username, messages in result.errors:
+            self.stderr.write(f"line {line_no} ({username}): {'; '.join(messages)}")
+        self.stdout.write(
+            f"Registered {result.created} students, {result.failed} failed "
+            f"in {result.elapsed:.2f}s ({result.rows_per_second:.1f} rows/s)"
+        )
@@ -0,0 +1,32 @@
+"""
+Mark pending installments past their due date as overdue.
+"""
+import datetime
+import logging
+
+from django.core.management.base import BaseCommand
+
+from application.installments import OVERDUE_CHUNK_SIZE, mark_overdue
+from application.metrics import track_job
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Flip pending installments whose due date has passed to overdue. Safe to run every few minutes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=OVERDUE_CHUNK_SIZE,
+                            help="Primary key window covered by each UPDATE statement.")
+        parser.add_argument('--date', type=datetime.date.fromisoformat,
+                            help="Treat this day (YYYY-MM-DD) as today.")
+
+    def handle(self, *args, **options):
+        with track_job('mark_overdue_installments'):
+            result = mark_overdue(today=options['date'], chunk_size=options['chunk_size'])
+        message = (
+            f"Marked {result.marked} installments overdue with {result.statements} statements "
+            f"in {result.elapsed:.3f}s"
+        )
+        log.info(message)
+        self.stdout.write(message)
@@ -0,0 +1,22 @@
+"""
+Recompute the CollectionsRollup rows from the installments.
+"""
+from django.core.management.base import BaseCommand
+
+from application.analytics import DEFAULT_CHUNK_SIZE, rebuild
+from application.metrics import track_job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly collections rollup for some or all franchises."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--franchise', type=int, action='append', dest='franchises',
+                            help="Franchise id to rebuild; repeat for several. Defaults to all franchises.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Franchises rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        with track_job('rebuild_collections_rollup'):
+            rebuilt = rebuild(options['franchises'], options['chunk_size'])
+        self.stdout.write(f"Rebuilt collections for {rebuilt} franchises")
@@ -0,0 +1,20 @@
+"""
+Recompute the FranchiseStats rollup rows from the source tables.
+"""
+from django.core.management.base import BaseCommand
+
+from application.metrics import track_job
+from application.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FranchiseStats rollup for some or all franchises."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--franchise', type=int, action='append', dest='franchises',
+                            help="Franchise id to rebuild; repeat for several. Defaults to all franchises.")
+
+    def handle(self, *args, **options):
+        with track_job('rebuild_franchise_stats'):
+            rebuilt = rebuild(options['franchises'])
+        self.stdout.write(f"Rebuilt stats for {rebuilt} franchises")
@@ -0,0 +1,20 @@
+"""
+Recreate the cross-franchise student search terms from the source tables.
+"""
+from django.core.management.base import BaseCommand
+
+from application.metrics import track_job
+from application.search import DEFAULT_CHUNK_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the student search terms. Needed after students are written without signals."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Students indexed per transaction.")
+
+    def handle(self, *args, **options):
+        with track_job('rebuild_student_search'):
+            indexed = rebuild(options['chunk_size'])
+        self.stdout.write(f"Indexed {indexed} students")
@@ -0,0 +1,17 @@
+"""
+Recount the cached homepage counters from the database.
+"""
+from django.core.management.base import BaseCommand
+
+from application.counters import recount
+from application.metrics import track_job
+
+
+class Command(BaseCommand):
+    help = "Recount the cached dashboard counters. Schedule it to bound drift from missed signals."
+
+    def handle(self, *args, **options):
+        with track_job('refresh_dashboard_counters'):
+            values = recount()
+        for name, value in values.items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,322 @@
+"""
+Prometheus metrics in the text exposition format.
+
+Request, cache and job metrics are accumulated in memory by each process. When
+``APPLICATION_METRICS_DIR`` names a directory shared by the gunicorn workers
+and the management commands, every process also writes its totals to its own
+file there, at most every ``APPLICATION_METRICS_FLUSH_INTERVAL`` seconds and
+when a job ends. A scrape adds up the files of every process, so counters and
+histograms aggregate correctly whichever worker serves the scrape. Files are
+named by PID and process start time, so a reused PID starts a new file, and a
+scrape folds the files of exited processes into one retired totals file, so
+the directory does not grow with worker restarts and counters never go down.
+
+Business gauges are read from the ``FranchiseStats`` rollup and the cached
+dashboard counters and cached for ``APPLICATION_METRICS_GAUGE_TIMEOUT``
+seconds, so a scrape never runs an expensive query.
+"""
+import atexit
+import fcntl
+import glob
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+from . import counters
+from .models import FranchiseStats
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FILE_PREFIX = 'application-metrics-'
+RETIRED_FILE = f'{FILE_PREFIX}retired.json'
+LOCK_FILE = f'{FILE_PREFIX}lock'
+GAUGE_CACHE_KEY = 'application:metrics:gauges'
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_GAUGE_TIMEOUT = 60
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+HISTOGRAMS = {
+    'application_view_latency_seconds': ('Wall time of panel requests by URL name.', LATENCY_BUCKETS),
+    'application_view_queries': ('Database queries issued by panel requests by URL name.', QUERY_BUCKETS),
+    'application_job_duration_seconds': ('Duration of background jobs by job name.', JOB_BUCKETS),
+}
+COUNTERS = {
+    'application_cache_requests_total': 'Cache lookups by cache name and result.',
+    'application_jobs_total': 'Finished background jobs by job name and outcome.',
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}
+_last_flush = 0.0
+_process = None
+
+_PROCESS_FILE = re.compile(rf'^{FILE_PREFIX}(\d+)(?:-\d+)?\.json$')
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+def _setting(name, default):
+    return getattr(settings, f'APPLICATION_METRICS_{name}', default)
+
+
+def _directory():
+    return _setting('DIR', None)
+
+
+def increment(name, labels, amount=1):
+    with _lock:
+        _counters[_key(name, labels)] += amount
+    _maybe_flush()
+
+
+def observe(name, labels, value):
+    buckets = HISTOGRAMS[name][1]
+    with _lock:
+        histogram = _histograms.setdefault(_key(name, labels), {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram['buckets'][index] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+    _maybe_flush()
+
+
+def observe_request(url_name, seconds, queries):
+    observe('application_view_latency_seconds', {'view': url_name}, seconds)
+    observe('application_view_queries', {'view': url_name}, queries)
+
+
+def record_cache(cache_name, hits, misses=0):
+    if hits:
+        increment('application_cache_requests_total', {'cache': cache_name, 'result': 'hit'}, hits)
+    if misses:
+        increment('application_cache_requests_total', {'cache': cache_name, 'result': 'miss'}, misses)
+
+
+@contextmanager
+def track_job(job):
+    """
+    Record the duration and outcome of the job run inside the block, and flush them.
+    """
+    started = time.monotonic()
+    outcome = 'failure'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        observe('application_job_duration_seconds', {'job': job}, time.monotonic() - started)
+        increment('application_jobs_total', {'job': job, 'outcome': outcome})
+        flush()
+
+
+def _snapshot():
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'histograms': {key: dict(value, buckets=list(value['buckets'])) for key, value in _histograms.items()},
+        }
+
+
+def flush():
+    """
+    Write this process's totals to its file in ``APPLICATION_METRICS_DIR``, if one is configured.
+    """
+    global _last_flush  # pylint: disable=global-statement
+    directory = _directory()
+    if not directory:
+        return
+    path = os.path.join(directory, _process_file())
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as output:
+        json.dump(_snapshot(), output)
+    os.replace(temporary, path)
+    _last_flush = time.monotonic()
+
+
+def _process_file():
+    global _process  # pylint: disable=global-statement
+    # Forked workers inherit the module, so the start time is taken again whenever the PID changes.
+    if _process is None or _process[0] != os.getpid():
+        _process = (os.getpid(), time.time_ns())
+    return f'{FILE_PREFIX}{_process[0]}-{_process[1]}.json'
+
+
+def _maybe_flush():
+    if _directory() and time.monotonic() - _last_flush > _setting('FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL):
+        flush()
+
+
+atexit.register(flush)
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path):
+    try:
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
+
+
+def _retire(directory, paths):
+    """
+    Add the totals of the exited processes' ``paths`` to the retired totals file and remove them.
+    """
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    snapshots = [_read(path) for path in [retired_path, *paths]]
+    merged_counters, merged_histograms = _merge(snapshot for snapshot in snapshots if snapshot)
+    temporary = f'{retired_path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as output:
+        json.dump({'counters': merged_counters, 'histograms': merged_histograms}, output)
+    os.replace(temporary, retired_path)
+    for path in paths:
+        os.remove(path)
+
+
+def _collect():
+    directory = _directory()
+    if not directory:
+        return [_snapshot()]
+    flush()
+    # Held while reading, so a scrape never counts a file and the retired totals it was folded into.
+    with open(os.path.join(directory, LOCK_FILE), 'a', encoding='utf-8') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        exited = []
+        for path in glob.glob(os.path.join(directory, f'{FILE_PREFIX}*.json')):
+            match = _PROCESS_FILE.match(os.path.basename(path))
+            if match and not _running(int(match.group(1))):
+                exited.append(path)
+        if exited:
+            _retire(directory, exited)
+        snapshots = [_read(path) for path in glob.glob(os.path.join(directory, f'{FILE_PREFIX}*.json'))]
+    return [snapshot for snapshot in snapshots if snapshot]
+
+
+def _merge(snapshots):
+    merged_counters = defaultdict(float)
+    merged_histograms = {}
+    for snapshot in snapshots:
+        for key, value in snapshot['counters'].items():
+            merged_counters[key] += value
+        for key, value in snapshot['histograms'].items():
+            histogram = merged_histograms.setdefault(
+                key, {'buckets': [0] * len(value['buckets']), 'sum': 0.0, 'count': 0},
+            )
+            histogram['buckets'] = [total + count for total, count in zip(histogram['buckets'], value['buckets'])]
+            histogram['sum'] += value['sum']
+            histogram['count'] += value['count']
+    return merged_counters, merged_histograms
+
+
+def _gauges():
+    gauges = cache.get(GAUGE_CACHE_KEY)
+    if gauges is None:
+        gauges = {
+            'franchises': [
+                {'id': franchise_id, 'name': name, 'overdue': overdue, 'outstanding': float(outstanding)}
+                for franchise_id, name, overdue, outstanding in FranchiseStats.objects.filter(
+                    batch__isnull=True,
+                ).values_list('franchise_id', 'franchise__name', 'overdue_count', 'total_outstanding')
+            ],
+            'totals': counters.cached_counters(),
+        }
+        cache.set(GAUGE_CACHE_KEY, gauges, _setting('GAUGE_TIMEOUT', DEFAULT_GAUGE_TIMEOUT))
+    return gauges
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _header(lines, name, help_text, kind):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def _by_name(series):
+    grouped = defaultdict(list)
+    for key, value in series.items():
+        name, labels = json.loads(key)
+        grouped[name].append((labels, value))
+    return grouped
+
+
+def render():
+    """
+    Return every metric in the Prometheus text exposition format.
+    """
+    merged_counters, merged_histograms = _merge(_collect())
+    counter_series, histogram_series = _by_name(merged_counters), _by_name(merged_histograms)
+    lines = []
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        _header(lines, name, help_text, 'histogram')
+        for labels, histogram in sorted(histogram_series.get(name, [])):
+            for bound, count in zip(buckets, histogram['buckets']):
+                lines.append(f'{name}_bucket{_labels(labels + [["le", bound]])} {count}')
+            lines.append(f'{name}_bucket{_labels(labels + [["le", "+Inf"]])} {histogram["count"]}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(histogram["sum"])}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram["count"]}')
+
+    for name, help_text in COUNTERS.items():
+        _header(lines, name, help_text, 'counter')
+        for labels, value in sorted(counter_series.get(name, [])):
+            lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+    gauges = _gauges()
+    _header(lines, 'application_overdue_installments', 'Overdue installments by franchise.', 'gauge')
+    for franchise in gauges['franchises']:
+        labels = [['franchise_id', franchise['id']], ['franchise', franchise['name']]]
+        lines.append(f'application_overdue_installments{_labels(labels)} {franchise["overdue"]}')
+    _header(lines, 'application_outstanding_amount', 'Billed but uncollected fees by franchise.', 'gauge')
+    for franchise in gauges['franchises']:
+        labels = [['franchise_id', franchise['id']], ['franchise', franchise['name']]]
+        lines.append(f'application_outstanding_amount{_labels(labels)} {_number(franchise["outstanding"])}')
+    _header(lines, 'application_objects', 'Dashboard totals by kind, as currently cached.', 'gauge')
+    for kind, value in sorted(gauges['totals'].items()):
+        lines.append(f'application_objects{_labels([["kind", kind]])} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def scrape_allowed(request):
+    """
+    Allow superusers, and scrapers sending ``Authorization: Bearer <APPLICATION_METRICS_TOKEN>``.
+    """
+    if getattr(getattr(request, 'user', None), 'is_superuser', False):
+        return True
+    token = _setting('TOKEN', None)
+    header = request.headers.get('Authorization', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
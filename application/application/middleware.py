@@ -0,0 +1,180 @@
+"""
+Opt-in SQL and latency instrumentation for the panel views.
+
+``RequestInstrumentationMiddleware`` is added to ``MIDDLEWARE`` by
+``plugin_settings`` when ``FEATURES['ENABLE_APPLICATION_INSTRUMENTATION']`` is
+set. For every request resolved to an ``application:*`` URL it records the
+query count, the total SQL time, the slowest statements and the wall time;
+other requests pass through without their queries being wrapped.
+Wall times are kept per URL name in a rolling in-memory window from which
+``view_stats`` computes percentiles, and are fed to the ``metrics``
+histograms. Superusers get a ``Server-Timing`` header. Requests over the
+latency or query budget are logged together with their repeated query
+fingerprints, which is how N+1 patterns show up. The statements are only
+fingerprinted for those requests.
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from . import metrics
+
+log = logging.getLogger(__name__)
+
+APP_NAME = 'application'
+DEFAULT_SLOWEST = 5
+DEFAULT_WINDOW = 500
+DEFAULT_LATENCY_BUDGET_MS = 1000
+DEFAULT_QUERY_BUDGET = 50
+PERCENTILES = (50, 90, 95, 99)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+_lock = threading.Lock()
+_timings = defaultdict(lambda: deque(maxlen=_setting('WINDOW', DEFAULT_WINDOW)))
+
+
+def _setting(name, default):
+    return getattr(settings, f'APPLICATION_INSTRUMENTATION_{name}', default)
+
+
+def fingerprint(sql):
+    """
+    Return ``sql`` with literals and ``IN`` lists collapsed, so repeats of one statement compare equal.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryCollector:
+    """
+    Database execute wrapper counting and timing every statement.
+    """
+
+    def __init__(self, slowest=DEFAULT_SLOWEST):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.statements = Counter()
+        self._keep = slowest
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            if len(self.slowest) < self._keep:
+                heapq.heappush(self.slowest, (elapsed, sql))
+            elif self._keep:
+                heapq.heappushpop(self.slowest, (elapsed, sql))
+
+    def slowest_statements(self):
+        return sorted(self.slowest, reverse=True)
+
+    def duplicates(self):
+        fingerprints = Counter()
+        for sql, count in self.statements.items():
+            fingerprints[fingerprint(sql)] += count
+        return [(sql, count) for sql, count in fingerprints.most_common() if count > 1]
+
+
+def record(name, seconds):
+    with _lock:
+        _timings[name].append(seconds)
+
+
+def _percentile(ordered, percent):
+    # Nearest rank; multiplying before dividing keeps e.g. 7% of 100 from rounding up to rank 8.
+    return ordered[max(0, math.ceil(percent * len(ordered) / 100) - 1)]
+
+
+def view_stats():
+    """
+    Return ``{url_name: {'count', 'max', 'p50', 'p90', 'p95', 'p99'}}`` in milliseconds over the rolling window.
+    """
+    with _lock:
+        samples = {name: sorted(timings) for name, timings in _timings.items() if timings}
+    stats = {}
+    for name, ordered in samples.items():
+        stats[name] = {'count': len(ordered), 'max': round(ordered[-1] * 1000, 1)}
+        for percent in PERCENTILES:
+            stats[name][f'p{percent}'] = round(_percentile(ordered, percent) * 1000, 1)
+    return stats
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+
+
+def _url_name(request):
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return None
+    if APP_NAME not in match.app_names or not match.url_name:
+        return None
+    return f'{APP_NAME}:{match.url_name}'
+
+
+def _server_timing(collector, elapsed):
+    return (
+        f'db;dur={collector.duration * 1000:.1f};desc="{collector.count} queries", '
+        f'app;dur={elapsed * 1000:.1f}'
+    )
+
+
+def _log_over_budget(name, collector, elapsed):
+    shown = _setting('SLOWEST', DEFAULT_SLOWEST)
+    duplicates = '; '.join(f'{count}x {sql}' for sql, count in collector.duplicates()[:shown])
+    slowest = '; '.join(f'{duration * 1000:.1f} ms {sql}' for duration, sql in collector.slowest_statements())
+    log.warning(
+        '%s took %.1f ms with %d queries (%.1f ms SQL). Duplicated queries: %s. Slowest queries: %s',
+        name, elapsed * 1000, collector.count, collector.duration * 1000, duplicates or 'none', slowest or 'none',
+    )
+
+
+class RequestInstrumentationMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        name = _url_name(request)
+        if name is None:
+            return self.get_response(request)
+
+        collector = QueryCollector(slowest=_setting('SLOWEST', DEFAULT_SLOWEST))
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        record(name, elapsed)
+        metrics.observe_request(name, elapsed, collector.count)
+        if getattr(getattr(request, 'user', None), 'is_superuser', False):
+            response['Server-Timing'] = _server_timing(collector, elapsed)
+        if elapsed * 1000 > _setting('LATENCY_BUDGET_MS', DEFAULT_LATENCY_BUDGET_MS) \
+                or collector.count > _setting('QUERY_BUDGET', DEFAULT_QUERY_BUDGET):
+            _log_over_budget(name, collector, elapsed)
+        return response
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+import django.db.models.deletion
+
+
+def build_rollup_rows(apps, schema_editor):
+    # The rows stats._rebuild_franchise builds, for the franchises that exist before the signals maintain them.
+    Batch = apps.get_model('application', 'Batch')
+    CourseEnrollment = apps.get_model('student', 'CourseEnrollment')
+    Franchise = apps.get_model('application', 'Franchise')
+    FranchiseStats = apps.get_model('application', 'FranchiseStats')
+    Installment = apps.get_model('application', 'Installment')
+    UserFranchise = apps.get_model('application', 'UserFranchise')
+
+    for franchise_id in Franchise.objects.values_list('pk', flat=True).iterator():
+        batches = list(Batch.objects.filter(franchise_id=franchise_id).values_list('pk', flat=True))
+        students = dict(
+            UserFranchise.objects.filter(batch__franchise_id=franchise_id)
+            .values_list('batch_id').annotate(n=Count('pk'))
+        )
+        enrollments = dict(
+            CourseEnrollment.objects.filter(
+                is_active=True,
+                user__userfranchise__batch__franchise_id=franchise_id,
+                course_id=F('user__userfranchise__batch__course_id'),
+            ).values_list('user__userfranchise__batch_id').annotate(n=Count('pk'))
+        )
+        fees = {
+            row['batch_id']: row
+            for row in Installment.objects.filter(
+                student_fee_management__batch_fee_management__batch__franchise_id=franchise_id,
+            ).values(batch_id=F('student_fee_management__batch_fee_management__batch_id')).annotate(
+                billed=Sum('amount'),
+                collected=Sum('amount', filter=Q(status='paid')),
+            )
+        }
+
+        rows = []
+        for batch_id in batches:
+            billed = fees.get(batch_id, {}).get('billed') or 0
+            collected = fees.get(batch_id, {}).get('collected') or 0
+            rows.append(FranchiseStats(
+                franchise_id=franchise_id,
+                batch_id=batch_id,
+                student_count=students.get(batch_id, 0),
+                active_enrollment_count=enrollments.get(batch_id, 0),
+                total_billed=billed,
+                total_collected=collected,
+                total_outstanding=billed - collected,
+            ))
+        FranchiseStats.objects.bulk_create(rows)
+        FranchiseStats.objects.create(
+            franchise_id=franchise_id,
+            student_count=UserFranchise.objects.filter(franchise_id=franchise_id).count(),
+            active_enrollment_count=sum(row.active_enrollment_count for row in rows),
+            batch_count=len(rows),
+            total_billed=sum(row.total_billed for row in rows),
+            total_collected=sum(row.total_collected for row in rows),
+            total_outstanding=sum(row.total_outstanding for row in rows),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0026_installment_repayment_period_days'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FranchiseStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('active_enrollment_count', models.PositiveIntegerField(default=0)),
+                ('batch_count', models.PositiveIntegerField(default=0)),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='application.batch')),
+                ('franchise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='application.franchise')),
+            ],
+        ),
+        migrations.RunPython(build_rollup_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+def number_existing_installments(apps, schema_editor):
+    Installment = apps.get_model('application', 'Installment')
+    current_student_fee, sequence, changed = None, 0, []
+    for installment in Installment.objects.order_by('student_fee_management_id', 'due_date', 'id').iterator():
+        if installment.student_fee_management_id != current_student_fee:
+            current_student_fee, sequence = installment.student_fee_management_id, 0
+        sequence += 1
+        installment.sequence = sequence
+        changed.append(installment)
+        if len(changed) >= 1000:
+            Installment.objects.bulk_update(changed, ['sequence'])
+            changed = []
+    Installment.objects.bulk_update(changed, ['sequence'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0027_franchisestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='installment',
+            name='sequence',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(number_existing_installments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='installment',
+            constraint=models.UniqueConstraint(fields=('student_fee_management', 'sequence'), name='unique_installment_sequence'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0028_installment_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['status', 'due_date'], name='installment_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.20 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+USER_EMAIL_INDEX = 'application_user_email_idx'
+
+
+def _has_email_index(schema_editor, table):
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(cursor, table)
+    return any(
+        (constraint['index'] or constraint['unique']) and constraint['columns'][:1] == ['email']
+        for constraint in constraints.values()
+    )
+
+
+def add_user_email_index(apps, schema_editor):
+    # auth_user belongs to another app, so the index is managed here by hand
+    # and skipped when the platform already provides one. The migration runs
+    # after the last auth migration, whose table rebuilds would drop it on SQLite.
+    User = apps.get_model('auth', 'User')
+    if not _has_email_index(schema_editor, User._meta.db_table):
+        schema_editor.add_index(User, models.Index(fields=['email'], name=USER_EMAIL_INDEX))
+
+
+def remove_user_email_index(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    with schema_editor.connection.cursor() as cursor:
+        constraints = schema_editor.connection.introspection.get_constraints(cursor, User._meta.db_table)
+    if USER_EMAIL_INDEX in constraints:
+        schema_editor.remove_index(User, models.Index(fields=['email'], name=USER_EMAIL_INDEX))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('application', '0029_installment_status_due_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userfranchise',
+            index=models.Index(fields=['franchise', 'batch'], name='uf_franchise_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfeemanagement',
+            index=models.Index(fields=['batch_fee_management', 'user_franchise'], name='studentfee_batchfee_uf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['student_fee_management', 'due_date'], name='installment_student_due_idx'),
+        ),
+        migrations.RunPython(add_user_email_index, remove_user_email_index),
+    ]
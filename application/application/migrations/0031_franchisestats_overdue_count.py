@@ -0,0 +1,36 @@
+# Generated by Django 4.2.20 on 2026-10-18 13:10
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def count_overdue_installments(apps, schema_editor):
+    FranchiseStats = apps.get_model('application', 'FranchiseStats')
+    Installment = apps.get_model('application', 'Installment')
+    overdue = dict(
+        Installment.objects.filter(status='overdue')
+        .values_list(F('student_fee_management__batch_fee_management__batch_id')).annotate(n=Count('pk'))
+    )
+    franchise_totals = {}
+    for row in FranchiseStats.objects.filter(batch_id__in=list(overdue)):
+        row.overdue_count = overdue[row.batch_id]
+        row.save(update_fields=['overdue_count'])
+        franchise_totals[row.franchise_id] = franchise_totals.get(row.franchise_id, 0) + row.overdue_count
+    for franchise_id, total in franchise_totals.items():
+        FranchiseStats.objects.filter(franchise_id=franchise_id, batch__isnull=True).update(overdue_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0030_fee_model_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='franchisestats',
+            name='overdue_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_overdue_installments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0031_franchisestats_overdue_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='franchisestats',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0032_franchisestats_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='franchise',
+            index=models.Index(fields=['name', 'id'], name='franchise_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='franchise',
+            index=models.Index(fields=['location', 'id'], name='franchise_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='franchise',
+            index=models.Index(fields=['coordinator', 'id'], name='franchise_coordinator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='franchise',
+            index=models.Index(fields=['email', 'id'], name='franchise_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='franchise',
+            index=models.Index(fields=['registration_date', 'id'], name='franchise_reg_date_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.20 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_students(apps, schema_editor):
+    from application.search import terms_for
+
+    UserFranchise = apps.get_model('application', 'UserFranchise')
+    StudentSearchTerm = apps.get_model('application', 'StudentSearchTerm')
+    rows = UserFranchise.objects.order_by('pk').values_list(
+        'pk', 'user__username', 'user__email', 'user__profile__name', 'user__profile__phone_number',
+    )
+    terms = []
+    for pk, *details in rows.iterator():
+        terms.extend(StudentSearchTerm(user_franchise_id=pk, term=term) for term in sorted(terms_for(*details)))
+        if len(terms) >= 1000:
+            StudentSearchTerm.objects.bulk_create(terms)
+            terms = []
+    StudentSearchTerm.objects.bulk_create(terms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0033_franchise_list_indexes'),
+        ('student', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=255)),
+                ('user_franchise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='application.userfranchise')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'user_franchise'], name='search_term_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_students, migrations.RunPython.noop),
+    ]
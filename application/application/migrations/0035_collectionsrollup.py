@@ -0,0 +1,67 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+BATCH = 'student_fee_management__batch_fee_management__batch'
+
+
+def fill_collections_rollup(apps, schema_editor):
+    Installment = apps.get_model('application', 'Installment')
+    CollectionsRollup = apps.get_model('application', 'CollectionsRollup')
+
+    def grouped(installments, month_field):
+        return installments.order_by().values(
+            franchise=F(f'{BATCH}__franchise_id'), course=F(f'{BATCH}__course_id'), period=TruncMonth(month_field),
+        )
+
+    totals = {}
+    billed = grouped(Installment.objects.all(), 'due_date').annotate(billed=Sum('amount'), installment_count=Count('pk'))
+    collected = grouped(
+        Installment.objects.filter(status='paid', payment_date__isnull=False), 'payment_date',
+    ).annotate(collected=Sum('amount'), paid_count=Count('pk'))
+    for row in [*billed, *collected]:
+        key = (row.pop('franchise'), row.pop('course'), row.pop('period'))
+        totals.setdefault(key, {}).update(row)
+    CollectionsRollup.objects.bulk_create(
+        [
+            CollectionsRollup(franchise_id=franchise_id, course_id=course_id, month=month, **sums)
+            for (franchise_id, course_id, month), sums in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_overviews', '0029_alter_historicalcourseoverview_options'),
+        ('application', '0034_studentsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionsRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('installment_count', models.PositiveIntegerField(default=0)),
+                ('paid_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collections', to='course_overviews.courseoverview')),
+                ('franchise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collections', to='application.franchise')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'franchise'], name='collections_month_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='collectionsrollup',
+            constraint=models.UniqueConstraint(fields=('franchise', 'course', 'month'), name='unique_collections_rollup'),
+        ),
+        migrations.RunPython(fill_collections_rollup, migrations.RunPython.noop),
+    ]
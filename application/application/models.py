@@ -1,7 +1,56 @@
 from django.db import models
+from django.db.models import Count, F, FilteredRelation, Q
 from django.contrib.auth.models import User
+from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
+
+class FranchiseQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Annotate the totals of the franchise's ``FranchiseStats`` row with one join.
+        """
+        return self.annotate(
+            summary=FilteredRelation('stats', condition=Q(stats__batch__isnull=True)),
+        ).annotate(
+            student_count=F('summary__student_count'),
+            batch_count=F('summary__batch_count'),
+            total_outstanding=F('summary__total_outstanding'),
+        )
+
+    def search(self, term):
+        """
+        Return the franchises whose name, location, coordinator or email starts with ``term``.
+
+        Prefix matches can be answered from the indexes on those columns.
+        """
+        return self.filter(
+            Q(name__istartswith=term) | Q(location__istartswith=term)
+            | Q(coordinator__istartswith=term) | Q(email__istartswith=term)
+        )
+
+
+class UserFranchiseQuerySet(models.QuerySet):
+    def students_of(self, franchise):
+        """
+        Return the users registered to ``franchise``, filtered by a subquery rather than a list of ids.
+        """
+        return User.objects.filter(pk__in=self.filter(franchise=franchise).values('user_id'))
+
+    def enrollment_counts_by_course(self, franchise):
+        """
+        Return ``course_id``/``student_count`` rows of the active enrollments of ``franchise``'s students.
+        """
+        return (
+            CourseEnrollment.objects.filter(
+                is_active=True, user_id__in=self.filter(franchise=franchise).values('user_id'),
+            )
+            .values('course_id')
+            .annotate(student_count=Count('user_id', distinct=True))
+            .order_by()
+        )
+
+
 class Franchise(models.Model):
     name = models.CharField(max_length=255)
     coordinator = models.CharField(max_length=255)
@@ -10,6 +59,17 @@ class Franchise(models.Model):
     location = models.CharField(max_length=255, blank=True, null=True)
     registration_date = models.DateField(blank=True, null=True)
 
+    objects = FranchiseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='franchise_name_idx'),
+            models.Index(fields=['location', 'id'], name='franchise_location_idx'),
+            models.Index(fields=['coordinator', 'id'], name='franchise_coordinator_idx'),
+            models.Index(fields=['email', 'id'], name='franchise_email_idx'),
+            models.Index(fields=['registration_date', 'id'], name='franchise_reg_date_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -19,6 +79,13 @@ class UserFranchise(models.Model):
     franchise = models.ForeignKey(Franchise, on_delete=models.SET_NULL, null=True, blank=True)
     batch = models.ForeignKey("Batch", on_delete=models.SET_NULL, null=True, blank=True)
 
+    objects = UserFranchiseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['franchise', 'batch'], name='uf_franchise_batch_idx'),
+        ]
+
     def __str__(self):
         franchise_name = self.franchise.name if self.franchise else "No Franchise"
         batch_name = self.batch.batch_no if self.batch else "No Batch"
@@ -55,6 +122,11 @@ class StudentFeeManagement(models.Model):
     batch_fee_management = models.ForeignKey(BatchFeeManagement, on_delete=models.CASCADE)
     remaining_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['batch_fee_management', 'user_franchise'], name='studentfee_batchfee_uf_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.remaining_amount:
             self.remaining_amount = self.batch_fee_management.remaining_amount
@@ -76,6 +148,16 @@ class Installment(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     payment_date = models.DateField(blank=True, null=True)
     repayment_period_days = models.PositiveIntegerField(default=0)
+    sequence = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student_fee_management', 'sequence'], name='unique_installment_sequence'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='installment_status_due_idx'),
+            models.Index(fields=['student_fee_management', 'due_date'], name='installment_student_due_idx'),
+        ]
 
     def __str__(self):
         return f"Installment {self.id} for {self.student_fee_management} - {self.status}"
@@ -96,4 +178,73 @@ class Payment(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
-        return f"Payment for Installment {self.installment.id}"
\ No newline at end of file
+        return f"Payment for Installment {self.installment.id}"
+
+
+class FranchiseStats(models.Model):
+    """
+    Rollup of a franchise's totals, or of one of its batches when ``batch`` is set.
+
+    Maintained by ``application.stats``; ``batch_count`` is only filled on franchise rows.
+    ``version`` and ``updated_at`` move on every change to the franchise or batch; see ``application.versions``.
+    """
+    franchise = models.ForeignKey(Franchise, on_delete=models.CASCADE, related_name='stats')
+    batch = models.OneToOneField(Batch, on_delete=models.CASCADE, null=True, blank=True, related_name='stats')
+    student_count = models.PositiveIntegerField(default=0)
+    active_enrollment_count = models.PositiveIntegerField(default=0)
+    batch_count = models.PositiveIntegerField(default=0)
+    total_billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_outstanding = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        scope = f"Batch {self.batch_id}" if self.batch_id else "all batches"
+        return f"Stats for {self.franchise_id} ({scope})"
+
+
+class StudentSearchTerm(models.Model):
+    """
+    One normalized word a student can be found by across franchises.
+
+    Maintained by ``application.search`` from the username, email, profile name and phone number.
+    """
+    user_franchise = models.ForeignKey(UserFranchise, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'user_franchise'], name='search_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.user_franchise_id}"
+
+
+class CollectionsRollup(models.Model):
+    """
+    Installment amounts of one franchise and course billed, and collected, in one month.
+
+    Maintained by ``application.analytics``; ``month`` is the first day of the month.
+    """
+    franchise = models.ForeignKey(Franchise, on_delete=models.CASCADE, related_name='collections')
+    course = models.ForeignKey(CourseOverview, on_delete=models.CASCADE, related_name='collections')
+    month = models.DateField()
+    billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    installment_count = models.PositiveIntegerField(default=0)
+    paid_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['franchise', 'course', 'month'], name='unique_collections_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'franchise'], name='collections_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"Collections of {self.franchise_id} in {self.course_id} for {self.month:%Y-%m}"
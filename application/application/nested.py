@@ -0,0 +1,81 @@
+"""
+Resolution of the objects named by the nested franchise/batch/student URLs.
+
+``resolve`` loads the franchise, the batch with its course and fee settings,
+and for student routes the user with their profile, placement and fee record,
+in one joined query. The query only matches when the objects belong together,
+so a batch of another franchise or a student of another batch is a 404. The
+result is kept on the request, so the validators of ``versions`` and the view
+share it.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
+
+from .models import Batch, BatchFeeManagement, Franchise, StudentFeeManagement, UserFranchise
+
+REQUEST_CACHE_ATTRIBUTE = '_application_nested'
+
+
+@dataclass
+class Nested:
+    franchise: Franchise
+    batch: Batch
+    fee_management: Optional[BatchFeeManagement]
+    user: Optional[User] = None
+    user_franchise: Optional[UserFranchise] = None
+    student_fee: Optional[StudentFeeManagement] = None
+
+
+def _related(instance, name):
+    try:
+        return getattr(instance, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def _load_batch(franchise_pk, batch_pk):
+    batch = (
+        Batch.objects.select_related('franchise', 'course', 'fee_management')
+        .filter(pk=batch_pk, franchise_id=franchise_pk).first()
+    )
+    if batch is None:
+        raise Http404("No batch matches the given query.")
+    return Nested(franchise=batch.franchise, batch=batch, fee_management=_related(batch, 'fee_management'))
+
+
+def _load_student(franchise_pk, batch_pk, user_pk):
+    user_franchise = (
+        UserFranchise.objects.select_related(
+            'user', 'user__profile', 'franchise', 'batch', 'batch__course', 'batch__fee_management', 'fee_management',
+        )
+        .filter(user_id=user_pk, franchise_id=franchise_pk, batch_id=batch_pk).first()
+    )
+    if user_franchise is None:
+        raise Http404("No student matches the given query.")
+    batch = user_franchise.batch
+    return Nested(
+        franchise=user_franchise.franchise,
+        batch=batch,
+        fee_management=_related(batch, 'fee_management'),
+        user=user_franchise.user,
+        user_franchise=user_franchise,
+        student_fee=_related(user_franchise, 'fee_management'),
+    )
+
+
+def resolve(request, franchise_pk, batch_pk, user_pk=None):
+    """
+    Return the ``Nested`` objects of the URL, or raise ``Http404`` when they don't belong together.
+    """
+    cache = request.__dict__.setdefault(REQUEST_CACHE_ATTRIBUTE, {})
+    key = (franchise_pk, batch_pk, user_pk)
+    if key not in cache:
+        if user_pk is None:
+            cache[key] = _load_batch(franchise_pk, batch_pk)
+        else:
+            cache[key] = _load_student(franchise_pk, batch_pk, user_pk)
+    return cache[key]
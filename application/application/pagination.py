@@ -0,0 +1,124 @@
+"""
+Keyset (seek) pagination.
+
+Pages are located by the ordering values of the row next to them instead of an
+OFFSET, so fetching any page costs the same however deep it is. Cursors are
+opaque url-safe strings carrying those values and the paging direction.
+The ordering must be unique and non-null; end it with ``pk`` when in doubt.
+Rows may be model instances or ``values()`` dicts holding the ordering keys.
+"""
+import base64
+import binascii
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(values, backwards=False):
+    payload = json.dumps([values, backwards], cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Return ``(values, backwards)`` for ``cursor``, or ``None`` if it is missing or malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        values, backwards = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values, bool(backwards)
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def _fields(ordering):
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def _value(obj, field):
+    if isinstance(obj, dict):
+        return obj[field]
+    for part in field.split('__'):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _seek(fields, values, backwards):
+    condition = Q()
+    for index, (field, descending) in enumerate(fields):
+        lookup = 'lt' if descending != backwards else 'gt'
+        step = Q(**{f'{field}__{lookup}': values[index]})
+        for (previous, _), value in zip(fields[:index], values):
+            step &= Q(**{previous: value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return the ``KeysetPage`` of ``queryset`` ordered by ``ordering`` located by ``cursor``.
+    """
+    fields = _fields(ordering)
+    position = decode_cursor(cursor)
+    if position and len(position[0]) != len(fields):
+        position = None
+    backwards = bool(position and position[1])
+
+    order_by = [('-' if descending != backwards else '') + field for field, descending in fields]
+    if position:
+        queryset = queryset.filter(_seek(fields, position[0], backwards))
+    rows = list(queryset.order_by(*order_by)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows)
+
+    def key(obj):
+        return [_value(obj, field) for field, _ in fields]
+
+    has_next = has_more if not backwards else True
+    has_previous = position is not None if not backwards else has_more
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(key(rows[-1])) if has_next else None,
+        previous_cursor=encode_cursor(key(rows[0]), backwards=True) if has_previous else None,
+    )
@@ -0,0 +1,61 @@
+"""
+Batch roster with enrollment and fee status per student.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, Exists, Min, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from common.djangoapps.student.models import CourseEnrollment
+
+from .models import UserFranchise
+
+INSTALLMENTS = 'fee_management__installments'
+
+
+def _total(installments, status):
+    return Coalesce(
+        Sum(f'{installments}__amount', filter=Q(**{f'{installments}__status': status})),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def fee_annotations(installments=INSTALLMENTS):
+    """
+    Return the fee status aggregates over the installments reached through the ``installments`` lookup.
+    """
+    return {
+        'total_paid': _total(installments, 'paid'),
+        'total_pending': _total(installments, 'pending'),
+        'total_overdue': _total(installments, 'overdue'),
+        'next_due_date': Min(f'{installments}__due_date', filter=~Q(**{f'{installments}__status': 'paid'})),
+    }
+
+
+def roster_annotations(batch):
+    """
+    Return every roster annotation of ``batch`` by name, so callers can add only the ones they need.
+    """
+    return {
+        'is_enrolled': Exists(CourseEnrollment.objects.filter(
+            user_id=OuterRef('user_id'), course_id=batch.course_id, is_active=True,
+        )),
+        **fee_annotations(),
+    }
+
+
+def batch_roster(batch):
+    """
+    Return the ``UserFranchise`` rows of ``batch`` annotated for the roster page.
+
+    Each row carries ``user`` and ``user.profile`` plus ``is_enrolled`` (active in
+    ``batch.course``), ``total_paid``, ``total_pending``, ``total_overdue`` and
+    ``next_due_date``, all fetched in a single query however large the batch is.
+    """
+    return (
+        UserFranchise.objects.filter(batch=batch)
+        .select_related('user', 'user__profile')
+        .annotate(**roster_annotations(batch))
+        .order_by('user__username')
+    )
@@ -0,0 +1,302 @@
+"""
+Installment schedules built from a batch's installment templates.
+
+Covers eager generation of missing schedules, diff-based editing of the
+templates and re-planning of existing schedules after the templates change.
+Schedules are written in chunks with bulk operations. Every generated
+installment carries its position in the schedule as ``sequence``, which is
+unique per student, so running the generation twice or concurrently never
+produces a duplicate schedule.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from common.djangoapps.student.models import CourseEnrollment
+
+from . import analytics, stats
+from .forms import InstallmentTemplateForm
+from .models import BatchFeeManagement, Installment, InstallmentTemplate, StudentFeeManagement, UserFranchise
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class ScheduleResult:
+    students: int = 0
+    installments: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.installments / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class TemplateChangeResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    students: int = 0
+    installments: int = 0
+
+
+def plan_schedule(templates, registration_date):
+    """
+    Return ``(sequence, due_date, template)`` for each template, with due dates accumulated from ``registration_date``.
+    """
+    plan = []
+    cumulative_days = 0
+    for sequence, template in enumerate(templates, start=1):
+        cumulative_days += template.repayment_period_days
+        plan.append((sequence, registration_date + timedelta(days=cumulative_days), template))
+    return plan
+
+
+def registration_dates(course_id, user_ids):
+    """
+    Return ``{user_id: date}`` of the enrollments of ``user_ids`` in ``course_id``.
+    """
+    return {
+        user_id: created.date()
+        for user_id, created in CourseEnrollment.objects.filter(
+            course_id=course_id, user_id__in=user_ids,
+        ).values_list('user_id', 'created')
+        if created
+    }
+
+
+def _ensure_student_fees(fee_management, user_franchises):
+    missing = user_franchises.filter(fee_management__isnull=True).values_list('pk', flat=True)
+    StudentFeeManagement.objects.bulk_create(
+        (
+            StudentFeeManagement(
+                user_franchise_id=user_franchise_id,
+                batch_fee_management=fee_management,
+                remaining_amount=fee_management.remaining_amount,
+            )
+            for user_franchise_id in missing
+        ),
+        batch_size=DEFAULT_CHUNK_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def generate_batch_schedules(batch, user_franchises=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Create the installment schedule of every student of ``batch`` that has none yet.
+
+    ``user_franchises`` narrows the run to some of the batch's students.
+    Students who already have installments are left untouched.
+    """
+    result = ScheduleResult()
+    started = time.monotonic()
+
+    fee_management = BatchFeeManagement.objects.filter(batch=batch).first()
+    if fee_management is None:
+        return result
+    templates = list(InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id'))
+    if not templates:
+        return result
+
+    if user_franchises is None:
+        user_franchises = UserFranchise.objects.all()
+    user_franchises = user_franchises.filter(batch=batch)
+    _ensure_student_fees(fee_management, user_franchises)
+
+    pending = (
+        StudentFeeManagement.objects.filter(
+            batch_fee_management=fee_management, user_franchise__in=user_franchises.values('pk'),
+        )
+        .filter(~Exists(Installment.objects.filter(student_fee_management=OuterRef('pk'))))
+        .order_by('pk')
+        .values_list('pk', 'user_franchise__user_id')
+    )
+    today = timezone.now().date()
+    last_pk = 0
+    while True:
+        chunk = list(pending.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        dates = registration_dates(batch.course_id, [user_id for _, user_id in chunk])
+        installments = [
+            Installment(
+                student_fee_management_id=student_fee_id,
+                sequence=sequence,
+                due_date=due_date,
+                amount=template.amount,
+                repayment_period_days=template.repayment_period_days,
+            )
+            for student_fee_id, user_id in chunk
+            for sequence, due_date, template in plan_schedule(templates, dates.get(user_id, today))
+        ]
+        Installment.objects.bulk_create(installments, ignore_conflicts=True)
+        result.students += len(chunk)
+        result.installments += len(installments)
+
+    if result.installments:
+        stats.refresh_batch(batch.pk)
+        analytics.refresh_batch(batch.pk)
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def generate_schedules(batches, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run ``generate_batch_schedules`` over every batch in ``batches`` and return the combined result.
+    """
+    result = ScheduleResult()
+    started = time.monotonic()
+    for batch in batches:
+        batch_result = generate_batch_schedules(batch, chunk_size=chunk_size)
+        result.students += batch_result.students
+        result.installments += batch_result.installments
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def template_rows_from_post(data):
+    """
+    Return ``(amount, repayment_period_days)`` pairs from the ``installment_amount_<n>`` and
+    ``repayment_period_<n>`` fields of a submitted form, ordered by ``n``.
+
+    Rows removed in the browser leave gaps in the numbering, so every index is
+    read rather than stopping at the first missing one. Each row is validated with
+    ``InstallmentTemplateForm``; incomplete or invalid rows, including amounts that are
+    negative, not finite or too large for the column, are skipped.
+    """
+    indexes = sorted(
+        int(key.rsplit('_', 1)[1]) for key in data
+        if key.startswith('installment_amount_') and key.rsplit('_', 1)[1].isdigit()
+    )
+    rows = []
+    for index in indexes:
+        form = InstallmentTemplateForm({
+            'amount': data.get(f'installment_amount_{index}', ''),
+            'repayment_period_days': data.get(f'repayment_period_{index}', ''),
+        })
+        if form.is_valid():
+            rows.append((form.cleaned_data['amount'], form.cleaned_data['repayment_period_days']))
+    return rows
+
+
+def save_templates(fee_management, rows):
+    """
+    Make the templates of ``fee_management`` match ``rows`` with bulk inserts, updates and deletes.
+
+    Rows are matched to the stored templates by position, so unchanged
+    templates are not touched and keep their ids.
+    """
+    result = TemplateChangeResult()
+    stored = list(InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id'))
+    to_update = []
+    for template, (amount, period) in zip(stored, rows):
+        if template.amount != amount or template.repayment_period_days != period:
+            template.amount, template.repayment_period_days = amount, period
+            to_update.append(template)
+    to_create = [
+        InstallmentTemplate(batch_fee_management=fee_management, amount=amount, repayment_period_days=period)
+        for amount, period in rows[len(stored):]
+    ]
+    to_delete = [template.pk for template in stored[len(rows):]]
+
+    with transaction.atomic():
+        if to_update:
+            InstallmentTemplate.objects.bulk_update(to_update, ['amount', 'repayment_period_days'])
+        if to_create:
+            InstallmentTemplate.objects.bulk_create(to_create)
+        if to_delete:
+            InstallmentTemplate.objects.filter(pk__in=to_delete).delete()
+    result.updated, result.created, result.deleted = len(to_update), len(to_create), len(to_delete)
+    return result
+
+
+def _replan_chunk(student_fees, templates, dates, today):
+    existing = {}
+    for installment in Installment.objects.filter(
+        student_fee_management_id__in=[student_fee_id for student_fee_id, _ in student_fees],
+        sequence__isnull=False,
+    ):
+        existing[(installment.student_fee_management_id, installment.sequence)] = installment
+
+    to_create, to_update, touched = [], [], set()
+    for student_fee_id, user_id in student_fees:
+        plan = plan_schedule(templates, dates.get(user_id, today))
+        for sequence, due_date, template in plan:
+            installment = existing.pop((student_fee_id, sequence), None)
+            if installment is None:
+                to_create.append(Installment(
+                    student_fee_management_id=student_fee_id,
+                    sequence=sequence,
+                    due_date=due_date,
+                    amount=template.amount,
+                    repayment_period_days=template.repayment_period_days,
+                    status='overdue' if due_date < today else 'pending',
+                ))
+                touched.add(student_fee_id)
+                continue
+            if installment.status == 'paid':
+                continue
+            planned = (due_date, template.amount, template.repayment_period_days)
+            status = 'overdue' if due_date < today else 'pending'
+            if (installment.due_date, installment.amount, installment.repayment_period_days) != planned \
+                    or installment.status != status:
+                installment.due_date, installment.amount, installment.repayment_period_days = planned
+                installment.status = status
+                to_update.append(installment)
+                touched.add(student_fee_id)
+
+    # Whatever is left lies beyond the new schedule; paid installments are history and stay.
+    to_delete = [installment for installment in existing.values() if installment.status != 'paid']
+    touched.update(installment.student_fee_management_id for installment in to_delete)
+
+    with transaction.atomic():
+        if to_update:
+            Installment.objects.bulk_update(to_update, ['due_date', 'amount', 'repayment_period_days', 'status'])
+        if to_create:
+            Installment.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_delete:
+            Installment.objects.filter(pk__in=[installment.pk for installment in to_delete]).delete()
+    return len(touched), len(to_update) + len(to_create) + len(to_delete)
+
+
+def replan_batch_schedules(batch, result=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bring the unpaid installments of every student of ``batch`` in line with the current templates.
+
+    Paid installments and installments added by hand are never changed.
+    Students are processed in chunks, each written in one transaction.
+    """
+    result = result or TemplateChangeResult()
+    fee_management = BatchFeeManagement.objects.filter(batch=batch).first()
+    if fee_management is None:
+        return result
+    templates = list(InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id'))
+    _ensure_student_fees(fee_management, UserFranchise.objects.filter(batch=batch))
+
+    student_fees = (
+        StudentFeeManagement.objects.filter(batch_fee_management=fee_management, user_franchise__batch=batch)
+        .order_by('pk')
+        .values_list('pk', 'user_franchise__user_id')
+    )
+    today = timezone.now().date()
+    last_pk = 0
+    while True:
+        chunk = list(student_fees.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        dates = registration_dates(batch.course_id, [user_id for _, user_id in chunk])
+        students, installments = _replan_chunk(chunk, templates, dates, today)
+        result.students += students
+        result.installments += installments
+
+    if result.installments:
+        stats.refresh_batch(batch.pk)
+        analytics.refresh_batch(batch.pk)
+    return result
@@ -0,0 +1,129 @@
+"""
+Search for students across every franchise.
+
+Each student (a ``UserFranchise``) has ``StudentSearchTerm`` rows holding the
+normalized words they can be found by: the username, the email, every word
+of the profile name and the digits of the phone number. A search word
+matches the terms it is a prefix of, which is a range scan of the
+``(term, user_franchise)`` index however many users the LMS has. Every word
+of a query has to match. The terms are rewritten by the model signals when a
+student, their user or their profile is saved, and by ``index_students`` for
+rows written with ``bulk_create``; ``rebuild`` recreates them all.
+
+The matched students are then loaded with their franchise, batch and fee
+record by primary key, so the balance shown is always the current one.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import StudentSearchTerm, UserFranchise
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MIN_TERM_LENGTH = 2
+DEFAULT_CHUNK_SIZE = 1000
+# Local numbers are this long; the part before them is a country or trunk prefix.
+PHONE_DIGITS = 10
+# Sorts after any character a term can hold, so ``[word, word + END)`` is every term starting with word.
+END = '\uffff'
+
+_PHONE = re.compile(r'\+?[\d\s().-]+')
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def terms_for(username, email, name, phone):
+    """
+    Return the set of search terms of a student with these details.
+    """
+    terms = {(username or '').lower(), (email or '').lower(), *(name or '').lower().split()}
+    digits = _digits(phone)
+    if digits:
+        terms.update({digits, digits[-PHONE_DIGITS:]})
+    return {term[:255] for term in terms if term}
+
+
+def _student_terms(user_franchises):
+    rows = user_franchises.values_list(
+        'pk', 'user__username', 'user__email', 'user__profile__name', 'user__profile__phone_number',
+    )
+    return [
+        StudentSearchTerm(user_franchise_id=pk, term=term)
+        for pk, *details in rows
+        for term in sorted(terms_for(*details))
+    ]
+
+
+def index_students(user_franchise_ids=None, user_ids=None):
+    """
+    Rewrite the search terms of the given students, named by ``UserFranchise`` or by user.
+    """
+    user_franchises = UserFranchise.objects.none()
+    if user_franchise_ids:
+        user_franchises = UserFranchise.objects.filter(pk__in=list(user_franchise_ids))
+    elif user_ids:
+        user_franchises = UserFranchise.objects.filter(user_id__in=list(user_ids))
+    terms = _student_terms(user_franchises)
+    with transaction.atomic():
+        StudentSearchTerm.objects.filter(user_franchise__in=user_franchises).delete()
+        StudentSearchTerm.objects.bulk_create(terms)
+
+
+def rebuild(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Recreate the search terms of every student, ``chunk_size`` students per transaction.
+    """
+    StudentSearchTerm.objects.all().delete()
+    indexed, last_pk = 0, 0
+    while True:
+        pks = list(
+            UserFranchise.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not pks:
+            return indexed
+        index_students(user_franchise_ids=pks)
+        indexed += len(pks)
+        last_pk = pks[-1]
+
+
+def query_words(query):
+    """
+    Split ``query`` into normalized search words; a query that looks like a phone number is one word of digits.
+    """
+    query = (query or '').strip()
+    if _PHONE.fullmatch(query):
+        words = [_digits(query)]
+    else:
+        words = query.lower().split()
+    return [word[:255] for word in words if len(word) >= MIN_TERM_LENGTH]
+
+
+def _matching(word):
+    return Q(term__gte=word, term__lt=word + END)
+
+
+def search_students(query, limit=DEFAULT_LIMIT):
+    """
+    Return up to ``limit`` students matching every word of ``query``, with user, profile, franchise, batch and fees.
+    """
+    words = query_words(query)
+    if not words:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+    # The longest word is the most selective one, so it drives the index scan.
+    words.sort(key=len, reverse=True)
+    matches = StudentSearchTerm.objects.filter(_matching(words[0]))
+    for word in words[1:]:
+        matches = matches.filter(Exists(
+            StudentSearchTerm.objects.filter(_matching(word), user_franchise_id=OuterRef('user_franchise_id'))
+        ))
+    ids = list(matches.order_by().values_list('user_franchise_id', flat=True).distinct()[:limit])
+    return list(
+        UserFranchise.objects.filter(pk__in=ids)
+        .select_related('user', 'user__profile', 'franchise', 'batch', 'batch__course', 'fee_management')
+        .order_by('user__username')
+    )
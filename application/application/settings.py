@@ -15,10 +15,18 @@ def root(*args):
     """
     return join(abspath(dirname(__file__)), *args)
 
+
+INSTRUMENTATION_MIDDLEWARE = 'application.middleware.RequestInstrumentationMiddleware'
+
+
 def plugin_settings(settings):
     print("✔ Application settings loaded!")
     settings.FEATURES['ENABLE_APPLICATION'] = True
 
+    if settings.FEATURES.get('ENABLE_APPLICATION_INSTRUMENTATION') and \
+            INSTRUMENTATION_MIDDLEWARE not in settings.MIDDLEWARE:
+        settings.MIDDLEWARE = list(settings.MIDDLEWARE) + [INSTRUMENTATION_MIDDLEWARE]
+
     
 DATABASES = {
     'default': {
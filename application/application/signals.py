@@ -0,0 +1,202 @@
+"""
+Signal handlers keeping derived data in sync with the panel's models.
+"""
+import threading
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from common.djangoapps.student.models import CourseEnrollment, UserProfile
+
+from . import analytics, counters, search, stats, versions
+from .models import (
+    Batch, BatchFeeManagement, Franchise, FranchiseStats, Installment, StudentFeeManagement, UserFranchise,
+)
+
+
+@receiver(post_save, sender=Franchise)
+def franchise_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust('franchises', 1)
+        FranchiseStats.objects.create(franchise=instance)
+    else:
+        versions.bump_franchise(instance.pk)
+
+
+@receiver(post_delete, sender=Franchise)
+def franchise_deleted(sender, instance, **kwargs):
+    counters.adjust('franchises', -1)
+    # Students are detached with a SET_NULL update, which sends no signals.
+    counters.invalidate('students')
+
+
+@receiver(post_save, sender=Batch)
+def batch_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust('batches', 1)
+        FranchiseStats.objects.create(franchise_id=instance.franchise_id, batch=instance)
+        stats.refresh_franchise(instance.franchise_id)
+    else:
+        versions.bump([instance.franchise_id], [instance.pk])
+
+
+@receiver(post_delete, sender=Batch)
+def batch_deleted(sender, instance, **kwargs):
+    counters.adjust('batches', -1)
+    stats.refresh_franchise(instance.franchise_id)
+
+
+@receiver(pre_save, sender=UserFranchise)
+def user_franchise_saving(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = UserFranchise.objects.filter(pk=instance.pk).values_list('franchise_id', 'batch_id').first()
+    instance._previous_franchise_id, instance._previous_batch_id = previous or (None, None)
+
+
+@receiver(post_save, sender=UserFranchise)
+def user_franchise_saved(sender, instance, created, **kwargs):
+    previous_franchise_id = getattr(instance, '_previous_franchise_id', None)
+    previous_batch_id = getattr(instance, '_previous_batch_id', None)
+    counters.adjust('students', int(instance.franchise_id is not None) - int(previous_franchise_id is not None))
+    if created:
+        search.index_students(user_franchise_ids=[instance.pk])
+
+    if (previous_franchise_id, previous_batch_id) == (instance.franchise_id, instance.batch_id) and not created:
+        return
+    for batch_id in {previous_batch_id, instance.batch_id} - {None}:
+        stats.refresh_batch(batch_id)
+    for franchise_id in {previous_franchise_id, instance.franchise_id}:
+        stats.refresh_franchise(franchise_id)
+
+
+@receiver(post_delete, sender=UserFranchise)
+def user_franchise_deleted(sender, instance, **kwargs):
+    if instance.franchise_id is not None:
+        counters.adjust('students', -1)
+    stats.refresh_batch(instance.batch_id)
+    stats.refresh_franchise(instance.franchise_id)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def enrollment_saved(sender, instance, **kwargs):
+    stats.refresh_for_enrollment(instance.user_id, instance.course_id)
+
+
+# Installment changes are collected per thread and applied once the transaction commits, so a
+# request saving many installments refreshes each batch's stats and collections months once.
+_installment_changes = threading.local()
+COLLECTIONS_FIELDS = ('student_fee_management_id', 'due_date', 'payment_date', 'amount', 'status')
+
+
+def _collections_values(instance):
+    return tuple(getattr(instance, name) for name in COLLECTIONS_FIELDS)
+
+
+def _pending():
+    if getattr(_installment_changes, 'student_fees', None) is None:
+        _installment_changes.student_fees = defaultdict(set)
+        _installment_changes.batches = defaultdict(set)
+    return _installment_changes
+
+
+def _apply_installment_changes():
+    pending = _pending()
+    student_fees, batches = pending.student_fees, pending.batches
+    pending.student_fees = pending.batches = None
+    # Every save registers this callback, and changes left behind by a rolled back transaction join the
+    # next commit's: the first call applies them all and the later ones find nothing.
+    if not student_fees and not batches:
+        return
+    batches = defaultdict(set, batches)
+    for student_fee_id, *batch_key in BatchFeeManagement.objects.filter(
+        studentfeemanagement__pk__in=list(student_fees),
+    ).values_list('studentfeemanagement__pk', 'batch_id', 'batch__franchise_id', 'batch__course_id'):
+        batches[tuple(batch_key)] |= student_fees[student_fee_id]
+    with stats.deferred():
+        for batch_id, _, _ in batches:
+            stats.refresh_batch(batch_id)
+    collections = defaultdict(set)
+    for (_, franchise_id, course_id), months in batches.items():
+        collections[(franchise_id, course_id)] |= months
+    for (franchise_id, course_id), months in collections.items():
+        analytics.refresh(franchise_id, course_id, months=months)
+
+
+@receiver(post_init, sender=Installment)
+def installment_loaded(sender, instance, **kwargs):
+    # Snapshot the loaded values without touching deferred fields, which would each cost a query.
+    loaded = instance.pk is not None and all(name in instance.__dict__ for name in COLLECTIONS_FIELDS)
+    instance._collections_values = _collections_values(instance) if loaded else None
+
+
+@receiver(pre_save, sender=Installment)
+def installment_saving(sender, instance, **kwargs):
+    if instance.pk and getattr(instance, '_collections_values', None) is None:
+        instance._collections_values = Installment.objects.filter(pk=instance.pk).values_list(
+            *COLLECTIONS_FIELDS,
+        ).first()
+
+
+@receiver(post_save, sender=Installment)
+def installment_saved(sender, instance, **kwargs):
+    current = _collections_values(instance)
+    previous = getattr(instance, '_collections_values', None)
+    instance._collections_values = current
+    pending = _pending()
+    # The batch stats are refreshed, bumping its pages' versions, whatever changed; the collections
+    # months only when a sum did: the ones the installment leaves and the ones it enters.
+    pending.student_fees[instance.student_fee_management_id] |= set()
+    if previous != current:
+        for student_fee_id, due_date, payment_date, *_ in filter(None, (previous, current)):
+            pending.student_fees[student_fee_id] |= analytics.installment_months(due_date, payment_date)
+    transaction.on_commit(_apply_installment_changes)
+
+
+@receiver(post_delete, sender=Installment)
+def installment_deleted(sender, instance, **kwargs):
+    # Resolved now: when the delete cascades from the student or the batch, the rows are gone by commit time.
+    batch_key = (
+        Batch.objects.filter(fee_management__studentfeemanagement__pk=instance.student_fee_management_id)
+        .values_list('pk', 'franchise_id', 'course_id').first()
+    )
+    if batch_key is None:
+        return
+    _pending().batches[batch_key] |= analytics.installment_months(instance.due_date, instance.payment_date)
+    transaction.on_commit(_apply_installment_changes)
+
+
+@receiver(post_save, sender=BatchFeeManagement)
+def batch_fee_management_saved(sender, instance, **kwargs):
+    versions.bump(batch_ids=[instance.batch_id])
+
+
+@receiver(post_save, sender=StudentFeeManagement)
+def student_fee_management_saved(sender, instance, **kwargs):
+    versions.bump(batch_ids=[instance.batch_fee_management.batch_id])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no page shows.
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    _student_changed(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, **kwargs):
+    _student_changed(instance.user_id)
+
+
+def _student_changed(user_id):
+    # Most LMS users are not placed in any franchise, so one lookup settles it before any write.
+    placement = UserFranchise.objects.filter(user_id=user_id).values_list('pk', 'franchise_id', 'batch_id').first()
+    if placement is None:
+        return
+    user_franchise_id, franchise_id, batch_id = placement
+    versions.bump_user((franchise_id, batch_id))
+    search.index_students(user_franchise_ids=[user_franchise_id])
@@ -0,0 +1,253 @@
+"""
+Maintenance of the ``FranchiseStats`` rollup rows.
+
+A batch row is recomputed from its own students, enrollments and installments,
+and the franchise row is then recomputed from its batch rows, so a write costs
+work proportional to one batch while every read is a single row lookup.
+Rows are created by the model signals and by ``rebuild``; the refresh
+functions only update rows that already exist, and mark them as changed for
+``versions``.
+"""
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from common.djangoapps.student.models import CourseEnrollment
+
+from . import versions
+from .models import Batch, BatchFeeManagement, Franchise, FranchiseStats, Installment, UserFranchise
+
+ZERO = Decimal('0')
+
+_deferred = threading.local()
+
+
+def _fee_totals(installments):
+    totals = installments.aggregate(
+        billed=Sum('amount'),
+        collected=Sum('amount', filter=Q(status='paid')),
+        overdue=Count('pk', filter=Q(status='overdue')),
+    )
+    billed = totals['billed'] or ZERO
+    collected = totals['collected'] or ZERO
+    return {
+        'total_billed': billed,
+        'total_collected': collected,
+        'total_outstanding': billed - collected,
+        'overdue_count': totals['overdue'],
+    }
+
+
+def _batch_totals(batch_id, course_id):
+    totals = {
+        'student_count': UserFranchise.objects.filter(batch_id=batch_id).count(),
+        'active_enrollment_count': CourseEnrollment.objects.filter(
+            course_id=course_id, is_active=True, user__userfranchise__batch_id=batch_id,
+        ).count(),
+    }
+    totals.update(_fee_totals(
+        Installment.objects.filter(student_fee_management__batch_fee_management__batch_id=batch_id)
+    ))
+    return totals
+
+
+def _franchise_totals(franchise_id):
+    totals = FranchiseStats.objects.filter(franchise_id=franchise_id, batch__isnull=False).aggregate(
+        active_enrollment_count=Sum('active_enrollment_count'),
+        total_billed=Sum('total_billed'),
+        total_collected=Sum('total_collected'),
+        total_outstanding=Sum('total_outstanding'),
+        overdue_count=Sum('overdue_count'),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals['student_count'] = UserFranchise.objects.filter(franchise_id=franchise_id).count()
+    totals['batch_count'] = Batch.objects.filter(franchise_id=franchise_id).count()
+    return totals
+
+
+def refresh_franchise(franchise_id):
+    """
+    Recompute the franchise row of ``franchise_id`` from its batch rows.
+    """
+    if franchise_id is None:
+        return
+    if getattr(_deferred, 'franchise_ids', None) is not None:
+        _deferred.franchise_ids.add(franchise_id)
+        return
+    FranchiseStats.objects.filter(franchise_id=franchise_id, batch__isnull=True).update(
+        **_franchise_totals(franchise_id), **versions.changed()
+    )
+
+
+def refresh_batch(batch_id):
+    """
+    Recompute the row of ``batch_id`` and then its franchise row.
+    """
+    if batch_id is None:
+        return
+    if getattr(_deferred, 'batch_ids', None) is not None:
+        _deferred.batch_ids.add(batch_id)
+        return
+    batch = Batch.objects.filter(pk=batch_id).values('franchise_id', 'course_id').first()
+    if batch is None:
+        return
+    with transaction.atomic():
+        FranchiseStats.objects.filter(batch_id=batch_id).update(
+            **_batch_totals(batch_id, batch['course_id']), **versions.changed()
+        )
+        refresh_franchise(batch['franchise_id'])
+
+
+@contextmanager
+def deferred():
+    """
+    Collect the batch and franchise refreshes requested inside the block and run each once when it ends.
+
+    For loops that go through APIs sending a signal per row, such as the LMS enrollment API.
+    """
+    if getattr(_deferred, 'batch_ids', None) is not None:
+        yield
+        return
+    _deferred.batch_ids, _deferred.franchise_ids = set(), set()
+    try:
+        yield
+    finally:
+        batch_ids, franchise_ids = _deferred.batch_ids, _deferred.franchise_ids
+        _deferred.batch_ids = _deferred.franchise_ids = None
+        for batch_id in sorted(batch_ids):
+            refresh_batch(batch_id)
+        franchise_ids -= set(Batch.objects.filter(pk__in=batch_ids).values_list('franchise_id', flat=True))
+        for franchise_id in sorted(franchise_ids):
+            refresh_franchise(franchise_id)
+
+
+def refresh_overdue_counts(batch_ids):
+    """
+    Recompute only ``overdue_count`` on the rows of ``batch_ids`` and of their franchises.
+
+    Enough after installments move between pending and overdue, which changes no amounts.
+    """
+    batch_ids = list(batch_ids)
+    if not batch_ids:
+        return
+    overdue = dict(
+        Installment.objects.filter(
+            status='overdue', student_fee_management__batch_fee_management__batch_id__in=batch_ids,
+        ).values_list('student_fee_management__batch_fee_management__batch_id').annotate(n=Count('pk'))
+    )
+    with transaction.atomic():
+        rows = list(FranchiseStats.objects.filter(batch_id__in=batch_ids))
+        for row in rows:
+            row.overdue_count = overdue.get(row.batch_id, 0)
+        FranchiseStats.objects.bulk_update(rows, ['overdue_count', *versions.mark_changed(rows)])
+        franchise_ids = {row.franchise_id for row in rows}
+        totals = dict(
+            FranchiseStats.objects.filter(franchise_id__in=franchise_ids, batch__isnull=False)
+            .values_list('franchise_id').annotate(n=Sum('overdue_count'))
+        )
+        summaries = list(FranchiseStats.objects.filter(franchise_id__in=franchise_ids, batch__isnull=True))
+        for row in summaries:
+            row.overdue_count = totals.get(row.franchise_id) or 0
+        FranchiseStats.objects.bulk_update(summaries, ['overdue_count', *versions.mark_changed(summaries)])
+
+
+def refresh_for_enrollment(user_id, course_id):
+    """
+    Refresh the batch affected by a change to the enrollment of ``user_id`` in ``course_id``.
+
+    The franchise report counts its students' enrollments in every course, so
+    an enrollment in another course still marks the franchise row as changed.
+    """
+    placement = (
+        UserFranchise.objects.filter(user_id=user_id)
+        .values_list('franchise_id', 'batch_id', 'batch__course_id').first()
+    )
+    if placement is None:
+        return
+    franchise_id, batch_id, batch_course_id = placement
+    if batch_id is not None and batch_course_id == course_id:
+        refresh_batch(batch_id)
+    else:
+        versions.bump(franchise_ids=[franchise_id])
+
+
+def batch_id_for_student_fee(student_fee_management_id):
+    """
+    Return the id of the batch a ``StudentFeeManagement`` bills against.
+    """
+    return (
+        BatchFeeManagement.objects.filter(studentfeemanagement__pk=student_fee_management_id)
+        .values_list('batch_id', flat=True).first()
+    )
+
+
+def _rebuild_franchise(franchise_id):
+    batches = list(Batch.objects.filter(franchise_id=franchise_id).values_list('pk', flat=True))
+    students = dict(
+        UserFranchise.objects.filter(batch__franchise_id=franchise_id)
+        .values_list('batch_id').annotate(n=Count('pk'))
+    )
+    enrollments = dict(
+        CourseEnrollment.objects.filter(
+            is_active=True,
+            user__userfranchise__batch__franchise_id=franchise_id,
+            course_id=F('user__userfranchise__batch__course_id'),
+        ).values_list('user__userfranchise__batch_id').annotate(n=Count('pk'))
+    )
+    fees = {
+        row['batch_id']: row
+        for row in Installment.objects.filter(
+            student_fee_management__batch_fee_management__batch__franchise_id=franchise_id,
+        ).values(batch_id=F('student_fee_management__batch_fee_management__batch_id')).annotate(
+            billed=Sum('amount'),
+            collected=Sum('amount', filter=Q(status='paid')),
+            overdue=Count('pk', filter=Q(status='overdue')),
+        )
+    }
+
+    rows = []
+    for batch_id in batches:
+        billed = fees.get(batch_id, {}).get('billed') or ZERO
+        collected = fees.get(batch_id, {}).get('collected') or ZERO
+        rows.append(FranchiseStats(
+            franchise_id=franchise_id,
+            batch_id=batch_id,
+            student_count=students.get(batch_id, 0),
+            active_enrollment_count=enrollments.get(batch_id, 0),
+            total_billed=billed,
+            total_collected=collected,
+            total_outstanding=billed - collected,
+            overdue_count=fees.get(batch_id, {}).get('overdue') or 0,
+        ))
+
+    with transaction.atomic():
+        FranchiseStats.objects.filter(franchise_id=franchise_id).delete()
+        FranchiseStats.objects.bulk_create(rows)
+        FranchiseStats.objects.create(franchise_id=franchise_id, **_franchise_totals(franchise_id))
+
+
+def rebuild(franchise_ids=None):
+    """
+    Recompute the rollup rows of ``franchise_ids`` (every franchise by default) from the source tables.
+    """
+    if franchise_ids is None:
+        franchise_ids = list(Franchise.objects.values_list('pk', flat=True))
+    rebuilt = 0
+    for franchise_id in franchise_ids:
+        _rebuild_franchise(franchise_id)
+        rebuilt += 1
+    return rebuilt
+
+
+def get_franchise_stats(franchise):
+    """
+    Return the franchise row for ``franchise``, rebuilding the franchise if it has none yet.
+    """
+    stats = FranchiseStats.objects.filter(franchise=franchise, batch__isnull=True).first()
+    if stats is None:
+        _rebuild_franchise(franchise.pk)
+        stats = FranchiseStats.objects.get(franchise=franchise, batch__isnull=True)
+    return stats
@@ -0,0 +1,36 @@
+"""
+``{% fragment name generation [vary_on ...] %}...{% endfragment %}`` caches its content with ``fragments``.
+"""
+from django import template
+
+from .. import fragments
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, generation, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.generation = generation
+        self.vary_on = vary_on
+
+    def render(self, context):
+        return fragments.get_or_set(
+            self.name.resolve(context),
+            self.generation.resolve(context),
+            lambda: self.nodelist.render(context),
+            *(variable.resolve(context) for variable in self.vary_on),
+        )
+
+
+@register.tag
+def fragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a name and a generation.")
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(nodelist, *(parser.compile_filter(bit) for bit in bits[1:3]),
+                        [parser.compile_filter(bit) for bit in bits[3:]])
@@ -1,20 +1,32 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'application'
 
 urlpatterns = [
     path('home/', views.homepage, name='homepage'),
+    path('metrics/', views.metrics, name='metrics'),
     path('franchises/', views.franchise_list, name='franchise_list'),
     path('franchise/register/', views.franchise_register, name='franchise_register'),
     path('franchise/<int:pk>/edit/', views.franchise_edit, name='franchise_edit'),
     path('franchise/<int:pk>/report/', views.franchise_report, name='franchise_report'),
+    path('franchise/<int:pk>/export/<str:dataset>/', views.franchise_export, name='franchise_export'),
     path('franchise/<int:pk>/batch/add/', views.batch_create, name='batch_create'),
+    path('analytics/collections/', views.collections_dashboard, name='collections_dashboard'),
+    path('students/search/', views.student_search, name='student_search'),
+    path('courses/search/', views.course_search, name='course_search'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/students/', views.batch_students, name='batch_students'),
+    path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/enrollment/', views.batch_enrollment, name='batch_enrollment'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student/<int:user_pk>/', views.student_detail, name='student_detail'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student/<int:user_pk>/edit/', views.edit_student_details, name='edit_student_details'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/register/', views.batch_user_register, name='batch_user_register'),
+    path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/import/', views.batch_student_import, name='batch_student_import'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/fee-management/', views.batch_fee_management, name='batch_fee_management'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/', views.student_fee_management, name='student_fee_management'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/edit-installment/', views.edit_installment_setup, name='edit_installment_setup'),
+    path(f'api/{api.VERSION}/franchises/', api.franchises, name='api_franchises'),
+    path(f'api/{api.VERSION}/franchises/<int:pk>/batches/', api.batches, name='api_batches'),
+    path(f'api/{api.VERSION}/franchises/<int:franchise_pk>/batches/<int:batch_pk>/students/', api.roster, name='api_roster'),
+    path(f'api/{api.VERSION}/franchises/<int:franchise_pk>/batches/<int:batch_pk>/students/<int:user_pk>/fees/', api.fee_summary, name='api_fee_summary'),
+    path(f'api/{api.VERSION}/franchises/<int:franchise_pk>/batches/<int:batch_pk>/students/<int:user_pk>/installments/', api.installments, name='api_installments'),
 ]
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Change versions of franchises and batches, and HTTP validators built from them.
+
+Every ``FranchiseStats`` row carries a ``version`` that is incremented, and an
+``updated_at`` that is set, whenever the franchise or batch it describes
+changes: ``stats`` bumps the rows it refreshes, and the signal handlers bump
+them for edits that leave the totals alone. The report views derive their
+``ETag`` and ``Last-Modified`` from the row with a single query, so a page that
+has not changed since the browser last fetched it is answered with
+``304 Not Modified`` before any report query runs. The same row, read once
+per request, is the generation under which ``fragments`` caches the parts of
+the pages that did have to be rendered.
+"""
+import hashlib
+
+from django.contrib import messages
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import FranchiseStats
+
+REQUEST_CACHE_ATTRIBUTE = '_application_versions'
+
+
+def changed():
+    """
+    Return the ``update()`` arguments marking rows as changed.
+    """
+    return {'version': F('version') + 1, 'updated_at': timezone.now()}
+
+
+def mark_changed(rows):
+    """
+    Mark the ``FranchiseStats`` instances ``rows`` as changed before a ``bulk_update``.
+    """
+    now = timezone.now()
+    for row in rows:
+        row.version += 1
+        row.updated_at = now
+    return ['version', 'updated_at']
+
+
+def bump(franchise_ids=(), batch_ids=()):
+    """
+    Mark the franchise rows of ``franchise_ids`` and the rows of ``batch_ids`` as changed.
+    """
+    franchise_ids = {pk for pk in franchise_ids if pk is not None}
+    batch_ids = {pk for pk in batch_ids if pk is not None}
+    if not franchise_ids and not batch_ids:
+        return
+    FranchiseStats.objects.filter(
+        Q(franchise_id__in=franchise_ids, batch__isnull=True) | Q(batch_id__in=batch_ids)
+    ).update(**changed())
+
+
+def bump_franchise(franchise_id):
+    """
+    Mark every row of ``franchise_id`` as changed, for edits shown on all of its pages.
+    """
+    FranchiseStats.objects.filter(franchise_id=franchise_id).update(**changed())
+
+
+def bump_user(placement):
+    """
+    Mark the franchise and batch of a student's ``(franchise_id, batch_id)`` placement as changed.
+    """
+    franchise_id, batch_id = placement
+    bump([franchise_id], [batch_id])
+
+
+def _row(request, franchise_id, batch_id=None):
+    """
+    Return ``(version, updated_at)`` of the row for the franchise or batch, read once per request.
+    """
+    cache = request.__dict__.setdefault(REQUEST_CACHE_ATTRIBUTE, {})
+    key = (franchise_id, batch_id)
+    if key not in cache:
+        rows = FranchiseStats.objects.filter(franchise_id=franchise_id)
+        rows = rows.filter(batch_id=batch_id) if batch_id else rows.filter(batch__isnull=True)
+        cache[key] = rows.values_list('version', 'updated_at').first()
+    return cache[key]
+
+
+def generation(request, franchise_id, batch_id=None):
+    """
+    Return a string identifying the current state of the franchise or batch, or ``None`` if it has no row yet.
+    """
+    row = _row(request, franchise_id, batch_id)
+    return f'{franchise_id}-{batch_id}-{row[0]}-{row[1].timestamp()}' if row else None
+
+
+def _validates(request):
+    # A page showing flash messages must be rendered, or the messages would stay queued.
+    return request.method in ('GET', 'HEAD') and not len(messages.get_messages(request))
+
+
+def _etag(request, franchise_id, batch_id=None, *extra):
+    row = _row(request, franchise_id, batch_id) if _validates(request) else None
+    if row is None:
+        return None
+    # Pages embed the user and their CSRF token, so those are part of the representation.
+    identity = (franchise_id, batch_id, *extra, *row, request.user.pk, request.META.get('CSRF_COOKIE'))
+    return hashlib.md5(repr(identity).encode(), usedforsecurity=False).hexdigest()
+
+
+def _last_modified(request, franchise_id, batch_id=None):
+    row = _row(request, franchise_id, batch_id) if _validates(request) else None
+    return row[1] if row else None
+
+
+def franchise_etag(request, pk):
+    return _etag(request, pk)
+
+
+def franchise_last_modified(request, pk):
+    return _last_modified(request, pk)
+
+
+def batch_etag(request, franchise_pk, batch_pk, user_pk=None):
+    return _etag(request, franchise_pk, batch_pk, user_pk)
+
+
+def batch_last_modified(request, franchise_pk, batch_pk, user_pk=None):
+    return _last_modified(request, franchise_pk, batch_pk)
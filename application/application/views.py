@@ -1,16 +1,31 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.models import User
-from .forms import FranchiseForm, BatchForm, FranchiseUserRegistrationForm, BatchFeeManagementForm, StudentFeeManagementForm, InstallmentForm, PaymentForm, StudentEditForm
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.contrib import messages
+from .forms import FranchiseForm, BatchForm, FranchiseUserRegistrationForm, BatchFeeManagementForm, StudentFeeManagementForm, InstallmentForm, PaymentForm, StudentEditForm, StudentImportForm
+from .bulk_import import DEFAULT_MAX_UPLOAD_ROWS, import_students
+from .counters import get_counters
+from .courses import DEFAULT_LIMIT as COURSE_SEARCH_LIMIT, search_courses
+from . import analytics, directory, exports, fragments, nested, versions
+from .enrollments import ACTIONS as ENROLLMENT_ACTIONS, change_batch_enrollment
+from .installments import apply_status_changes, status_changes_from_post
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics, scrape_allowed
+from .roster import batch_roster
+from .search import DEFAULT_LIMIT as STUDENT_SEARCH_LIMIT, search_students
+from .schedules import generate_batch_schedules, replan_batch_schedules, save_templates, template_rows_from_post
+from .pagination import DEFAULT_PAGE_SIZE, keyset_paginate, parse_page_size
+from .stats import get_franchise_stats
 from .models import Franchise, UserFranchise, Batch, BatchFeeManagement, StudentFeeManagement, Installment, InstallmentTemplate
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from collections import defaultdict
-from django.db.models import Count
+from django.db.models import Q
 from django.urls import reverse
 from django.forms import modelformset_factory
-from datetime import timedelta
-from django.utils import timezone
 from django.db import OperationalError, transaction
 from time import sleep
+import codecs
 
 from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
@@ -20,25 +35,60 @@ def superuser_required(view_func):
     return user_passes_test(lambda u: u.is_superuser)(view_func)
 
 
+def _cursor_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f"?{params.urlencode()}"
+
+
 @login_required
 @superuser_required
 def homepage(request):
-    total_franchises = Franchise.objects.count()
-    total_students = User.objects.count()
-    total_courses = CourseOverview.objects.count()
-    
+    totals = get_counters()
+
     return render(request, 'application/homepage.html', {
-        'total_franchises': total_franchises,
-        'total_students': total_students,
-        'total_courses': total_courses
+        'total_franchises': totals['franchises'],
+        'total_students': totals['students'],
+        'total_courses': totals['courses'],
+        'total_batches': totals['batches'],
     })
 
 
+def metrics(request):
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+
 @login_required
 @superuser_required
 def franchise_list(request):
-    franchises = Franchise.objects.all()
-    return render(request, 'application/franchise_management.html', {'franchises': franchises})
+    query = request.GET.get('q', '').strip()
+    sort, descending = directory.parse_sort(request.GET.get('sort'))
+    page_size = parse_page_size(
+        request.GET.get('page_size'), default=getattr(settings, 'APPLICATION_FRANCHISE_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    )
+    page = directory.franchise_page(query, request.GET.get('sort'), request.GET.get('cursor'), page_size)
+
+    sort_urls = {}
+    for key in directory.SORTS:
+        params = request.GET.copy()
+        params.pop('cursor', None)
+        params['sort'] = f'-{key}' if key == sort and not descending else key
+        sort_urls[key] = f"?{params.urlencode()}"
+
+    return render(request, 'application/franchise_management.html', {
+        'franchises': page.object_list,
+        'page': page,
+        'query': query,
+        'sort': sort,
+        'descending': descending,
+        'sort_urls': sort_urls,
+        'next_url': _cursor_url(request, page.next_cursor),
+        'previous_url': _cursor_url(request, page.previous_cursor),
+    })
 
 
 @login_required
@@ -73,39 +123,74 @@ def franchise_edit(request, pk):
 
 @login_required
 @superuser_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=versions.franchise_etag, last_modified_func=versions.franchise_last_modified)
 def franchise_report(request, pk):
     franchise = get_object_or_404(Franchise, pk=pk)
-
-    student_ids = list(
-        UserFranchise.objects.filter(franchise=franchise).values_list('user_id', flat=True)
+    generation = versions.generation(request, franchise.pk)
+
+    def summary():
+        course_student_map = {
+            row['course_id']: row['student_count']
+            for row in UserFranchise.objects.enrollment_counts_by_course(franchise)
+        }
+        courses = list(CourseOverview.objects.filter(id__in=course_student_map.keys()))
+        for course in courses:
+            course.student_count = course_student_map.get(course.id, 0)
+        return {'stats': get_franchise_stats(franchise), 'courses': courses}
+
+    query = request.GET.get('q', '').strip()
+    cursor = request.GET.get('cursor')
+    page_size = parse_page_size(
+        request.GET.get('page_size'), default=getattr(settings, 'APPLICATION_REPORT_PAGE_SIZE', DEFAULT_PAGE_SIZE)
     )
-    enrollments = CourseEnrollment.objects.filter(
-        user_id__in=student_ids,
-        is_active=True
-    )
-
-    course_counts = (
-        enrollments.values('course_id')
-        .annotate(student_count=Count('user_id', distinct=True))
-    )
-    course_student_map = {row['course_id']: row['student_count'] for row in course_counts}
-    courses = list(CourseOverview.objects.filter(id__in=course_student_map.keys()))
 
-    for course in courses:
-        course.student_count = course_student_map.get(course.id, 0)
+    def students_page():
+        students = UserFranchise.objects.students_of(franchise).select_related('profile')
+        if query:
+            students = students.filter(
+                Q(username__icontains=query) | Q(email__icontains=query) | Q(first_name__icontains=query)
+                | Q(last_name__icontains=query) | Q(profile__name__icontains=query)
+            )
+        return keyset_paginate(students, ('username',), cursor, page_size)
 
-    users = list(User.objects.filter(id__in=student_ids).order_by('username'))
+    context = fragments.get_or_set('franchise_summary', generation, summary)
+    page = fragments.get_or_set('franchise_students', generation, students_page, query, cursor, page_size)
 
-    batches = Batch.objects.filter(franchise=franchise).select_related('course')
+    # Only evaluated when the batches fragment is not cached.
+    batches = Batch.objects.filter(franchise=franchise).select_related('course', 'stats')
 
     return render(request, 'application/franchise_report.html', {
         'franchise': franchise,
-        'courses': courses,
-        'users': users,
+        'generation': generation,
+        'stats': context['stats'],
+        'courses': context['courses'],
+        'users': page.object_list,
+        'page': page,
+        'query': query,
+        'next_url': _cursor_url(request, page.next_cursor),
+        'previous_url': _cursor_url(request, page.previous_cursor),
         'batches': batches,
+        'export_datasets': list(exports.EXPORTS),
     })
 
 
+@login_required
+@superuser_required
+def franchise_export(request, pk, dataset):
+    franchise = get_object_or_404(Franchise, pk=pk)
+    output_format = request.GET.get('format', 'csv')
+    if dataset not in exports.EXPORTS or output_format not in exports.FORMATS:
+        raise Http404("Unknown export")
+
+    response = StreamingHttpResponse(
+        exports.stream(franchise, dataset, output_format),
+        content_type=exports.FORMATS[output_format][0],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exports.filename(franchise, dataset, output_format)}"'
+    return response
+
+
 @login_required
 @superuser_required
 def batch_create(request, pk):
@@ -133,51 +218,85 @@ def batch_create(request, pk):
 
 @login_required
 @superuser_required
+def course_search(request):
+    limit = parse_page_size(request.GET.get('limit'), default=COURSE_SEARCH_LIMIT)
+    return JsonResponse({'results': search_courses(request.GET.get('q'), limit)})
+
+
+@login_required
+@superuser_required
+def collections_dashboard(request):
+    months = analytics.recent_months(getattr(settings, 'APPLICATION_COLLECTIONS_MONTHS', analytics.DEFAULT_MONTHS))
+    franchise = None
+    if request.GET.get('franchise', '').isdigit():
+        franchise = get_object_or_404(Franchise, pk=request.GET['franchise'])
+    monthly = analytics.monthly_totals(months, franchise.pk if franchise else None)
+    return render(request, 'application/collections_dashboard.html', {
+        'franchise': franchise,
+        'months': monthly,
+        'total': analytics.overall(monthly),
+        'franchises': analytics.franchise_totals(months),
+    })
+
+
+@login_required
+@superuser_required
+def student_search(request):
+    query = request.GET.get('q', '').strip()
+    limit = parse_page_size(request.GET.get('limit'), default=STUDENT_SEARCH_LIMIT)
+    return render(request, 'application/student_search.html', {
+        'query': query,
+        'students': search_students(query, limit),
+    })
+
+
+@login_required
+@superuser_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=versions.batch_etag, last_modified_func=versions.batch_last_modified)
 def batch_students(request, franchise_pk, batch_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
+    objects = nested.resolve(request, franchise_pk, batch_pk)
+    franchise, batch = objects.franchise, objects.batch
 
-    user_franchises = UserFranchise.objects.filter(franchise=franchise, batch=batch).select_related('user')
-    users = [uf.user for uf in user_franchises]
+    # Only evaluated when the roster fragment is not cached.
+    roster = batch_roster(batch).filter(franchise=franchise)
 
     return render(request, 'application/batch_students.html', {
         'franchise': franchise,
         'batch': batch,
-        'users': users,
+        'generation': versions.generation(request, franchise.pk, batch.pk),
+        'roster': roster,
     })
 
 
 @login_required
 @superuser_required
-def student_detail(request, franchise_pk, batch_pk, user_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
-    user = get_object_or_404(User, pk=user_pk)
+@require_POST
+def batch_enrollment(request, franchise_pk, batch_pk):
+    objects = nested.resolve(request, franchise_pk, batch_pk)
+    action = request.POST.get('action')
+    if action not in ENROLLMENT_ACTIONS:
+        return HttpResponseBadRequest("Unknown enrollment action")
+
+    result = change_batch_enrollment(objects.batch, action)
+    message = f"{action.capitalize()}ed {result.changed} of {result.pending} students."
+    if result.failed:
+        messages.warning(request, f"{message} {len(result.failed)} failed; submit again to retry them.")
+    else:
+        messages.success(request, message)
+    return redirect('application:batch_students', franchise_pk=objects.franchise.pk, batch_pk=objects.batch.pk)
 
-    user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
 
-    fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
-    student_fee, created = StudentFeeManagement.objects.get_or_create(
-        user_franchise=user_franchise,
-        defaults={'batch_fee_management': fee_management}
-    )
-
-    enrollment = CourseEnrollment.objects.get(user=user, course_id=batch.course.id)
-    registration_date = enrollment.created.date()
-
-    if not Installment.objects.filter(student_fee_management=student_fee).exists():
-        templates = InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id')
-        cumulative_days = 0
-        for template in templates:
-            cumulative_days += template.repayment_period_days
-            due_date = registration_date + timedelta(days=cumulative_days)
-
-            Installment.objects.create(
-                student_fee_management=student_fee,
-                due_date=due_date,
-                amount=template.amount,
-                repayment_period_days=template.repayment_period_days
-            )
+@login_required
+@superuser_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=versions.batch_etag, last_modified_func=versions.batch_last_modified)
+def student_detail(request, franchise_pk, batch_pk, user_pk):
+    objects = nested.resolve(request, franchise_pk, batch_pk, user_pk)
+    franchise, batch, user, user_franchise = objects.franchise, objects.batch, objects.user, objects.user_franchise
+    fee_management, student_fee = objects.fee_management, objects.student_fee
+    if fee_management is None:
+        raise Http404("No BatchFeeManagement matches the given query.")
 
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -189,7 +308,9 @@ def student_detail(request, franchise_pk, batch_pk, user_pk):
                 CourseEnrollment.unenroll(user, batch.course.id)
         return redirect('application:student_detail', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk)
 
-    existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
+    existing_installments = []
+    if student_fee:
+        existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
     installments = [{'installment': inst} for inst in existing_installments]
 
     is_enrolled = CourseEnrollment.is_enrolled(user, batch.course.id)
@@ -209,9 +330,8 @@ def student_detail(request, franchise_pk, batch_pk, user_pk):
 @login_required
 @superuser_required
 def edit_student_details(request, franchise_pk, batch_pk, user_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
-    user = get_object_or_404(User, pk=user_pk)
+    objects = nested.resolve(request, franchise_pk, batch_pk, user_pk)
+    franchise, batch, user = objects.franchise, objects.batch, objects.user
 
     if request.method == "POST":
         form = StudentEditForm(request.POST, instance=user)
@@ -232,8 +352,8 @@ def edit_student_details(request, franchise_pk, batch_pk, user_pk):
 @login_required
 @superuser_required
 def batch_user_register(request, franchise_pk, batch_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
+    objects = nested.resolve(request, franchise_pk, batch_pk)
+    franchise, batch = objects.franchise, objects.batch
 
     if request.method == "POST":
         form = FranchiseUserRegistrationForm(request.POST)
@@ -244,6 +364,7 @@ def batch_user_register(request, franchise_pk, batch_pk):
             user_franchise = UserFranchise.objects.get(user=user, franchise=franchise)
             user_franchise.batch = batch
             user_franchise.save()
+            generate_batch_schedules(batch, UserFranchise.objects.filter(pk=user_franchise.pk))
             
             return redirect('application:batch_students', franchise_pk=franchise.pk, batch_pk=batch.pk)
     else:
@@ -258,11 +379,48 @@ def batch_user_register(request, franchise_pk, batch_pk):
 
 @login_required
 @superuser_required
-def batch_fee_management(request, franchise_pk, batch_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
+def batch_student_import(request, franchise_pk, batch_pk):
+    objects = nested.resolve(request, franchise_pk, batch_pk)
+    franchise, batch = objects.franchise, objects.batch
+    result = None
+
+    if request.method == "POST":
+        form = StudentImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            csv_file = form.cleaned_data['csv_file']
+            max_rows = getattr(settings, 'APPLICATION_IMPORT_MAX_UPLOAD_ROWS', DEFAULT_MAX_UPLOAD_ROWS)
+            # Counted in lines, header excluded, before anything is hashed or written.
+            rows = sum(1 for line in csv_file if line.strip()) - 1
+            csv_file.seek(0)
+            if rows > max_rows:
+                form.add_error('csv_file', (
+                    f"The file lists {rows} students; uploads are limited to {max_rows}. "
+                    "Import larger files with the import_batch_students management command."
+                ))
+            else:
+                try:
+                    # Hashed in this process: a web worker must not fork a pool.
+                    result = import_students(codecs.iterdecode(csv_file, 'utf-8-sig'), franchise, batch, workers=1)
+                except (ValueError, UnicodeDecodeError) as exc:
+                    form.add_error('csv_file', str(exc))
+    else:
+        form = StudentImportForm()
 
-    fee_management, created = BatchFeeManagement.objects.get_or_create(batch=batch)
+    return render(request, 'application/batch_student_import.html', {
+        'form': form,
+        'franchise': franchise,
+        'batch': batch,
+        'result': result,
+    })
+
+
+@login_required
+@superuser_required
+def batch_fee_management(request, franchise_pk, batch_pk):
+    objects = nested.resolve(request, franchise_pk, batch_pk)
+    franchise, batch, fee_management = objects.franchise, objects.batch, objects.fee_management
+    if fee_management is None:
+        fee_management, created = BatchFeeManagement.objects.get_or_create(batch=batch)
 
     if request.method == "POST":
         action = request.POST.get("action")
@@ -274,19 +432,17 @@ def batch_fee_management(request, franchise_pk, batch_pk):
             return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
 
         elif action == "save_installments":
-            InstallmentTemplate.objects.filter(batch_fee_management=fee_management).delete()
-
-            installment_count = 0
-            while f'installment_amount_{installment_count + 1}' in request.POST:
-                installment_count += 1
-                amount = request.POST.get(f'installment_amount_{installment_count}')
-                period = request.POST.get(f'repayment_period_{installment_count}')
-                if amount and period:
-                    InstallmentTemplate.objects.create(
-                        batch_fee_management=fee_management,
-                        amount=amount,
-                        repayment_period_days=period
-                    )
+            result = save_templates(fee_management, template_rows_from_post(request.POST))
+            if request.POST.get('replan'):
+                replan_batch_schedules(batch, result)
+            else:
+                generated = generate_batch_schedules(batch)
+                result.students, result.installments = generated.students, generated.installments
+            messages.success(
+                request,
+                f"Templates: {result.created} added, {result.updated} updated, {result.deleted} removed. "
+                f"Schedules: {result.installments} installments changed for {result.students} students."
+            )
             return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
 
     else:
@@ -306,39 +462,23 @@ def batch_fee_management(request, franchise_pk, batch_pk):
 @login_required
 @superuser_required
 def student_fee_management(request, franchise_pk, batch_pk, user_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
-    user = get_object_or_404(User, pk=user_pk)
-
-    fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
-    user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
-
-    student_fee, created = StudentFeeManagement.objects.get_or_create(
-        user_franchise=user_franchise,
-        defaults={'batch_fee_management': fee_management}
-    )
+    objects = nested.resolve(request, franchise_pk, batch_pk, user_pk)
+    franchise, batch, user, user_franchise = objects.franchise, objects.batch, objects.user, objects.user_franchise
+    fee_management, student_fee = objects.fee_management, objects.student_fee
+    if fee_management is None:
+        raise Http404("No BatchFeeManagement matches the given query.")
+
+    if student_fee is None:
+        student_fee, created = StudentFeeManagement.objects.get_or_create(
+            user_franchise=user_franchise,
+            defaults={'batch_fee_management': fee_management}
+        )
 
     enrollment = CourseEnrollment.objects.get(user=user, course_id=batch.course.id)
     registration_date = enrollment.created.date()
 
     if request.method == "POST":
-        existing_installments = Installment.objects.filter(student_fee_management=student_fee)
-        for installment in existing_installments:
-            status_key = f'status_{installment.id}'
-            if status_key in request.POST:
-                new_status = request.POST[status_key]
-                if new_status in ['pending', 'paid', 'overdue']:
-                    installment.status = new_status
-                    if new_status == 'paid' and not installment.payment_date:
-                        installment.payment_date = timezone.now().date()
-                    elif new_status != 'paid':
-                        installment.payment_date = None
-                    installment.save()
-
-        total_paid = sum(inst.amount for inst in Installment.objects.filter(student_fee_management=student_fee, status='paid'))
-        student_fee.remaining_amount = fee_management.remaining_amount - total_paid
-        student_fee.save()
-
+        apply_status_changes(student_fee, fee_management, status_changes_from_post(request.POST))
         return redirect('application:student_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk)
 
     existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
@@ -362,13 +502,10 @@ def student_fee_management(request, franchise_pk, batch_pk, user_pk):
 @login_required
 @superuser_required
 def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
-    franchise = get_object_or_404(Franchise, pk=franchise_pk)
-    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
-    user = get_object_or_404(User, pk=user_pk)
-
-    fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
-    user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
-    student_fee = get_object_or_404(StudentFeeManagement, user_franchise=user_franchise)
+    objects = nested.resolve(request, franchise_pk, batch_pk, user_pk)
+    franchise, batch, user, student_fee = objects.franchise, objects.batch, objects.user, objects.student_fee
+    if objects.fee_management is None or student_fee is None:
+        raise Http404("No StudentFeeManagement matches the given query.")
 
     InstallmentFormSet = modelformset_factory(Installment, form=InstallmentForm, extra=0, can_delete=True)
 
@@ -377,16 +514,18 @@ def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
         if formset.is_valid():
             instances = formset.save(commit=False)
             
-            for instance in instances:
-                instance.student_fee_management = student_fee
-                instance.save()
-            
-            for obj in formset.deleted_objects:
-                obj.delete()
-            
-            total_pending = sum(inst.amount for inst in Installment.objects.filter(student_fee_management=student_fee, status='pending'))
-            student_fee.remaining_amount = total_pending
-            student_fee.save()
+            # One transaction, so the batch stats and collections are refreshed once when it commits.
+            with transaction.atomic():
+                for instance in instances:
+                    instance.student_fee_management = student_fee
+                    instance.save()
+                
+                for obj in formset.deleted_objects:
+                    obj.delete()
+                
+                total_pending = sum(inst.amount for inst in Installment.objects.filter(student_fee_management=student_fee, status='pending'))
+                student_fee.remaining_amount = total_pending
+                student_fee.save()
             
             return redirect('application:student_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk)
     else:
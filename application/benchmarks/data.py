@@ -0,0 +1,207 @@
+"""
+Synthetic franchises, batches, students and installments for the benchmarks.
+
+``Profile`` describes the production-sized data set; ``populate`` builds it
+multiplied by a scale factor. The scale multiplies the students of every batch,
+so per-franchise and per-batch pages grow with it while the number of
+franchises stays readable in the reports. Rows are written with
+``bulk_create`` and the rollups and search terms are rebuilt once at the end.
+"""
+import datetime
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+from application import analytics, counters, search, stats
+from application.models import (
+    Batch,
+    BatchFeeManagement,
+    Franchise,
+    Installment,
+    InstallmentTemplate,
+    StudentFeeManagement,
+    UserFranchise,
+)
+from common.djangoapps.student.models import CourseEnrollment, UserProfile
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+CHUNK_SIZE = 5000
+ADMIN_USERNAME = 'benchmark-admin'
+
+
+@dataclass
+class Profile:
+    courses: int = 5
+    franchises: int = 10
+    batches_per_franchise: int = 4
+    students_per_batch: int = 25
+    installments_per_student: int = 6
+    batch_fees: Decimal = Decimal('12000.00')
+    repayment_period_days: int = 30
+
+
+PRODUCTION = Profile()
+
+
+@dataclass
+class Dataset:
+    admin: User
+    franchise: Franchise
+    batch: Batch
+    student: User
+    counts: dict
+
+
+def prepare_database():
+    """
+    Create the schema when running on ``benchmarks.settings``; any other database is used as it is.
+    """
+    if getattr(settings, 'BENCHMARK_STANDALONE', False):
+        call_command('migrate', verbosity=0)
+
+
+def _scaled(profile, scale):
+    return Profile(**{**asdict(profile), 'students_per_batch': profile.students_per_batch * scale})
+
+
+def populate(scale=1, profile=PRODUCTION):
+    """
+    Create the data set of ``profile`` at ``scale`` and return a ``Dataset`` with sample rows for the pages.
+    """
+    profile = _scaled(profile, scale)
+    today = timezone.now().date()
+    started = timezone.now() - datetime.timedelta(days=profile.repayment_period_days * 3)
+
+    admin = User.objects.create(username=ADMIN_USERNAME, is_staff=True, is_superuser=True, password='!')
+    courses = CourseOverview.objects.bulk_create(
+        CourseOverview(id=f'course-v1:Bench+C{index}+Run', display_name=f'Benchmark course {index}')
+        for index in range(profile.courses)
+    )
+    Franchise.objects.bulk_create(
+        Franchise(
+            name=f'Franchise {index:03d}', coordinator=f'Coordinator {index}', contact_no=f'{index:010d}',
+            email=f'franchise{index}@example.org', location='Bench', registration_date=started.date(),
+        )
+        for index in range(profile.franchises)
+    )
+    franchises = list(Franchise.objects.order_by('pk'))
+    Batch.objects.bulk_create(
+        Batch(
+            batch_no=f'B{franchise.pk:04d}-{index:02d}', fees=profile.batch_fees,
+            course_id=courses[index % len(courses)].id, franchise=franchise,
+        )
+        for franchise in franchises
+        for index in range(profile.batches_per_franchise)
+    )
+    batches = list(Batch.objects.order_by('pk'))
+    BatchFeeManagement.objects.bulk_create(
+        BatchFeeManagement(batch=batch, remaining_amount=batch.fees) for batch in batches
+    )
+    fee_managements = {fee.batch_id: fee for fee in BatchFeeManagement.objects.all()}
+    installment_amount = (profile.batch_fees / profile.installments_per_student).quantize(Decimal('0.01'))
+    InstallmentTemplate.objects.bulk_create(
+        InstallmentTemplate(
+            batch_fee_management=fee, amount=installment_amount,
+            repayment_period_days=profile.repayment_period_days,
+        )
+        for fee in fee_managements.values()
+        for _ in range(profile.installments_per_student)
+    )
+
+    for batch in batches:
+        _populate_batch(batch, fee_managements[batch.pk], profile, installment_amount, started, today)
+
+    stats.rebuild()
+    search.rebuild()
+    analytics.rebuild()
+    counters.recount()
+
+    batch = batches[0]
+    student = User.objects.filter(userfranchise__batch=batch).order_by('pk').first()
+    return Dataset(
+        admin=admin,
+        franchise=batch.franchise,
+        batch=batch,
+        student=student,
+        counts={
+            'franchises': len(franchises),
+            'batches': len(batches),
+            'students': UserFranchise.objects.count(),
+            'installments': Installment.objects.count(),
+        },
+    )
+
+
+def _populate_batch(batch, fee_management, profile, installment_amount, started, today):
+    prefix = f'{batch.batch_no.lower()}-'
+    User.objects.bulk_create(
+        (
+            User(
+                username=f'{prefix}{index:06d}', email=f'{prefix}{index}@example.org',
+                first_name='Student', last_name=f'{index}', password='!',
+            )
+            for index in range(profile.students_per_batch)
+        ),
+        batch_size=CHUNK_SIZE,
+    )
+    user_ids = list(User.objects.filter(username__startswith=prefix).values_list('pk', flat=True))
+    UserProfile.objects.bulk_create(
+        (
+            UserProfile(user_id=user_id, name=f'Student {user_id}', phone_number=f'9{user_id:09d}')
+            for user_id in user_ids
+        ),
+        batch_size=CHUNK_SIZE,
+    )
+    CourseEnrollment.objects.bulk_create(
+        (
+            CourseEnrollment(user_id=user_id, course_id=batch.course_id, created=started, is_active=index % 10 != 0)
+            for index, user_id in enumerate(user_ids)
+        ),
+        batch_size=CHUNK_SIZE,
+    )
+    UserFranchise.objects.bulk_create(
+        (UserFranchise(user_id=user_id, franchise_id=batch.franchise_id, batch=batch) for user_id in user_ids),
+        batch_size=CHUNK_SIZE,
+    )
+    StudentFeeManagement.objects.bulk_create(
+        (
+            StudentFeeManagement(
+                user_franchise_id=user_franchise_id, batch_fee_management=fee_management,
+                remaining_amount=fee_management.remaining_amount,
+            )
+            for user_franchise_id in UserFranchise.objects.filter(batch=batch).values_list('pk', flat=True)
+        ),
+        batch_size=CHUNK_SIZE,
+    )
+    student_fee_ids = StudentFeeManagement.objects.filter(
+        batch_fee_management=fee_management,
+    ).values_list('pk', flat=True)
+    Installment.objects.bulk_create(
+        (
+            _installment(student_fee_id, sequence, installment_amount, profile, started.date(), today)
+            for student_fee_id in student_fee_ids
+            for sequence in range(1, profile.installments_per_student + 1)
+        ),
+        batch_size=CHUNK_SIZE,
+    )
+
+
+def _installment(student_fee_id, sequence, amount, profile, start_date, today):
+    due_date = start_date + datetime.timedelta(days=profile.repayment_period_days * sequence)
+    if due_date >= today:
+        status = 'pending'
+    else:
+        status = 'paid' if (student_fee_id + sequence) % 4 else 'overdue'
+    return Installment(
+        student_fee_management_id=student_fee_id,
+        sequence=sequence,
+        due_date=due_date,
+        amount=amount,
+        repayment_period_days=profile.repayment_period_days,
+        status=status,
+        payment_date=due_date if status == 'paid' else None,
+    )
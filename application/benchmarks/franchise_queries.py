@@ -0,0 +1,121 @@
+"""
+Compare the franchise report queries built on id lists with the subquery-based queryset API.
+
+Runs against the stand-in LMS models of ``benchmarks.settings`` unless
+``DJANGO_SETTINGS_MODULE`` points elsewhere (for example an LMS)::
+
+    python -m benchmarks.franchise_queries --sizes 1000 10000 100000
+
+Synthetic rows are created inside a transaction that is rolled back at the end.
+"""
+import argparse
+import os
+import time
+
+import django
+from django.apps import apps
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+if not apps.ready:
+    django.setup()
+
+# pylint: disable=wrong-import-position
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from application.models import Franchise, UserFranchise
+from benchmarks import data
+from common.djangoapps.student.models import CourseEnrollment
+
+COURSE_IDS = [f'course-v1:Bench+C{index}+Run' for index in range(5)]
+
+
+def _populate(size):
+    franchise = Franchise.objects.create(name=f'bench-{size}', coordinator='bench', contact_no='0', email='b@x.org')
+    prefix = f'bench{size}-'
+    User.objects.bulk_create(
+        (User(username=f'{prefix}{index:07d}', email=f'{prefix}{index}@example.org') for index in range(size)),
+        batch_size=5000,
+    )
+    user_ids = list(User.objects.filter(username__startswith=prefix).values_list('pk', flat=True))
+    UserFranchise.objects.bulk_create(
+        (UserFranchise(user_id=user_id, franchise=franchise) for user_id in user_ids), batch_size=5000,
+    )
+    CourseEnrollment.objects.bulk_create(
+        (
+            CourseEnrollment(user_id=user_id, course_id=COURSE_IDS[index % len(COURSE_IDS)], is_active=True)
+            for index, user_id in enumerate(user_ids)
+        ),
+        batch_size=5000,
+    )
+    return franchise
+
+
+def _id_list_queries(franchise):
+    student_ids = list(UserFranchise.objects.filter(franchise=franchise).values_list('user_id', flat=True))
+    list(
+        CourseEnrollment.objects.filter(user_id__in=student_ids, is_active=True)
+        .values('course_id').annotate(student_count=Count('user_id', distinct=True))
+    )
+    list(User.objects.filter(id__in=student_ids).order_by('username'))
+
+
+def _subquery_queries(franchise):
+    list(UserFranchise.objects.enrollment_counts_by_course(franchise))
+    list(UserFranchise.objects.students_of(franchise).order_by('username'))
+
+
+def _measure(queries, franchise):
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        try:
+            queries(franchise)
+        except DatabaseError as exc:
+            return {'error': str(exc)}
+        elapsed = time.perf_counter() - started
+    return {
+        'queries': len(captured),
+        'sql_bytes': sum(len(query['sql']) for query in captured.captured_queries),
+        'seconds': round(elapsed, 4),
+    }
+
+
+def run(sizes):
+    """
+    Return one result row per size comparing both query styles.
+    """
+    data.prepare_database()
+    results = []
+    for size in sizes:
+        with transaction.atomic():
+            franchise = _populate(size)
+            results.append({
+                'students': size,
+                'id_lists': _measure(_id_list_queries, franchise),
+                'subqueries': _measure(_subquery_queries, franchise),
+            })
+            transaction.set_rollback(True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    options = parser.parse_args()
+
+    for row in run(options.sizes):
+        for style in ('id_lists', 'subqueries'):
+            result = row[style]
+            if 'error' in result:
+                print(f"{row['students']:>8} {style:<11} failed: {result['error']}")
+            else:
+                print(
+                    f"{row['students']:>8} {style:<11} {result['queries']} queries "
+                    f"{result['sql_bytes']:>10} SQL bytes {result['seconds']:>9.4f}s"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Users registered per second by the bulk import at several password hashing pool sizes.
+
+Uses the real PBKDF2 hasher instead of the fast one of ``benchmarks.settings``::
+
+    python -m benchmarks.import_workers --rows 200 --workers 1 4 8
+
+Each run imports ``--rows`` students into a fresh batch inside a transaction
+that is rolled back. Hashing only scales up to the number of cores.
+"""
+import argparse
+import os
+import time
+
+import django
+from django.apps import apps
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+if not apps.ready:
+    django.setup()
+
+# pylint: disable=wrong-import-position
+from django.db import transaction
+from django.test.utils import override_settings
+
+from application.bulk_import import DEFAULT_CHUNK_SIZE, import_students
+from benchmarks import data
+from benchmarks.run import _import_lines
+
+DEFAULT_ROWS = 200
+DEFAULT_WORKERS = [1, 4, 8]
+HASHERS = ['django.contrib.auth.hashers.PBKDF2PasswordHasher']
+
+
+def measure(rows, workers, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return the users per second of importing ``rows`` students with ``workers`` hashing processes.
+    """
+    with transaction.atomic(), override_settings(PASSWORD_HASHERS=HASHERS):
+        dataset = data.populate(1)
+        lines = _import_lines(dataset.batch, rows)
+        started = time.perf_counter()
+        result = import_students(lines, dataset.franchise, dataset.batch, chunk_size=chunk_size, workers=workers)
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return result.created / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    options = parser.parse_args()
+
+    data.prepare_database()
+    print(f"{options.rows} users, {os.cpu_count()} cores")
+    baseline = None
+    for workers in options.workers:
+        rate = measure(options.rows, workers, options.chunk_size)
+        baseline = baseline or rate
+        print(f"  {workers:>3} workers {rate:>10.1f} users/s {rate / baseline:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
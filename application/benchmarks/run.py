@@ -0,0 +1,309 @@
+"""
+Benchmark every page in ``application.urls`` and the key service functions.
+
+Runs standalone against the stand-in LMS models::
+
+    python -m benchmarks.run --scales 1 10 100 --output results.json --baseline baseline.json
+
+For every scale a synthetic data set (see ``benchmarks.data``) is built inside a
+transaction that is rolled back at the end. Each measurement records the query
+count, the median and best wall time over ``--repeat`` runs and the peak Python
+memory allocated during one extra traced run. Writes made while measuring are
+rolled back too, so every run sees the same data. With ``--baseline`` the
+results are compared against an earlier output file and the command exits
+with status 1 when something regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.apps import apps
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+if not apps.ready:
+    django.setup()
+
+# pylint: disable=wrong-import-position
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from application import analytics, counters, search, stats
+from application import urls as application_urls
+from application.bulk_import import REQUIRED_COLUMNS, import_students
+from application.enrollments import change_batch_enrollment
+from application.installments import apply_status_changes, mark_overdue
+from application.models import Installment, InstallmentTemplate, StudentFeeManagement, UserFranchise
+from application.roster import batch_roster
+from application.schedules import generate_batch_schedules, replan_batch_schedules
+from benchmarks import data
+from common.djangoapps.student.models import CourseEnrollment
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+# Timing differences below this many seconds are treated as noise when comparing.
+MIN_SECONDS_DELTA = 0.002
+
+
+def _run_once(run, setup=None, trace=False):
+    with transaction.atomic():
+        args = setup() if setup else ()
+        captured = CaptureQueriesContext(connection) if trace else nullcontext()
+        if trace:
+            tracemalloc.start()
+        with captured:
+            started = time.perf_counter()
+            outcome = run(*args)
+            elapsed = time.perf_counter() - started
+        peak = None
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        transaction.set_rollback(True)
+    return outcome, elapsed, len(captured) if trace else None, peak
+
+
+def measure(run, setup=None, repeat=DEFAULT_REPEAT):
+    """
+    Return the query count, wall times and peak memory of ``run``.
+
+    ``setup`` runs before each call inside the same rolled-back transaction
+    and returns the arguments for ``run``; it is neither timed nor counted.
+    """
+    try:
+        timings = [_run_once(run, setup)[1] for _ in range(repeat)]
+        # Traced last, so caches warmed by the timed runs don't count as memory of this measurement.
+        outcome, _, queries, peak = _run_once(run, setup, trace=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        return {'error': f'{type(exc).__name__}: {exc}'}
+    result = {
+        'queries': queries,
+        'seconds': round(statistics.median(timings), 6),
+        'min_seconds': round(min(timings), 6),
+        'peak_kib': round(peak / 1024, 1),
+    }
+    status = getattr(outcome, 'status_code', None)
+    if status is not None:
+        result['status'] = status
+    return result
+
+
+def _url_kwargs(dataset):
+    return {
+        'pk': dataset.franchise.pk,
+        'franchise_pk': dataset.franchise.pk,
+        'batch_pk': dataset.batch.pk,
+        'user_pk': dataset.student.pk,
+        'dataset': 'installments',
+    }
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.streaming:
+        # Streamed bodies are produced while being read, so reading them is part of the view's cost.
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def benchmark_views(dataset, repeat):
+    """
+    GET every route of ``application.urls`` as a superuser.
+    """
+    client = Client()
+    client.force_login(dataset.admin)
+    samples = _url_kwargs(dataset)
+    results = {}
+    for pattern in application_urls.urlpatterns:
+        names = list(pattern.pattern.converters)
+        missing = [name for name in names if name not in samples]
+        if missing:
+            results[pattern.name] = {'error': f"no sample value for {', '.join(missing)}"}
+            continue
+        url = reverse(f'{application_urls.app_name}:{pattern.name}', kwargs={name: samples[name] for name in names})
+        results[pattern.name] = measure(lambda url=url: _get(client, url), repeat=repeat)
+    return results
+
+
+def _import_lines(batch, rows):
+    prefix = f'import-{batch.pk}-'
+    lines = [','.join(REQUIRED_COLUMNS)]
+    lines.extend(
+        f'{prefix}{index},Imported {index},{prefix}{index}@example.org,9{index:09d},Street {index},secret-{index}'
+        for index in range(rows)
+    )
+    return lines
+
+
+def _status_changes(dataset):
+    student_fee = StudentFeeManagement.objects.select_related('batch_fee_management').get(
+        user_franchise__user=dataset.student,
+    )
+    changes = {
+        pk: 'paid'
+        for pk in Installment.objects.filter(student_fee_management=student_fee).exclude(status='paid')
+        .values_list('pk', flat=True)
+    }
+    return student_fee, student_fee.batch_fee_management, changes
+
+
+def _service_cases(dataset, scale):
+    batch = dataset.batch
+
+    def reopen_overdue():
+        Installment.objects.filter(status='overdue').update(status='pending')
+        return ()
+
+    def drop_batch_schedules():
+        Installment.objects.filter(student_fee_management__batch_fee_management__batch=batch).delete()
+        return ()
+
+    def deactivate_enrollments():
+        CourseEnrollment.objects.filter(
+            course_id=batch.course_id, user_id__in=UserFranchise.objects.filter(batch=batch).values('user_id'),
+        ).update(is_active=False)
+        return ()
+
+    def change_templates():
+        InstallmentTemplate.objects.filter(batch_fee_management__batch=batch).update(amount=F('amount') + 1)
+        return ()
+
+    return {
+        'counters.recount': (counters.recount, None),
+        'stats.rebuild': (stats.rebuild, None),
+        'stats.refresh_batch': (lambda: stats.refresh_batch(batch.pk), None),
+        'analytics.rebuild': (analytics.rebuild, None),
+        'analytics.refresh_batch': (lambda: analytics.refresh_batch(batch.pk), None),
+        'roster.batch_roster': (lambda: list(batch_roster(batch)), None),
+        'search.rebuild': (search.rebuild, None),
+        'search.search_students': (lambda: search.search_students(dataset.student.username[:4]), None),
+        'installments.mark_overdue': (mark_overdue, reopen_overdue),
+        'installments.apply_status_changes': (apply_status_changes, lambda: _status_changes(dataset)),
+        'schedules.generate_batch_schedules': (lambda: generate_batch_schedules(batch), drop_batch_schedules),
+        'schedules.replan_batch_schedules': (lambda: replan_batch_schedules(batch), change_templates),
+        'enrollments.change_batch_enrollment': (
+            lambda: change_batch_enrollment(batch, 'enroll'), deactivate_enrollments,
+        ),
+        'bulk_import.import_students': (
+            lambda lines: import_students(lines, dataset.franchise, batch),
+            lambda: (_import_lines(batch, data.PRODUCTION.students_per_batch * scale),),
+        ),
+    }
+
+
+def benchmark_services(dataset, scale, repeat):
+    return {
+        name: measure(run, setup, repeat=repeat)
+        for name, (run, setup) in _service_cases(dataset, scale).items()
+    }
+
+
+def run(scales=None, repeat=DEFAULT_REPEAT):
+    """
+    Return the results document for ``scales``.
+    """
+    data.prepare_database()
+    results = {
+        'created': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'scales': {},
+    }
+    for scale in scales or DEFAULT_SCALES:
+        with transaction.atomic():
+            started = time.perf_counter()
+            dataset = data.populate(scale)
+            results['scales'][str(scale)] = {
+                'dataset': dict(dataset.counts, seconds=round(time.perf_counter() - started, 3)),
+                'views': benchmark_views(dataset, repeat),
+                'services': benchmark_services(dataset, scale, repeat),
+            }
+            transaction.set_rollback(True)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Return a description of every measurement of ``results`` that regressed against ``baseline``.
+
+    A measurement regresses when it issues more queries, or when its median time
+    or peak memory grows by more than ``threshold`` times.
+    """
+    regressions = []
+    for scale, sections in results['scales'].items():
+        for section in ('views', 'services'):
+            previous_section = baseline.get('scales', {}).get(scale, {}).get(section, {})
+            for name, current in sections[section].items():
+                previous = previous_section.get(name)
+                label = f'{scale}x {name}'
+                if previous is None or 'error' in previous:
+                    continue
+                if 'error' in current:
+                    regressions.append(f"{label}: {current['error']}")
+                    continue
+                if current['queries'] > previous['queries']:
+                    regressions.append(f"{label}: queries {previous['queries']} -> {current['queries']}")
+                if current['seconds'] > previous['seconds'] * threshold \
+                        and current['seconds'] - previous['seconds'] > MIN_SECONDS_DELTA:
+                    regressions.append(f"{label}: seconds {previous['seconds']:.4f} -> {current['seconds']:.4f}")
+                if current['peak_kib'] > previous['peak_kib'] * threshold:
+                    regressions.append(f"{label}: peak KiB {previous['peak_kib']} -> {current['peak_kib']}")
+    return regressions
+
+
+def _print_results(results):
+    for scale, sections in results['scales'].items():
+        counts = ', '.join(f'{value} {name}' for name, value in sections['dataset'].items() if name != 'seconds')
+        print(f"\n{scale}x ({counts}; built in {sections['dataset']['seconds']}s)")
+        for section in ('views', 'services'):
+            for name, result in sections[section].items():
+                if 'error' in result:
+                    print(f'  {name:<40} failed: {result["error"]}')
+                    continue
+                print(
+                    f"  {name:<40} {result['queries']:>5} queries {result['seconds']:>10.4f}s "
+                    f"{result['peak_kib']:>10.1f} KiB"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='earlier output file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    options = parser.parse_args()
+
+    results = run(options.scales, options.repeat)
+    with open(options.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    _print_results(results)
+    print(f'\nResults written to {options.output}')
+
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), options.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print('No regressions against the baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Django settings for running the benchmarks outside an LMS.
+
+``common`` and ``openedx`` resolve to the stand-in apps in ``standins/``.
+The database is an in-memory SQLite one unless ``BENCHMARK_DATABASE_NAME``
+names a file.
+"""
+import os
+import sys
+from os.path import abspath, dirname, join
+
+BENCHMARKS_DIR = dirname(abspath(__file__))
+sys.path.insert(0, join(BENCHMARKS_DIR, 'standins'))
+
+# Lets the benchmark scripts create the schema; they never migrate any other database.
+BENCHMARK_STANDALONE = True
+
+DEBUG = False
+SECRET_KEY = 'insecure-benchmark-key'
+ALLOWED_HOSTS = ['testserver']
+USE_TZ = True
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DATABASE_NAME', ':memory:'),
+    }
+}
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+INSTALLED_APPS = (
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.messages',
+    'django.contrib.sessions',
+    'django.contrib.staticfiles',
+    'openedx.core.djangoapps.content.course_overviews.apps.CourseOverviewsConfig',
+    'common.djangoapps.student.apps.StudentConfig',
+    'application',
+)
+
+MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+)
+
+ROOT_URLCONF = 'benchmarks.urls'
+STATIC_URL = '/static/'
+
+TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'APP_DIRS': True,
+    'OPTIONS': {
+        'context_processors': [
+            'django.template.context_processors.request',
+            'django.contrib.auth.context_processors.auth',
+            'django.contrib.messages.context_processors.messages',
+        ],
+    },
+}]
+
+# Password hashing is deliberately slow and would dominate the import timings.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
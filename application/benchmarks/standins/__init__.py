@@ -0,0 +1,9 @@
+"""
+Lightweight stand-ins for the Open edX apps ``application`` imports.
+
+This directory is put on ``sys.path`` by ``benchmarks.settings`` so that
+``common.djangoapps.student.models`` and
+``openedx.core.djangoapps.content.course_overviews.models`` resolve to the
+small models defined here. They only carry the fields and methods the app
+uses; they are never installed alongside a real LMS.
+"""
@@ -0,0 +1,44 @@
+"""
+Stand-ins for the LMS ``UserProfile`` and ``CourseEnrollment`` models.
+"""
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+class UserProfile(models.Model):
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
+    name = models.CharField(max_length=255, blank=True, db_index=True)
+    phone_number = models.CharField(max_length=50, blank=True, null=True)
+    mailing_address = models.TextField(blank=True, null=True)
+
+
+class CourseEnrollment(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    course = models.ForeignKey(CourseOverview, db_constraint=False, on_delete=models.DO_NOTHING)
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+    is_active = models.BooleanField(default=True)
+    mode = models.CharField(max_length=100, default='audit')
+
+    class Meta:
+        unique_together = (('user', 'course'),)
+
+    @classmethod
+    def is_enrolled(cls, user, course_key):
+        return cls.objects.filter(user=user, course_id=str(course_key), is_active=True).exists()
+
+    @classmethod
+    def enroll(cls, user, course_key, mode='audit', check_access=False):  # pylint: disable=unused-argument
+        enrollment, _ = cls.objects.update_or_create(
+            user=user, course_id=str(course_key), defaults={'is_active': True, 'mode': mode},
+        )
+        return enrollment
+
+    @classmethod
+    def unenroll(cls, user, course_id, skip_refund=False):  # pylint: disable=unused-argument
+        enrollment = cls.objects.filter(user=user, course_id=str(course_id)).first()
+        if enrollment is not None and enrollment.is_active:
+            enrollment.is_active = False
+            enrollment.save()
@@ -0,0 +1,12 @@
+"""
+Stand-in for the LMS ``CourseOverview`` model.
+"""
+from django.db import models
+
+
+class CourseOverview(models.Model):
+    id = models.CharField(max_length=255, primary_key=True)
+    display_name = models.TextField(null=True)
+
+    def __str__(self):
+        return self.display_name or self.id
@@ -0,0 +1,10 @@
+"""
+URLs for the benchmarks: the app's own routes plus the LMS names its templates link to.
+"""
+from django.http import HttpResponse
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('application.urls')),
+    path('logout/', lambda request: HttpResponse(), name='logout'),
+]
@@ -5,6 +5,7 @@ In a real-world use case, apps in this project are installed into other
 Django applications, so these settings will not be used.
 """
 
+import sys
 from os.path import abspath, dirname, join
 
 
@@ -14,6 +15,11 @@ def root(*args):
     """
     return join(abspath(dirname(__file__)), *args)
 
+
+# The LMS models the app imports (``common.djangoapps.student``, ``openedx...course_overviews``)
+# resolve to the small stand-ins the benchmarks use.
+sys.path.insert(0, root('benchmarks', 'standins'))
+
 def plugin_settings(settings):
     print("✔ Application settings loaded!")
     settings.FEATURES['ENABLE_APPLICATION'] = True
@@ -36,28 +42,44 @@ INSTALLED_APPS = (
     'django.contrib.contenttypes',
     'django.contrib.messages',
     'django.contrib.sessions',
+    'django.contrib.staticfiles',
+    'openedx.core.djangoapps.content.course_overviews.apps.CourseOverviewsConfig',
+    'common.djangoapps.student.apps.StudentConfig',
     'application',
 )
 
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+USE_TZ = True
+
+ALLOWED_HOSTS = ['testserver']
+
+STATIC_URL = '/static/'
+
+# Fast hashing; the real hasher is only wanted by the import benchmark.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 LOCALE_PATHS = [
     root('application', 'conf', 'locale'),
 ]
 
-ROOT_URLCONF = 'application.urls'
+# The app's routes under the ``application`` namespace, plus the LMS ``logout`` name its templates link to.
+ROOT_URLCONF = 'benchmarks.urls'
 
 SECRET_KEY = 'insecure-secret-key'
 
 MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
 )
 
 TEMPLATES = [{
     'BACKEND': 'django.template.backends.django.DjangoTemplates',
-    'APP_DIRS': False,
+    'APP_DIRS': True,
     'OPTIONS': {
         'context_processors': [
+            'django.template.context_processors.request',
             'django.contrib.auth.context_processors.auth',  # this is required for admin
             'django.contrib.messages.context_processors.messages',  # this is required for admin
         ],
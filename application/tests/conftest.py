@@ -0,0 +1,51 @@
+"""
+Fixtures shared by the `application` tests.
+
+Each fixture builds on the previous one: a course and a franchise, a batch of
+that course in the franchise, the batch's fee settings, and students
+registered into the batch with their fee records.
+"""
+import pytest
+from django.contrib.auth.models import User
+
+from application.models import Batch, BatchFeeManagement, Franchise, StudentFeeManagement, UserFranchise
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+@pytest.fixture
+def course(db):
+    return CourseOverview.objects.create(id='course-v1:Org+Test+Run', display_name='Test')
+
+
+@pytest.fixture
+def franchise(db):
+    return Franchise.objects.create(name='F', coordinator='C', contact_no='1', email='f@example.org')
+
+
+@pytest.fixture
+def batch(franchise, course):
+    return Batch.objects.create(batch_no='B1', fees=300, course=course, franchise=franchise)
+
+
+@pytest.fixture
+def fee_management(batch):
+    return BatchFeeManagement.objects.create(batch=batch)
+
+
+@pytest.fixture
+def make_student(fee_management):
+    """
+    Return a function registering a new user into the batch, with a fee record, and returning the ``UserFranchise``.
+    """
+    def make(username, **user_fields):
+        batch = fee_management.batch
+        user = User.objects.create(username=username, **user_fields)
+        user_franchise = UserFranchise.objects.create(user=user, franchise=batch.franchise, batch=batch)
+        StudentFeeManagement.objects.create(user_franchise=user_franchise, batch_fee_management=fee_management)
+        return user_franchise
+    return make
+
+
+@pytest.fixture
+def student_fee(make_student):
+    return make_student('student').fee_management
@@ -0,0 +1,8 @@
+"""
+URLs mounting the app under its namespace, as the LMS does.
+"""
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('application.urls')),
+]
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` monthly collections rollup.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from application import analytics
+from application.installments import apply_status_changes
+from application.models import CollectionsRollup, Installment
+
+pytestmark = pytest.mark.django_db
+
+JAN = datetime.date(2026, 1, 1)
+FEB = datetime.date(2026, 2, 1)
+MAR = datetime.date(2026, 3, 1)
+
+
+def _rollup():
+    return {
+        row.month: (row.billed, row.collected, row.installment_count, row.paid_count)
+        for row in CollectionsRollup.objects.order_by('month')
+    }
+
+
+def test_installment_changes_update_their_months(student_fee, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        installment = Installment.objects.create(
+            student_fee_management=student_fee, due_date=datetime.date(2026, 1, 10), amount=Decimal('100'),
+        )
+        Installment.objects.create(
+            student_fee_management=student_fee, due_date=datetime.date(2026, 1, 20), amount=Decimal('50'),
+        )
+    assert _rollup() == {JAN: (Decimal('150'), Decimal('0'), 2, 0)}
+    january = CollectionsRollup.objects.get().pk
+
+    with django_capture_on_commit_callbacks(execute=True):
+        installment.status, installment.payment_date = 'paid', datetime.date(2026, 2, 3)
+        installment.save()
+    assert _rollup() == {JAN: (Decimal('150'), Decimal('0'), 2, 0), FEB: (Decimal('0'), Decimal('100'), 0, 1)}
+    assert CollectionsRollup.objects.get(month=JAN).pk == january
+
+    with django_capture_on_commit_callbacks(execute=True):
+        installment.due_date = datetime.date(2026, 3, 1)
+        installment.save()
+        installment.delete()
+    assert _rollup() == {JAN: (Decimal('50'), Decimal('0'), 1, 0)}
+    assert CollectionsRollup.objects.get().pk == january
+
+
+def test_saves_in_one_transaction_refresh_once(student_fee, django_capture_on_commit_callbacks, monkeypatch):
+    installments = [
+        Installment.objects.create(
+            student_fee_management=student_fee, due_date=datetime.date(2026, month, 10), amount=Decimal('100'),
+        )
+        for month in (1, 2)
+    ]
+    refreshed = []
+    monkeypatch.setattr(analytics, 'refresh', lambda *key, months=None: refreshed.append((key, months)))
+
+    with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as queries:
+        for installment in installments:
+            installment.amount = Decimal('90')
+            installment.save()
+
+    batch = student_fee.batch_fee_management.batch
+    assert refreshed == [((batch.franchise_id, batch.course_id), {JAN, FEB})]
+    # The values loaded with the installments stand in for a lookup before each save.
+    assert not [query for query in queries if query['sql'].startswith('SELECT') and 'amount' in query['sql']]
+
+
+def test_refresh_upserts_and_deletes_emptied_months(student_fee):
+    batch = student_fee.batch_fee_management.batch
+    installment = Installment.objects.create(
+        student_fee_management=student_fee, due_date=datetime.date(2026, 1, 10), amount=Decimal('100'),
+    )
+    CollectionsRollup.objects.create(franchise_id=batch.franchise_id, course_id=batch.course_id, month=JAN)
+    CollectionsRollup.objects.create(franchise_id=batch.franchise_id, course_id=batch.course_id, month=FEB)
+    january = CollectionsRollup.objects.get(month=JAN).pk
+
+    analytics.refresh(batch.franchise_id, batch.course_id)
+
+    assert _rollup() == {JAN: (Decimal('100'), Decimal('0'), 1, 0)}
+    assert CollectionsRollup.objects.get().pk == january
+
+    Installment.objects.filter(pk=installment.pk).update(due_date=datetime.date(2026, 3, 1))
+    analytics.refresh(batch.franchise_id, batch.course_id, months=[JAN, MAR])
+    assert _rollup() == {MAR: (Decimal('100'), Decimal('0'), 1, 0)}
+
+
+def test_status_changes_move_collections(student_fee):
+    installment = Installment.objects.create(
+        student_fee_management=student_fee, due_date=datetime.date(2026, 1, 10), amount=Decimal('100'),
+    )
+
+    apply_status_changes(
+        student_fee, student_fee.batch_fee_management, {installment.pk: 'paid'}, today=datetime.date(2026, 3, 5),
+    )
+    assert _rollup()[MAR] == (Decimal('0'), Decimal('100'), 0, 1)
+
+    apply_status_changes(student_fee, student_fee.batch_fee_management, {installment.pk: 'pending'})
+    assert MAR not in _rollup()
+
+
+def test_rebuild_matches_incremental_rows(student_fee, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for day, status in [(datetime.date(2026, 1, 5), 'paid'), (datetime.date(2026, 2, 5), 'pending')]:
+            Installment.objects.create(
+                student_fee_management=student_fee, due_date=day, amount=Decimal('100'), status=status,
+                payment_date=day if status == 'paid' else None,
+            )
+    incremental = _rollup()
+    CollectionsRollup.objects.all().delete()
+
+    assert analytics.rebuild(chunk_size=1) == 1
+    assert _rollup() == incremental
+
+
+def test_recent_months():
+    months = analytics.recent_months(24, today=datetime.date(2026, 3, 31))
+
+    assert len(months) == 24
+    assert (months[0], months[-1]) == (datetime.date(2024, 4, 1), MAR)
+
+
+def test_dashboard_reads_only_the_rollup(student_fee, admin_client, django_capture_on_commit_callbacks):
+    today = timezone.now().date()
+    with django_capture_on_commit_callbacks(execute=True):
+        Installment.objects.create(
+            student_fee_management=student_fee, due_date=today, amount=Decimal('80'), status='paid',
+            payment_date=today,
+        )
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse('application:collections_dashboard'))
+
+    assert not [query for query in queries if 'application_installment' in query['sql']]
+    assert len(response.context['months']) == 24
+    assert response.context['months'][-1].rate == Decimal('100.0')
+    assert response.context['total'].collected == Decimal('80')
+    franchise, = response.context['franchises']
+    assert (franchise.name, franchise.billed) == ('F', Decimal('80'))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` JSON API.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from application import api, stats
+from application.models import Franchise, Installment
+from application.pagination import encode_cursor
+from common.djangoapps.student.models import UserProfile
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def students(make_student):
+    for index in range(3):
+        student = make_student(f'student{index}', email=f'student{index}@example.org')
+        UserProfile.objects.create(user=student.user, name=f'Student {index}')
+        Installment.objects.bulk_create(
+            Installment(student_fee_management=student.fee_management, sequence=sequence, amount=100,
+                        status='paid' if sequence == 1 else 'pending', due_date=datetime.date(2026, sequence, 1))
+            for sequence in (1, 2)
+        )
+    stats.rebuild()
+
+
+def _roster_url(batch):
+    return reverse('application:api_roster', kwargs={'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk})
+
+
+def test_franchises_with_sparse_fields(batch, admin_client):
+    response = admin_client.get(reverse('application:api_franchises'), {'fields': 'name,student_count'})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'results': [{'name': 'F', 'student_count': 3}], 'next': None, 'previous': None,
+    }
+
+
+def test_unknown_field_is_rejected(batch, admin_client):
+    response = admin_client.get(reverse('application:api_franchises'), {'fields': 'name,secret'})
+
+    assert response.status_code == 400
+    assert response.json() == {'error': 'Unknown fields: secret'}
+
+
+@pytest.mark.parametrize('values', [['x'], [{'a': 1}], [None]])
+def test_tampered_cursor_is_rejected(batch, admin_client, values):
+    response = admin_client.get(reverse('application:api_franchises'), {'cursor': encode_cursor(values)})
+
+    assert response.status_code == 400
+    assert response.json() == {'error': 'Invalid cursor'}
+
+
+def test_installments_reject_cursor_of_wrong_type(batch, admin_client):
+    student = batch.userfranchise_set.order_by('pk').first()
+    url = reverse('application:api_installments', kwargs={
+        'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk, 'user_pk': student.user_id,
+    })
+
+    response = admin_client.get(url, {'cursor': encode_cursor(['not a date', 'x'])})
+
+    assert response.status_code == 400
+
+
+class CourseKey:
+    """
+    Stands in for the LMS ``CourseLocator``, which the JSON encoder can't serialize.
+    """
+
+    def __str__(self):
+        return 'course-v1:Org+Key+Run'
+
+
+def test_course_keys_are_sent_as_strings():
+    assert api.BATCHES.row({'course_id': CourseKey(), 'batch_no': 'A1'}, ['course_id', 'batch_no']) == {
+        'course_id': 'course-v1:Org+Key+Run', 'batch_no': 'A1',
+    }
+
+
+def test_roster_cursor_pagination(batch, admin_client):
+    first = admin_client.get(_roster_url(batch), {'page_size': 2}).json()
+    second = admin_client.get(_roster_url(batch), {'page_size': 2, 'cursor': first['next']}).json()
+
+    assert [row['username'] for row in first['results']] == ['student0', 'student1']
+    assert [row['username'] for row in second['results']] == ['student2']
+    assert second['next'] is None
+    assert first['results'][0]['full_name'] == 'Student 0'
+    assert Decimal(first['results'][0]['total_paid']) == 100
+    assert first['results'][0]['next_due_date'] == '2026-02-01'
+
+
+def test_sparse_roster_skips_aggregates(batch, admin_client, django_assert_max_num_queries):
+    with django_assert_max_num_queries(4):
+        response = admin_client.get(_roster_url(batch), {'fields': 'username'})
+
+    assert response.json()['results'] == [{'username': f'student{index}'} for index in range(3)]
+
+
+def test_fee_summary_and_installments(batch, admin_client):
+    user = User.objects.get(username='student1')
+    kwargs = {'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk, 'user_pk': user.pk}
+
+    summary = admin_client.get(reverse('application:api_fee_summary', kwargs=kwargs)).json()
+    installments = admin_client.get(
+        reverse('application:api_installments', kwargs=kwargs), {'fields': 'sequence,status'},
+    ).json()
+
+    assert summary['installment_count'] == 2
+    assert Decimal(summary['total_pending']) == 100
+    assert installments['results'] == [{'sequence': 1, 'status': 'paid'}, {'sequence': 2, 'status': 'pending'}]
+
+
+def test_mismatched_batch_is_not_found(batch, admin_client):
+    other = Franchise.objects.create(name='G', coordinator='C', contact_no='1', email='g@example.org')
+
+    response = admin_client.get(
+        reverse('application:api_roster', kwargs={'franchise_pk': other.pk, 'batch_pk': batch.pk}),
+    )
+
+    assert response.status_code == 404
+
+
+def test_requires_superuser(batch, client):
+    assert client.get(reverse('application:api_franchises')).status_code == 401
+    client.force_login(User.objects.create(username='staff'))
+    assert client.get(reverse('application:api_franchises')).status_code == 403
+    assert client.post(reverse('application:api_franchises')).status_code == 405
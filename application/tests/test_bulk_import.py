@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` bulk import and its password hashing pool.
+"""
+import pytest
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from application.bulk_import import REQUIRED_COLUMNS, import_students
+from application import hashing
+from application.hashing import PasswordHashPool, worker_count
+from application.models import UserFranchise
+from common.djangoapps.student.models import CourseEnrollment, UserProfile
+
+
+def _lines(rows):
+    return [','.join(REQUIRED_COLUMNS)] + [
+        f'user{index},User {index},user{index}@example.org,9{index:09d},Street {index},secret-{index}'
+        for index in range(rows)
+    ]
+
+
+@pytest.mark.django_db
+def test_import_registers_profiles_students_and_enrollments(batch):
+    result = import_students(_lines(3), batch.franchise, batch, workers=1)
+
+    assert (result.created, result.errors) == (3, [])
+    user = User.objects.get(username='user1')
+    assert (user.first_name, user.last_name, user.email) == ('User', '1', 'user1@example.org')
+    profile = UserProfile.objects.get(user=user)
+    assert (profile.name, profile.phone_number, profile.mailing_address) == ('User 1', '9000000001', 'Street 1')
+    assert UserFranchise.objects.filter(user=user, franchise=batch.franchise, batch=batch).exists()
+    enrolled = CourseEnrollment.objects.filter(is_active=True, course_id=batch.course_id)
+    assert set(enrolled.values_list('user__username', flat=True)) == {'user0', 'user1', 'user2'}
+
+
+@pytest.mark.django_db
+def test_import_rejects_duplicate_usernames_and_emails(batch):
+    User.objects.create(username='taken', email='taken@example.org')
+    lines = [
+        ','.join(REQUIRED_COLUMNS),
+        'taken,Taken User,new@example.org,1,Street,secret',
+        'fresh,Fresh User,taken@example.org,1,Street,secret',
+        'twice,Twice User,twice@example.org,1,Street,secret',
+        'twice,Twice Again,other@example.org,1,Street,secret',
+        'again,Again User,Twice@Example.org,1,Street,secret',
+    ]
+
+    result = import_students(lines, batch.franchise, batch, chunk_size=2, workers=1)
+
+    assert result.created == 1
+    assert result.errors == [
+        (2, 'taken', ["Username already exists"]),
+        (3, 'fresh', ["Email already exists"]),
+        (5, 'twice', ["Username already exists"]),
+        (6, 'again', ["Email already exists"]),
+    ]
+    assert User.objects.get(username='twice').email == 'twice@example.org'
+
+
+@pytest.mark.django_db
+def test_import_compares_usernames_case_insensitively(batch):
+    User.objects.create(username='alice')
+    lines = [
+        ','.join(REQUIRED_COLUMNS),
+        'Alice,Alice User,alice@example.org,1,Street,secret',
+        'Bob,Bob User,bob@example.org,1,Street,secret',
+        'BOB,Bob Again,bob2@example.org,1,Street,secret',
+    ]
+
+    result = import_students(lines, batch.franchise, batch, workers=1)
+
+    assert result.created == 1
+    assert result.errors == [(2, 'Alice', ["Username already exists"]), (4, 'BOB', ["Username already exists"])]
+
+
+@pytest.mark.django_db
+def test_import_reports_bad_rows(batch):
+    lines = [
+        ','.join(REQUIRED_COLUMNS),
+        'no password,Spaced Name,spaced@example.org,1,Street,',
+        'good,Good User,not-an-email,1,Street,secret',
+        ',Nameless,nameless@example.org,1,Street,secret',
+    ]
+
+    result = import_students(lines, batch.franchise, batch, workers=1)
+
+    assert result.created == 0
+    assert [(line_no, username) for line_no, username, _ in result.errors] == [
+        (2, 'no password'), (3, 'good'), (4, ''),
+    ]
+    assert "password is required" in result.errors[0][2]
+    assert result.errors[1][2] == ["email is invalid"]
+    assert result.errors[2][2] == ["username is required"]
+    assert not UserFranchise.objects.exists()
+
+
+def test_import_requires_every_column(batch):
+    with pytest.raises(ValueError, match='mailing_address, password'):
+        import_students(['username,full_name,email,phone'], batch.franchise, batch, workers=1)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_pool_keeps_submission_order(workers):
+    passwords = [f'secret-{index}' for index in range(7)]
+
+    with PasswordHashPool(workers) as pool:
+        hashed = pool.submit(passwords)
+        empty = pool.submit([])
+
+        assert [check_password(password, value) for password, value in zip(passwords, hashed.result())] == [True] * 7
+        assert empty.result() == []
+
+
+def test_pool_start_method_setting(settings, monkeypatch):
+    contexts = []
+    monkeypatch.setattr(hashing, 'ProcessPoolExecutor', lambda **kwargs: contexts.append(kwargs['mp_context']))
+    settings.APPLICATION_IMPORT_HASH_START_METHOD = 'forkserver'
+
+    with PasswordHashPool(2):
+        pass
+    del settings.APPLICATION_IMPORT_HASH_START_METHOD
+    with PasswordHashPool(2):
+        pass
+
+    assert [context.get_start_method() for context in contexts] == ['forkserver', 'spawn']
+
+
+def test_worker_count_setting(settings):
+    settings.APPLICATION_IMPORT_HASH_WORKERS = 3
+
+    assert worker_count() == 3
+    assert worker_count(2) == 2
+
+
+@pytest.mark.django_db
+def test_import_with_worker_pool(batch):
+    result = import_students(_lines(5) + _lines(2)[1:], batch.franchise, batch, chunk_size=2, workers=2)
+
+    assert result.created == 5
+    assert [line_no for line_no, _, _ in result.errors] == [7, 8]
+    assert UserFranchise.objects.filter(batch=batch).count() == 5
+    for index in range(5):
+        assert User.objects.get(username=f'user{index}').check_password(f'secret-{index}')
+
+
+@pytest.mark.django_db
+def test_upload_hashes_in_the_web_worker(batch, admin_client, settings, monkeypatch):
+    settings.APPLICATION_IMPORT_HASH_WORKERS = 4
+    monkeypatch.setattr(hashing, 'ProcessPoolExecutor', lambda **kwargs: pytest.fail("started a pool"))
+    upload = SimpleUploadedFile('students.csv', '\n'.join(_lines(3)).encode())
+
+    response = admin_client.post(
+        reverse('application:batch_student_import', kwargs={'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk}),
+        {'csv_file': upload},
+    )
+
+    assert response.status_code == 200
+    assert response.context['result'].created == 3
+
+
+@pytest.mark.django_db
+def test_upload_rejects_files_over_the_row_limit(batch, admin_client, settings):
+    settings.APPLICATION_IMPORT_MAX_UPLOAD_ROWS = 2
+    upload = SimpleUploadedFile('students.csv', '\n'.join(_lines(3)).encode())
+
+    response = admin_client.post(
+        reverse('application:batch_student_import', kwargs={'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk}),
+        {'csv_file': upload},
+    )
+
+    assert response.status_code == 200
+    assert response.context['result'] is None
+    assert 'import_batch_students' in response.context['form'].errors['csv_file'][0]
+    assert not User.objects.filter(username__startswith='user').exists()
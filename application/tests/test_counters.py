@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` dashboard counters.
+"""
+import pytest
+from django.core.cache import cache
+
+from application import counters
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_get_counters_recounts_only_missing_counters(franchise, django_assert_num_queries):
+    cache.set(counters._key('batches'), 7)
+
+    with django_assert_num_queries(3):
+        values = counters.get_counters()
+
+    assert values == {'franchises': 1, 'batches': 7, 'students': 0, 'courses': 0}
+    with django_assert_num_queries(0):
+        assert counters.get_counters() == values
+
+
+def test_signals_adjust_cached_counters_on_commit(request, django_capture_on_commit_callbacks):
+    counters.recount()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        # Created here rather than as arguments, so the signals fire after the recount.
+        batch = request.getfixturevalue('batch')
+        assert counters.cached_counters()['franchises'] == 0
+    assert counters.cached_counters() == {'franchises': 1, 'batches': 1, 'students': 0, 'courses': 0}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        batch.franchise.delete()
+    assert counters.cached_counters()['franchises'] == 0
+
+
+def test_adjust_leaves_uncached_counters_to_the_next_read(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        counters.adjust('franchises', 1)
+
+    assert counters.cached_counters() == {}
+
+
+def test_invalidate_drops_counters(django_capture_on_commit_callbacks):
+    counters.recount()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        counters.invalidate('students')
+
+    assert 'students' not in counters.cached_counters()
+    assert set(counters.cached_counters()) == {'franchises', 'batches', 'courses'}
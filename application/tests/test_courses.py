@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` course search.
+"""
+import pytest
+from django.urls import reverse
+
+from application import courses
+from application.forms import BatchForm
+from application.models import Batch
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def catalog():
+    courses._cache.clear()  # pylint: disable=protected-access
+    for course_id, name in [
+        ('course-v1:Org+PY101+Run', 'Python Basics'),
+        ('course-v1:Org+DS201+Run', 'Data Science with Python'),
+        ('course-v1:Org+WEB1+Run', 'Web Design'),
+    ]:
+        CourseOverview.objects.create(id=course_id, display_name=name)
+    yield
+    courses._cache.clear()  # pylint: disable=protected-access
+
+
+def test_prefix_matches_come_first():
+    assert [course['name'] for course in courses.search_courses('python')] == [
+        'Python Basics', 'Data Science with Python',
+    ]
+    assert [course['id'] for course in courses.search_courses('course-v1:Org+WEB')] == ['course-v1:Org+WEB1+Run']
+
+
+def test_results_are_bounded_and_cached(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert len(courses.search_courses('course', limit=2)) == 2
+    with django_assert_num_queries(0):
+        assert len(courses.search_courses('COURSE', limit=2)) == 2
+    assert courses.search_courses('p') == []
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = courses.LRUCache(maxsize=2, timeout=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+
+def test_search_endpoint(admin_client):
+    response = admin_client.get(reverse('application:course_search'), {'q': 'web'})
+
+    assert response.json() == {'results': [{'id': 'course-v1:Org+WEB1+Run', 'name': 'Web Design'}]}
+
+
+def test_batch_form_validates_course_by_primary_key(django_assert_num_queries):
+    form = BatchForm(data={'batch_no': 'C1', 'fees': '100', 'course': 'course-v1:Org+WEB1+Run'})
+    missing = BatchForm(data={'batch_no': 'C2', 'fees': '100', 'course': 'course-v1:Org+NONE+Run'})
+
+    with django_assert_num_queries(2):  # The course lookup and the batch_no uniqueness check.
+        assert form.is_valid()
+    assert not missing.is_valid()
+    assert 'course' in missing.errors
+
+
+def test_batch_create_page(franchise, admin_client, django_assert_max_num_queries):
+    url = reverse('application:batch_create', kwargs={'pk': franchise.pk})
+
+    with django_assert_max_num_queries(3):
+        assert b'course-options' in admin_client.get(url).content
+    admin_client.post(url, {'batch_no': 'C1', 'fees': '100', 'course': 'course-v1:Org+WEB1+Run'})
+
+    assert Batch.objects.get(batch_no='C1').course_id == 'course-v1:Org+WEB1+Run'
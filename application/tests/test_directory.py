@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` franchise list search, sorting and paging.
+"""
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+
+from application import directory
+from application.models import Batch, Franchise, FranchiseStats, UserFranchise
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def franchises(course):
+    created = []
+    for index, (name, location) in enumerate([('Alpha', 'Pune'), ('Beta', None), ('Gamma', 'Delhi')]):
+        franchise = Franchise.objects.create(
+            name=name, location=location, coordinator=f'Coordinator {name}', contact_no='1',
+            email=f'{name.lower()}@example.org',
+        )
+        batch = Batch.objects.create(batch_no=f'D{index}', fees=100, course=course, franchise=franchise)
+        for number in range(index):
+            user = User.objects.create(username=f'{name.lower()}{number}')
+            UserFranchise.objects.create(user=user, franchise=franchise, batch=batch)
+        created.append(franchise)
+    FranchiseStats.objects.filter(franchise=created[2], batch__isnull=True).update(total_outstanding=Decimal('50'))
+    return created
+
+
+def _names(page):
+    return [franchise.name for franchise in page.object_list]
+
+
+def test_search_matches_prefixes_of_the_indexed_columns(franchises):
+    assert _names(directory.franchise_page('gam', None, None, 10)) == ['Gamma']
+    assert _names(directory.franchise_page('Coordinator B', None, None, 10)) == ['Beta']
+    assert _names(directory.franchise_page('alpha@', None, None, 10)) == ['Alpha']
+    assert _names(directory.franchise_page('pun', None, None, 10)) == ['Alpha']
+    assert _names(directory.franchise_page('mma', None, None, 10)) == []
+
+
+def test_sorts_on_counts_and_nullable_columns(franchises):
+    assert _names(directory.franchise_page('', '-students', None, 10)) == ['Gamma', 'Beta', 'Alpha']
+    assert _names(directory.franchise_page('', 'location', None, 10)) == ['Beta', 'Gamma', 'Alpha']
+    assert _names(directory.franchise_page('', 'outstanding', None, 10)) == ['Alpha', 'Beta', 'Gamma']
+    assert _names(directory.franchise_page('', 'unknown', None, 10)) == ['Alpha', 'Beta', 'Gamma']
+
+
+def test_pages_through_a_sort(franchises):
+    first = directory.franchise_page('', '-students', None, 2)
+    second = directory.franchise_page('', '-students', first.next_cursor, 2)
+
+    assert _names(first) == ['Gamma', 'Beta']
+    assert _names(second) == ['Alpha']
+    assert second.next_cursor is None
+
+
+def test_cursor_from_another_sort_starts_over(franchises):
+    first = directory.franchise_page('', 'name', None, 1)
+
+    assert _names(directory.franchise_page('', 'outstanding', first.next_cursor, 1)) == ['Alpha']
+
+
+def test_view_counts_come_from_one_query(franchises, admin_client, django_assert_num_queries):
+    url = reverse('application:franchise_list')
+    admin_client.get(url)
+
+    with django_assert_num_queries(3):
+        response = admin_client.get(url, {'sort': '-batches', 'page_size': 2})
+
+    # Every franchise has one batch, so the tie is broken by the primary key, descending too.
+    assert [franchise.student_count for franchise in response.context['franchises']] == [2, 1]
+    assert response.context['next_url']
+    assert response.context['sort_urls']['name'] == '?sort=name&page_size=2'
+    assert response.context['sort_urls']['batches'] == '?sort=batches&page_size=2'
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN output is SQLite specific')
+def test_name_sort_uses_index(franchises):
+    queryset = Franchise.objects.order_by('name', 'pk')
+
+    plan = queryset.explain()
+
+    assert 'franchise_name_idx' in plan
+    assert 'TEMP B-TREE' not in plan
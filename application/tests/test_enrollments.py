@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` bulk enrollment module.
+"""
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from application import enrollments
+from application.models import FranchiseStats, UserFranchise
+from common.djangoapps.student.models import CourseEnrollment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def students(batch):
+    for index in range(5):
+        user = User.objects.create(username=f'bulk{index}')
+        UserFranchise.objects.create(user=user, franchise=batch.franchise, batch=batch)
+        if index < 2:
+            CourseEnrollment.enroll(user, batch.course_id)
+
+
+def _active(batch):
+    return CourseEnrollment.objects.filter(course_id=batch.course_id, is_active=True).count()
+
+
+def test_enrolls_only_students_that_need_it(batch):
+    reports = []
+
+    result = enrollments.change_batch_enrollment(batch, 'enroll', chunk_size=2, progress=reports.append)
+
+    assert (result.pending, result.changed, result.failed) == (3, 3, [])
+    assert len(reports) == 2
+    assert _active(batch) == 5
+    assert FranchiseStats.objects.get(batch=batch).active_enrollment_count == 5
+
+
+def test_unenroll_and_resume_after_failure(batch):
+    real_unenroll = CourseEnrollment.unenroll
+    failing = User.objects.get(username='bulk1')
+
+    def unenroll(user, course_id):
+        if user == failing:
+            raise RuntimeError('LMS unavailable')
+        real_unenroll(user, course_id)
+
+    with mock.patch.object(CourseEnrollment, 'unenroll', side_effect=unenroll):
+        first = enrollments.change_batch_enrollment(batch, 'unenroll')
+    second = enrollments.change_batch_enrollment(batch, 'unenroll')
+
+    assert (first.changed, first.failed) == (1, [(failing.pk, 'LMS unavailable')])
+    assert (second.pending, second.changed) == (1, 1)
+    assert _active(batch) == 0
+
+
+def test_chunk_refreshes_stats_once(batch):
+    with CaptureQueriesContext(connection) as captured:
+        enrollments.change_batch_enrollment(batch, 'enroll')
+
+    updates = [query for query in captured if query['sql'].startswith('UPDATE "application_franchisestats"')]
+    # One for the batch row and one for its franchise row, instead of two per student.
+    assert len(updates) == 2
+
+
+def test_management_command(batch):
+    output = StringIO()
+
+    call_command('change_batch_enrollment', 'enroll', '--batch', 'B1', stdout=output)
+
+    assert 'Enrolled 3 of 3 students' in output.getvalue()
+
+
+def test_batch_action(batch, admin_client):
+    url = reverse('application:batch_enrollment', kwargs={'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk})
+
+    response = admin_client.post(url, {'action': 'enroll'}, follow=True)
+
+    assert b'Enrolled 3 of 3 students.' in response.content
+    assert _active(batch) == 5
+    assert admin_client.get(url).status_code == 405
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` exports module.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+
+import pytest
+
+from application import exports
+from application.models import Installment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def students(make_student):
+    for index in range(3):
+        student_fee = make_student(f'exported{index}').fee_management
+        Installment.objects.bulk_create(
+            Installment(student_fee_management=student_fee, sequence=sequence, amount=100,
+                        due_date=datetime.date(2026, sequence, 1))
+            for sequence in (1, 2)
+        )
+
+
+def test_csv_export(franchise):
+    content = ''.join(exports.stream(franchise, 'installments', 'csv'))
+
+    rows = list(csv.reader(io.StringIO(content)))
+
+    assert rows[0] == list(exports.EXPORTS['installments'].columns)
+    assert len(rows) == 7
+    assert rows[1][:4] == ['exported0', 'B1', '1', '2026-01-01']
+
+
+def test_gzip_jsonl_export(franchise):
+    content = gzip.decompress(b''.join(exports.stream(franchise, 'students', 'jsonl')))
+
+    rows = [json.loads(line) for line in content.decode().splitlines()]
+
+    assert [row['username'] for row in rows] == ['exported0', 'exported1', 'exported2']
+    assert rows[0]['batch'] == 'B1'
+
+
+def test_rows_are_read_in_keyset_pages(franchise):
+    export = exports.EXPORTS['installments']
+
+    paged = list(export.rows(franchise, page_size=4))
+
+    assert paged == list(export.rows(franchise))
+    assert [(row[0], row[2]) for row in paged] == [
+        (f'exported{index}', sequence) for index in range(3) for sequence in (1, 2)
+    ]
+
+
+class CourseKey:
+    """
+    Stands in for the LMS ``CourseLocator``, which the JSON encoder can't serialize.
+    """
+
+    def __str__(self):
+        return 'course-v1:Org+Key+Run'
+
+
+def test_course_keys_are_written_as_strings():
+    export = exports.EXPORTS['batches']
+    values = dict.fromkeys(export.fields, 1)
+    values['course_id'] = CourseKey()
+
+    assert export._row(values)[1] == 'course-v1:Org+Key+Run'  # pylint: disable=protected-access
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Tests for the cached fragments of the `application` report pages.
+"""
+import datetime
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from application import fragments, metrics
+from application.models import Installment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def student(make_student):
+    student = make_student('cached')
+    Installment.objects.create(
+        student_fee_management=student.fee_management, amount=100, due_date=datetime.date(2026, 1, 1),
+    )
+    return student
+
+
+def _roster_url(student):
+    return reverse('application:batch_students', kwargs={
+        'franchise_pk': student.franchise_id, 'batch_pk': student.batch_id,
+    })
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(captured)
+
+
+@pytest.mark.parametrize('name, marker', [('batch_roster', 'cached'), ('franchise_batches', 'B1')])
+def test_repeated_render_uses_cache(student, admin_client, name, marker):
+    url = _roster_url(student) if name == 'batch_roster' else reverse(
+        'application:franchise_report', kwargs={'pk': student.franchise_id},
+    )
+    first, cold = _queries(admin_client, url)
+    key = fragments.make_key(name, first.context['generation'])
+    rendered = cache.get(key)
+    assert marker in rendered and rendered in first.content.decode()
+    cache.set(key, rendered + '<!-- from the cache -->')
+
+    second, warm = _queries(admin_client, url)
+
+    assert warm < cold
+    assert second.context['generation'] == first.context['generation']
+    assert rendered + '<!-- from the cache -->' in second.content.decode()
+
+
+def _amounts(client, student):
+    # The Paid, Pending and Overdue cells of the roster row.
+    return re.findall(r'<td>(\d+\.\d{2})</td>', client.get(_roster_url(student)).content.decode())
+
+
+def test_installment_change_invalidates_roster(student, admin_client, django_capture_on_commit_callbacks):
+    assert _amounts(admin_client, student) == ['0.00', '100.00', '0.00']
+
+    installment = Installment.objects.get()
+    installment.status = 'paid'
+    with django_capture_on_commit_callbacks(execute=True):
+        installment.save()
+
+    assert _amounts(admin_client, student) == ['100.00', '0.00', '0.00']
+
+
+def test_hits_and_misses_are_counted(settings):
+    settings.APPLICATION_METRICS_DIR = None
+    calls = []
+
+    for _ in range(3):
+        fragments.get_or_set('sample', 'generation-1', lambda: calls.append(1) or 'value', 'vary')
+
+    assert len(calls) == 1
+    rendered = metrics.render()
+    assert 'application_cache_requests_total{cache="fragment:sample",result="hit"} 2' in rendered
+    assert 'application_cache_requests_total{cache="fragment:sample",result="miss"} 1' in rendered
+
+
+def test_no_generation_skips_cache():
+    calls = []
+
+    for _ in range(2):
+        fragments.get_or_set('sample', None, lambda: calls.append(1))
+
+    assert len(calls) == 2
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` franchise report's student list.
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from application.pagination import MAX_PAGE_SIZE
+from common.djangoapps.student.models import UserProfile
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def students(make_student):
+    for username, email, first_name, last_name, name in [
+        ('anil', 'anil@example.org', 'Anil', 'Kapoor', 'Anil Kapoor'),
+        ('bela', 'bela@mail.test', 'Bela', 'Sen', 'Bela Sen'),
+        ('chitra', 'chitra@example.org', 'Chitra', 'Rao', 'Chitra Rao'),
+        ('dev', 'dev@example.org', 'Dev', 'Iyer', 'Devendra Iyer'),
+        ('esha', 'esha@example.org', 'Esha', 'Nair', 'Esha Nair'),
+    ]:
+        user = make_student(username, email=email, first_name=first_name, last_name=last_name).user
+        UserProfile.objects.create(user=user, name=name)
+
+
+def _report(client, franchise, **params):
+    response = client.get(reverse('application:franchise_report', kwargs={'pk': franchise.pk}), params)
+    assert response.status_code == 200
+    return response
+
+
+def _usernames(response):
+    return [user.username for user in response.context['users']]
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('CHIT', ['chitra']),
+    ('mail.test', ['bela']),
+    ('esh', ['esha']),
+    ('iyer', ['dev']),
+    ('devendra', ['dev']),
+    ('example.org', ['anil', 'chitra', 'dev', 'esha']),
+])
+def test_query_searches_username_email_and_names(admin_client, franchise, query, expected):
+    assert _usernames(_report(admin_client, franchise, q=query)) == expected
+
+
+def test_cursor_walks_the_pages(admin_client, franchise):
+    first = _report(admin_client, franchise, page_size=3)
+    assert _usernames(first) == ['anil', 'bela', 'chitra']
+    cursor = first.context['page'].next_cursor
+
+    second = _report(admin_client, franchise, page_size=3, cursor=cursor)
+
+    assert _usernames(second) == ['dev', 'esha']
+    assert second.context['page'].next_cursor is None
+    previous = _report(admin_client, franchise, page_size=3, cursor=second.context['page'].previous_cursor)
+    assert _usernames(previous) == ['anil', 'bela', 'chitra']
+
+
+def test_page_size_is_capped(admin_client, franchise, make_student):
+    for index in range(MAX_PAGE_SIZE + 1 - 5):
+        make_student(f'extra{index:03d}')
+
+    response = _report(admin_client, franchise, page_size=MAX_PAGE_SIZE * 10)
+
+    assert len(response.context['users']) == MAX_PAGE_SIZE
+    assert response.context['page'].next_cursor is not None
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` installment status changes.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from application.installments import apply_status_changes, mark_overdue
+from application.models import FranchiseStats, Installment, StudentFeeManagement
+
+pytestmark = pytest.mark.django_db
+
+TODAY = datetime.date(2026, 3, 1)
+
+
+def _installment(student_fee, due_date, status='pending'):
+    return Installment.objects.create(
+        student_fee_management=student_fee, due_date=due_date, amount=Decimal('100'), status=status,
+    ).pk
+
+
+def test_mark_overdue_flips_only_past_pending_installments(student_fee):
+    late = [_installment(student_fee, datetime.date(2026, 2, day)) for day in (1, 10, 27)]
+    due_today = _installment(student_fee, TODAY)
+    paid = _installment(student_fee, datetime.date(2026, 1, 5), status='paid')
+
+    result = mark_overdue(today=TODAY, chunk_size=2)
+
+    assert (result.marked, result.statements) == (3, 2)
+    statuses = dict(Installment.objects.values_list('pk', 'status'))
+    assert [statuses[pk] for pk in late] == ['overdue'] * 3
+    assert (statuses[due_today], statuses[paid]) == ('pending', 'paid')
+    assert set(FranchiseStats.objects.values_list('overdue_count', flat=True)) == {3}
+
+
+def test_mark_overdue_rerun_changes_nothing(student_fee):
+    _installment(student_fee, datetime.date(2026, 2, 1))
+    mark_overdue(today=TODAY)
+
+    result = mark_overdue(today=TODAY)
+
+    assert (result.marked, result.statements) == (0, 0)
+
+
+def _remaining(student_fee):
+    return StudentFeeManagement.objects.get(pk=student_fee.pk).remaining_amount
+
+
+def test_apply_status_changes_query_count_is_constant(student_fee, django_assert_num_queries):
+    pks = [_installment(student_fee, datetime.date(2026, 2, day)) for day in range(1, 6)]
+    fee_management = student_fee.batch_fee_management
+
+    # The write, the balance and the batch, franchise and analytics refreshes.
+    with django_assert_num_queries(24):
+        assert apply_status_changes(student_fee, fee_management, {pks[0]: 'paid'}, today=TODAY) == 1
+    with django_assert_num_queries(24):
+        assert apply_status_changes(student_fee, fee_management, dict.fromkeys(pks[1:], 'paid'), today=TODAY) == 4
+
+
+def test_apply_status_changes_sums_the_paid_installments(student_fee):
+    already_paid = _installment(student_fee, datetime.date(2026, 1, 1), status='paid')
+    pending = _installment(student_fee, datetime.date(2026, 2, 1))
+    # A stale balance on the instance must not leak into the result.
+    student_fee.remaining_amount = Decimal('999')
+
+    changed = apply_status_changes(
+        student_fee, student_fee.batch_fee_management, {already_paid: 'paid', pending: 'paid'}, today=TODAY,
+    )
+
+    assert changed == 1
+    assert _remaining(student_fee) == Decimal('100')
+    assert Installment.objects.get(pk=pending).payment_date == TODAY
+
+
+def test_paying_the_last_installment_leaves_a_zero_balance(student_fee):
+    pks = [_installment(student_fee, datetime.date(2026, 2, day)) for day in (1, 2, 3)]
+
+    apply_status_changes(student_fee, student_fee.batch_fee_management, dict.fromkeys(pks, 'paid'), today=TODAY)
+
+    assert _remaining(student_fee) == Decimal('0.00')
+    assert student_fee.remaining_amount == Decimal('0.00')
+
+    apply_status_changes(student_fee, student_fee.batch_fee_management, {pks[-1]: 'pending'}, today=TODAY)
+
+    assert _remaining(student_fee) == Decimal('100')
+    assert Installment.objects.get(pk=pks[-1]).payment_date is None
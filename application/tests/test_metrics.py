@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` metrics module.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from application import metrics
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _empty_registry(monkeypatch):
+    monkeypatch.setattr(metrics, '_counters', metrics.defaultdict(float))
+    monkeypatch.setattr(metrics, '_histograms', {})
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.APPLICATION_METRICS_DIR = str(tmp_path)
+    return tmp_path
+
+
+def test_histograms_are_cumulative():
+    metrics.observe_request('application:homepage', 0.2, 3)
+
+    text = metrics.render()
+
+    assert 'application_view_latency_seconds_bucket{view="application:homepage",le="0.1"} 0' in text
+    assert 'application_view_latency_seconds_bucket{view="application:homepage",le="0.25"} 1' in text
+    assert 'application_view_queries_count{view="application:homepage"} 1' in text
+
+
+def _write_jobs(path, count):
+    key = metrics._key('application_jobs_total', {'job': 'sweep', 'outcome': 'success'})
+    path.write_text(json.dumps({'counters': {key: count}, 'histograms': {}}))
+
+
+def test_processes_are_added_up_from_the_shared_directory(metrics_dir):
+    _write_jobs(metrics_dir / f'application-metrics-{os.getppid()}-1.json', 2)
+    with metrics.track_job('sweep'):
+        pass
+
+    assert 'application_jobs_total{job="sweep",outcome="success"} 3' in metrics.render()
+
+
+def test_files_of_exited_processes_are_retired(metrics_dir):
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    _write_jobs(metrics_dir / f'application-metrics-{process.pid}-1.json', 2)
+    _write_jobs(metrics_dir / 'application-metrics-retired.json', 4)
+    with metrics.track_job('sweep'):
+        pass
+
+    for _ in range(2):
+        assert 'application_jobs_total{job="sweep",outcome="success"} 7' in metrics.render()
+
+    assert sorted(path.name for path in metrics_dir.glob('*.json')) == [
+        metrics._process_file(), 'application-metrics-retired.json',
+    ]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` instrumentation middleware.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from application import middleware
+from application.middleware import RequestInstrumentationMiddleware, fingerprint
+
+pytestmark = pytest.mark.django_db
+
+
+def _view(queries):
+    def get_response(request):
+        request.resolver_match = resolve('/home/')
+        for _ in range(queries):
+            list(User.objects.filter(username='someone'))
+        return HttpResponse()
+    return get_response
+
+
+def _request(is_superuser, path='/home/'):
+    request = RequestFactory().get(path)
+    request.user = User(username='admin', is_superuser=is_superuser)
+    return request
+
+
+@pytest.fixture(autouse=True)
+def _reset_timings():
+    middleware.reset()
+    yield
+    middleware.reset()
+
+
+@pytest.fixture(autouse=True)
+def _application_urls(settings):
+    settings.ROOT_URLCONF = 'tests.instrumentation_urls'
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21") == \
+        fingerprint("SELECT  * FROM t WHERE id IN (%s) AND name = 'y' LIMIT 3")
+
+
+def test_server_timing_for_superusers_only():
+    response = RequestInstrumentationMiddleware(_view(2))(_request(is_superuser=True))
+    assert 'desc="2 queries"' in response['Server-Timing']
+
+    response = RequestInstrumentationMiddleware(_view(2))(_request(is_superuser=False))
+    assert not response.has_header('Server-Timing')
+
+
+def test_percentiles_are_recorded_per_url_name():
+    for _ in range(3):
+        RequestInstrumentationMiddleware(_view(0))(_request(is_superuser=False))
+
+    assert middleware.view_stats()['application:homepage']['count'] == 3
+
+
+def test_percentiles_use_the_nearest_rank():
+    for milliseconds in (5, 1, 4, 2, 3):
+        middleware.record('application:homepage', milliseconds / 1000)
+
+    stats = middleware.view_stats()['application:homepage']
+
+    assert (stats['p50'], stats['p90'], stats['p99'], stats['max']) == (3.0, 5.0, 5.0, 5.0)
+
+
+def test_over_budget_requests_log_duplicates(settings, caplog):
+    settings.APPLICATION_INSTRUMENTATION_QUERY_BUDGET = 3
+
+    RequestInstrumentationMiddleware(_view(5))(_request(is_superuser=False))
+
+    assert 'application:homepage' in caplog.text
+    assert '5x SELECT' in caplog.text
+
+
+def test_other_paths_are_not_instrumented(monkeypatch):
+    monkeypatch.setattr(middleware, 'QueryCollector', lambda **kwargs: pytest.fail("wrapped the queries"))
+
+    response = RequestInstrumentationMiddleware(_view(2))(_request(is_superuser=True, path='/courses/'))
+
+    assert not response.has_header('Server-Timing')
+    assert middleware.view_stats() == {}
+
+
+def test_requests_within_budget_are_not_fingerprinted(monkeypatch):
+    monkeypatch.setattr(middleware, 'fingerprint', lambda sql: pytest.fail("fingerprinted"))
+
+    RequestInstrumentationMiddleware(_view(5))(_request(is_superuser=False))
+
+    assert middleware.view_stats()['application:homepage']['count'] == 1
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` nested URL resolver.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.test import RequestFactory
+
+from application import nested
+from application.models import Franchise
+from common.djangoapps.student.models import UserProfile
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def student(make_student):
+    student = make_student('nested')
+    UserProfile.objects.create(user=student.user, name='Nested Student')
+    return student
+
+
+def test_resolves_the_chain_in_one_query(student, django_assert_num_queries):
+    request = RequestFactory().get('/')
+
+    with django_assert_num_queries(1):
+        objects = nested.resolve(request, student.franchise_id, student.batch_id, student.user_id)
+        assert objects.user.profile.name == 'Nested Student'
+        assert objects.batch.course.display_name == 'Test'
+        assert objects.fee_management.batch_id == student.batch_id
+        assert objects.student_fee.user_franchise_id == student.pk
+        assert objects.franchise.name == 'F'
+        assert nested.resolve(request, student.franchise_id, student.batch_id, student.user_id) is objects
+
+
+def test_batch_routes_without_user(student, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        objects = nested.resolve(RequestFactory().get('/'), student.franchise_id, student.batch_id)
+
+    assert objects.user is None
+    assert objects.fee_management is not None
+
+
+def test_objects_must_belong_together(student):
+    other = Franchise.objects.create(name='G', coordinator='C', contact_no='1', email='g@example.org')
+    stranger = User.objects.create(username='stranger')
+
+    with pytest.raises(Http404):
+        nested.resolve(RequestFactory().get('/'), other.pk, student.batch_id)
+    with pytest.raises(Http404):
+        nested.resolve(RequestFactory().get('/'), student.franchise_id, student.batch_id, stranger.pk)
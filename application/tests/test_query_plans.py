@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Query plan regression tests for the fee models.
+
+Each test runs ``EXPLAIN QUERY PLAN`` on SQLite for a query behind one of the
+views or jobs and fails when a table is read with a full scan instead of an
+index, or when the rows have to be sorted in a temporary b-tree.
+"""
+import datetime
+import re
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+
+from application.models import Installment, StudentFeeManagement, UserFranchise
+from application.pagination import keyset_paginate
+from application.roster import batch_roster
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN output is SQLite specific'),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)')
+
+
+def _plan(queryset):
+    return queryset.explain()
+
+
+def _full_scans(queryset):
+    return FULL_SCAN.findall(_plan(queryset))
+
+
+@pytest.fixture
+def fee_setup(make_student, fee_management):
+    student_fee = make_student('planner', email='planner@example.org').fee_management
+    return fee_management.batch.franchise, fee_management.batch, fee_management, student_fee
+
+
+def test_student_schedule_uses_index(fee_setup):
+    student_fee = fee_setup[3]
+    queryset = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
+
+    plan = _plan(queryset)
+
+    assert 'installment_student_due_idx' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_overdue_sweep_uses_index():
+    queryset = Installment.objects.filter(status='pending', due_date__lt=datetime.date(2026, 1, 1))
+
+    assert 'installment_status_due_idx' in _plan(queryset)
+
+
+def test_batch_students_use_index(fee_setup):
+    franchise, batch = fee_setup[:2]
+    queryset = UserFranchise.objects.filter(franchise=franchise, batch=batch)
+
+    assert 'uf_franchise_batch_idx' in _plan(queryset)
+    assert _full_scans(batch_roster(batch).filter(franchise=franchise)) == []
+
+
+def test_student_fees_of_batch_use_index(fee_setup):
+    batch, fee_management = fee_setup[1:3]
+    queryset = StudentFeeManagement.objects.filter(batch_fee_management=fee_management, user_franchise__batch=batch)
+
+    assert _full_scans(queryset) == []
+
+
+def test_email_lookup_uses_index():
+    assert _full_scans(User.objects.filter(email='planner@example.org')) == []
+
+
+def test_franchise_report_students_use_index(fee_setup):
+    franchise = fee_setup[0]
+    page = keyset_paginate(UserFranchise.objects.students_of(franchise), ('username',), page_size=1)
+    queryset = UserFranchise.objects.students_of(franchise).filter(username__gt=page.object_list[0].username)
+
+    assert _full_scans(queryset.order_by('username')) == []
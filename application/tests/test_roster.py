@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` roster module.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+
+from application.models import Installment, StudentFeeManagement, UserFranchise
+from application.roster import batch_roster
+from common.djangoapps.student.models import CourseEnrollment, UserProfile
+
+pytestmark = pytest.mark.django_db
+
+
+def _add_students(batch, fee_management, count):
+    User.objects.bulk_create(User(username=f'student{index:05d}') for index in range(count))
+    users = list(User.objects.filter(username__startswith='student').order_by('username'))
+    UserProfile.objects.bulk_create(UserProfile(user=user, phone_number=str(user.pk)) for user in users)
+    UserFranchise.objects.bulk_create(
+        UserFranchise(user=user, franchise=batch.franchise, batch=batch) for user in users
+    )
+    CourseEnrollment.objects.bulk_create(
+        CourseEnrollment(user=user, course_id=batch.course_id, is_active=index % 2 == 0)
+        for index, user in enumerate(users)
+    )
+    StudentFeeManagement.objects.bulk_create(
+        StudentFeeManagement(user_franchise=user_franchise, batch_fee_management=fee_management, remaining_amount=300)
+        for user_franchise in UserFranchise.objects.filter(batch=batch)
+    )
+    Installment.objects.bulk_create(
+        Installment(
+            student_fee_management=student_fee, due_date=datetime.date(2026, month, 1), amount=100, status=status,
+        )
+        for student_fee in StudentFeeManagement.objects.all()
+        for month, status in ((1, 'paid'), (2, 'overdue'), (3, 'pending'))
+    )
+    return users
+
+
+def test_roster_totals(fee_management):
+    batch = fee_management.batch
+    _add_students(batch, fee_management, 2)
+
+    rows = list(batch_roster(batch))
+
+    assert [row.user.username for row in rows] == ['student00000', 'student00001']
+    assert [row.is_enrolled for row in rows] == [True, False]
+    assert rows[0].total_paid == Decimal('100')
+    assert rows[0].total_overdue == Decimal('100')
+    assert rows[0].total_pending == Decimal('100')
+    assert rows[0].next_due_date == datetime.date(2026, 2, 1)
+
+
+def test_roster_query_count_is_constant(fee_management, django_assert_max_num_queries):
+    batch = fee_management.batch
+    _add_students(batch, fee_management, 1000)
+
+    with django_assert_max_num_queries(5):
+        rows = [
+            (row.user.username, row.user.profile.phone_number, row.is_enrolled, row.total_paid, row.next_due_date)
+            for row in batch_roster(batch)
+        ]
+
+    assert len(rows) == 1000
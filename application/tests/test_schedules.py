@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` installment templates and schedules.
+"""
+import datetime
+import importlib
+from decimal import Decimal
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.http import QueryDict
+from django.utils import timezone
+
+from application.models import Installment, InstallmentTemplate, StudentFeeManagement, UserFranchise
+from application import schedules
+from application.schedules import (
+    generate_batch_schedules, replan_batch_schedules, save_templates, template_rows_from_post,
+)
+from common.djangoapps.student.models import CourseEnrollment
+
+pytestmark = pytest.mark.django_db
+
+REGISTERED = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def students(fee_management):
+    batch = fee_management.batch
+    for number in range(2):
+        user = User.objects.create(username=f'scheduled{number}')
+        UserFranchise.objects.create(user=user, franchise=batch.franchise, batch=batch)
+        CourseEnrollment.objects.create(user=user, course=batch.course, created=REGISTERED)
+
+
+def _templates(batch, *rows):
+    return save_templates(batch.fee_management, [(Decimal(amount), period) for amount, period in rows])
+
+
+def _schedule(student_fee):
+    return list(
+        Installment.objects.filter(student_fee_management=student_fee).order_by('sequence')
+        .values_list('sequence', 'due_date', 'amount', 'status')
+    )
+
+
+def test_generate_creates_missing_schedules_once(batch):
+    _templates(batch, ('100', 30), ('200', 45))
+
+    result = generate_batch_schedules(batch, chunk_size=1)
+
+    assert (result.students, result.installments) == (2, 4)
+    for student_fee in StudentFeeManagement.objects.all():
+        assert _schedule(student_fee) == [
+            (1, datetime.date(2026, 1, 31), Decimal('100'), 'pending'),
+            (2, datetime.date(2026, 3, 17), Decimal('200'), 'pending'),
+        ]
+    rerun = generate_batch_schedules(batch)
+    assert (rerun.students, rerun.installments) == (0, 0)
+    assert Installment.objects.count() == 4
+
+
+def test_generate_skips_installments_written_concurrently(batch, monkeypatch):
+    _templates(batch, ('100', 30), ('200', 45))
+    registration_dates = schedules.registration_dates
+
+    def concurrent_run(course_id, user_ids):
+        # Another run writes the first installments between the pending query and the insert.
+        for student_fee in StudentFeeManagement.objects.all():
+            Installment.objects.create(
+                student_fee_management=student_fee, sequence=1, due_date=datetime.date(2026, 1, 31), amount=1,
+            )
+        return registration_dates(course_id, user_ids)
+
+    monkeypatch.setattr(schedules, 'registration_dates', concurrent_run)
+    generate_batch_schedules(batch)
+
+    for student_fee in StudentFeeManagement.objects.all():
+        assert [(sequence, amount) for sequence, _, amount, _ in _schedule(student_fee)] == [
+            (1, Decimal('1')), (2, Decimal('200')),
+        ]
+
+
+def test_sequence_migration_numbers_installments_by_due_date(batch):
+    migration = importlib.import_module('application.migrations.0028_installment_sequence')
+    _templates(batch, ('100', 30))
+    generate_batch_schedules(batch)
+    first, second = StudentFeeManagement.objects.order_by('pk')
+    for student_fee, days in [(first, [20, 5, 5]), (second, [1])]:
+        for day in days:
+            Installment.objects.create(
+                student_fee_management=student_fee, due_date=datetime.date(2026, 3, day), amount=10,
+            )
+    Installment.objects.update(sequence=None)
+
+    migration.number_existing_installments(apps, None)
+
+    numbered = Installment.objects.order_by('student_fee_management_id', 'due_date', 'id').values_list(
+        'student_fee_management_id', 'sequence',
+    )
+    assert list(numbered) == [
+        (first.pk, 1), (first.pk, 2), (first.pk, 3), (first.pk, 4), (second.pk, 1), (second.pk, 2),
+    ]
+
+
+def test_template_rows_skip_invalid_values():
+    data = QueryDict(mutable=True)
+    data.update({
+        'installment_amount_1': '100.50', 'repayment_period_1': '30',
+        'installment_amount_3': '200', 'repayment_period_3': '60',
+    })
+    for index, amount in enumerate(['NaN', 'sNaN', 'Infinity', '1e20', '-5', '1.234', 'abc'], start=10):
+        data.update({f'installment_amount_{index}': amount, f'repayment_period_{index}': '30'})
+    data.update({'installment_amount_20': '10', 'repayment_period_20': '-1'})
+    data.update({'installment_amount_21': '10'})
+
+    assert template_rows_from_post(data) == [(Decimal('100.50'), 30), (Decimal('200'), 60)]
+
+
+def test_save_templates_matches_rows_by_position(batch):
+    assert _templates(batch, ('100', 30), ('100', 30), ('100', 30)).created == 3
+    first, second, third = InstallmentTemplate.objects.order_by('id').values_list('pk', flat=True)
+
+    result = _templates(batch, ('100', 30), ('150', 45))
+
+    assert (result.updated, result.created, result.deleted) == (1, 0, 1)
+    assert list(
+        InstallmentTemplate.objects.order_by('id').values_list('pk', 'amount', 'repayment_period_days')
+    ) == [(first, Decimal('100'), 30), (second, Decimal('150'), 45)]
+    assert not InstallmentTemplate.objects.filter(pk=third).exists()
+
+
+def test_replan_rewrites_only_unpaid_installments(batch):
+    _templates(batch, ('100', 30), ('100', 30), ('100', 30))
+    replan_batch_schedules(batch)
+    student_fee = StudentFeeManagement.objects.order_by('pk').first()
+    Installment.objects.filter(student_fee_management=student_fee, sequence=1).update(
+        status='paid', payment_date=datetime.date(2026, 1, 20),
+    )
+
+    _templates(batch, ('120', 10), ('80', 20))
+    result = replan_batch_schedules(batch)
+
+    today = timezone.now().date()
+    second_due = datetime.date(2026, 1, 31)
+    assert result.students == 2
+    assert _schedule(student_fee) == [
+        (1, datetime.date(2026, 1, 31), Decimal('100'), 'paid'),
+        (2, second_due, Decimal('80'), 'overdue' if second_due < today else 'pending'),
+    ]
+    assert replan_batch_schedules(batch).installments == 0
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` cross-franchise student search.
+"""
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+
+from application import search
+from application.models import (
+    Batch, BatchFeeManagement, Franchise, StudentFeeManagement, StudentSearchTerm, UserFranchise,
+)
+from common.djangoapps.student.models import UserProfile
+
+pytestmark = pytest.mark.django_db
+
+
+def _student(batch, username, name, phone):
+    user = User.objects.create(username=username, email=f'{username}@example.org')
+    UserProfile.objects.create(user=user, name=name, phone_number=phone)
+    user_franchise = UserFranchise.objects.create(user=user, franchise=batch.franchise, batch=batch)
+    StudentFeeManagement.objects.create(
+        user_franchise=user_franchise, batch_fee_management=batch.fee_management, remaining_amount=Decimal('75'),
+    )
+    return user_franchise
+
+
+@pytest.fixture
+def students(course):
+    created = []
+    for name, (username, full_name, phone) in zip('FG', [
+        ('ravi', 'Ravi Sharma', '+91 98765 43210'),
+        ('priya', 'Priya Sharma', '022-555-0101'),
+    ]):
+        franchise = Franchise.objects.create(name=name, coordinator='C', contact_no='1', email=f'{name}@example.org')
+        batch = Batch.objects.create(batch_no=f'S{name}', fees=100, course=course, franchise=franchise)
+        BatchFeeManagement.objects.create(batch=batch)
+        created.append(_student(batch, username, full_name, phone))
+    return created
+
+
+def _usernames(query):
+    return [student.user.username for student in search.search_students(query)]
+
+
+def test_terms_are_normalized():
+    assert search.terms_for('Ravi', 'Ravi@Example.org', 'Ravi  Sharma', '+91 98765 43210') == {
+        'ravi', 'ravi@example.org', 'sharma', '919876543210', '9876543210',
+    }
+
+
+def test_finds_students_of_every_franchise(students):
+    assert _usernames('sharma') == ['priya', 'ravi']
+    assert _usernames('Sha Ra') == ['ravi']
+    assert _usernames('priya@ex') == ['priya']
+    assert _usernames('98765 43210') == ['ravi']
+    assert _usernames('0225550') == ['priya']
+    assert _usernames('r') == []
+
+
+def test_results_carry_franchise_batch_and_balance(students, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        student, = search.search_students('ravi')
+        assert (student.franchise.name, student.batch.batch_no) == ('F', 'SF')
+        assert student.fee_management.remaining_amount == Decimal('75')
+
+
+def test_terms_follow_user_and_profile_changes(students):
+    user = students[0].user
+    user.username = 'ravindra'
+    user.save()
+    user.profile.name = 'Ravindra Kumar'
+    user.profile.save()
+
+    assert _usernames('ravindra') == ['ravindra']
+    assert _usernames('kumar') == ['ravindra']
+    assert _usernames('sharma') == ['priya']
+
+
+def test_users_outside_franchises_cost_one_lookup(students, django_assert_num_queries):
+    user = User.objects.create(username='staff')
+    user.first_name = 'Staff'
+
+    with django_assert_num_queries(2):
+        # The save and the placement lookup.
+        user.save()
+
+
+def test_rebuild_recreates_the_terms(students):
+    StudentSearchTerm.objects.all().delete()
+
+    assert search.rebuild(chunk_size=1) == 2
+    assert _usernames('sharma') == ['priya', 'ravi']
+
+
+def test_view(students, admin_client):
+    response = admin_client.get(reverse('application:student_search'), {'q': 'priya'})
+
+    assert [student.user.username for student in response.context['students']] == ['priya']
+    assert b'SG' in response.content
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN output is SQLite specific')
+def test_lookup_uses_index(students):
+    plan = StudentSearchTerm.objects.filter(search._matching('sha')).values('user_franchise_id').explain()
+
+    assert 'search_term_idx' in plan
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` franchise and batch rollup rows.
+"""
+import datetime
+import importlib
+from decimal import Decimal
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+
+from application import stats
+from application.models import (
+    Batch, BatchFeeManagement, FranchiseStats, Installment, StudentFeeManagement, UserFranchise,
+)
+from common.djangoapps.student.models import CourseEnrollment
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+pytestmark = pytest.mark.django_db
+
+TOTALS = (
+    'student_count', 'active_enrollment_count', 'batch_count', 'total_billed', 'total_collected',
+    'total_outstanding', 'overdue_count',
+)
+
+
+@pytest.fixture(autouse=True)
+def batches(franchise):
+    for number in range(2):
+        course = CourseOverview.objects.create(id=f'course-v1:Org+Stats{number}+Run', display_name='Stats')
+        batch = Batch.objects.create(batch_no=f'R{number}', fees=300, course=course, franchise=franchise)
+        fee_management = BatchFeeManagement.objects.create(batch=batch)
+        for student in range(number + 1):
+            user = User.objects.create(username=f'student{number}{student}')
+            user_franchise = UserFranchise.objects.create(user=user, franchise=franchise, batch=batch)
+            CourseEnrollment.objects.create(user=user, course=course, is_active=bool(student))
+            student_fee = StudentFeeManagement.objects.create(
+                user_franchise=user_franchise, batch_fee_management=fee_management,
+            )
+            for status in ('paid', 'pending', 'overdue'):
+                Installment.objects.create(
+                    student_fee_management=student_fee, due_date=datetime.date(2026, 1, 1), amount=Decimal('100'),
+                    status=status,
+                )
+
+
+def _rows(franchise):
+    return {
+        row['batch__batch_no']: tuple(row[name] for name in TOTALS)
+        for row in FranchiseStats.objects.filter(franchise=franchise).values('batch__batch_no', *TOTALS)
+    }
+
+
+def test_refresh_batch_updates_the_batch_and_franchise_rows(franchise):
+    batch = Batch.objects.get(batch_no='R1')
+    version = FranchiseStats.objects.get(batch=batch).version
+
+    stats.refresh_batch(batch.pk)
+
+    rows = _rows(franchise)
+    assert rows['R1'] == (2, 1, 0, Decimal('600'), Decimal('200'), Decimal('400'), 2)
+    assert rows[None] == (3, 1, 2, Decimal('600'), Decimal('200'), Decimal('400'), 2)
+    assert FranchiseStats.objects.get(batch=batch).version == version + 1
+
+
+def test_deferred_refreshes_each_batch_once(franchise, monkeypatch):
+    batches = list(Batch.objects.order_by('pk').values_list('pk', flat=True))
+    refreshed = []
+    refresh_franchise = stats.refresh_franchise
+    monkeypatch.setattr(stats, 'refresh_franchise', lambda pk: refreshed.append(pk) or refresh_franchise(pk))
+
+    with stats.deferred():
+        for batch_id in batches * 3:
+            stats.refresh_batch(batch_id)
+        stats.refresh_franchise(franchise.pk)
+        assert refreshed == [franchise.pk]
+
+    assert refreshed == [franchise.pk] * 3
+    assert _rows(franchise)[None][0] == 3
+
+
+def test_rebuild_matches_incremental_rows(franchise):
+    for batch_id in Batch.objects.values_list('pk', flat=True):
+        stats.refresh_batch(batch_id)
+    incremental = _rows(franchise)
+    FranchiseStats.objects.all().delete()
+
+    assert stats.rebuild() == 1
+    assert _rows(franchise) == incremental
+
+
+def test_migration_builds_the_rows_of_existing_franchises(franchise):
+    migration = importlib.import_module('application.migrations.0027_franchisestats')
+    stats.rebuild()
+    # overdue_count arrives in a later migration.
+    rebuilt = {batch_no: row[:-1] for batch_no, row in _rows(franchise).items()}
+    FranchiseStats.objects.all().delete()
+
+    migration.build_rollup_rows(apps, None)
+
+    assert {batch_no: row[:-1] for batch_no, row in _rows(franchise).items()} == rebuilt
+
+
+def test_get_franchise_stats_rebuilds_missing_rows(franchise):
+    FranchiseStats.objects.all().delete()
+
+    row = stats.get_franchise_stats(franchise)
+
+    assert (row.batch_id, row.student_count, row.batch_count) == (None, 3, 2)
+    assert FranchiseStats.objects.filter(franchise=franchise).count() == 3
+
+
+def test_enrollment_in_another_course_marks_the_franchise_changed(franchise):
+    user = User.objects.get(username='student00')
+    course = CourseOverview.objects.get(id='course-v1:Org+Stats1+Run')
+    versions = dict(FranchiseStats.objects.values_list('batch__batch_no', 'version'))
+
+    CourseEnrollment.objects.create(user=user, course=course, is_active=True)
+
+    after = dict(FranchiseStats.objects.values_list('batch__batch_no', 'version'))
+    assert after == {**versions, None: versions[None] + 1}
+    assert {
+        row['course_id']: row['student_count'] for row in UserFranchise.objects.enrollment_counts_by_course(franchise)
+    } == {'course-v1:Org+Stats1+Run': 2}
+
+
+def test_overdue_migration_counts_existing_installments(franchise):
+    migration = importlib.import_module('application.migrations.0031_franchisestats_overdue_count')
+    stats.rebuild()
+    FranchiseStats.objects.update(overdue_count=0)
+
+    migration.count_overdue_installments(apps, None)
+
+    assert dict(FranchiseStats.objects.values_list('batch__batch_no', 'overdue_count')) == {None: 3, 'R0': 1, 'R1': 2}
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Tests for the conditional responses of the `application` report pages.
+"""
+import datetime
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from application.models import Franchise, Installment
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def student(make_student):
+    student = make_student('tabbed')
+    Installment.objects.create(
+        student_fee_management=student.fee_management, amount=100, due_date=datetime.date(2026, 1, 1),
+    )
+    return student
+
+
+def _urls(student):
+    batch_kwargs = {'franchise_pk': student.franchise_id, 'batch_pk': student.batch_id}
+    return [
+        reverse('application:franchise_report', kwargs={'pk': student.franchise_id}),
+        reverse('application:batch_students', kwargs=batch_kwargs),
+        reverse('application:student_detail', kwargs=dict(batch_kwargs, user_pk=student.user_id)),
+    ]
+
+
+@pytest.mark.parametrize('page', range(3))
+def test_unchanged_page_is_not_modified(student, admin_client, django_assert_max_num_queries, page):
+    url = _urls(student)[page]
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert 'no-cache' in response['Cache-Control']
+
+    with django_assert_max_num_queries(3):
+        revalidated = admin_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize('change', ['installment', 'franchise', 'profile'])
+def test_changes_invalidate_every_page(student, admin_client, django_capture_on_commit_callbacks, change):
+    etags = [admin_client.get(url)['ETag'] for url in _urls(student)]
+
+    if change == 'installment':
+        with django_capture_on_commit_callbacks(execute=True):
+            Installment.objects.get().save()
+    elif change == 'franchise':
+        Franchise.objects.filter(pk=student.franchise_id).get().save()
+    else:
+        student.user.email = 'tabbed@example.org'
+        student.user.save()
+
+    for url, etag in zip(_urls(student), etags):
+        assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_etag_differs_between_users(student, admin_client):
+    url = _urls(student)[0]
+    etag = admin_client.get(url)['ETag']
+    admin_client.force_login(User.objects.create(username='other', is_superuser=True))
+
+    assert admin_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200